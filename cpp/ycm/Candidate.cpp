@@ -20,58 +20,79 @@
 
 namespace YouCompleteMe {
 
-void Candidate::ComputeCaseSwappedText() {
-  for ( const auto &character : Characters() ) {
-    case_swapped_text_.append( character->SwappedCase() );
-  }
-}
-
-
-void Candidate::ComputeWordBoundaryChars() {
-  const CharacterSequence &characters = Characters();
-
-  auto character_pos = characters.begin();
-  if ( character_pos == characters.end() ) {
-    return;
+namespace {
+
+// A character is a word boundary character if one of these is true:
+//  - this is the first character and not a punctuation;
+//  - the character is uppercase but not the previous one;
+//  - the character is a letter and the previous one is a punctuation.
+std::vector< uint32_t > FindWordBoundaryIndexes(
+  const CharacterSequence &characters ) {
+  std::vector< uint32_t > indexes;
+
+  if ( characters.empty() ) {
+    return indexes;
   }
 
-  const auto &first_character = *character_pos;
-  if ( !first_character->IsPunctuation() ) {
-    word_boundary_chars_.push_back( first_character );
+  if ( !characters[ 0 ]->IsPunctuation() ) {
+    indexes.push_back( 0 );
   }
 
-  auto previous_character_pos = characters.begin();
-  ++character_pos;
-  for ( ; character_pos != characters.end(); ++previous_character_pos,
-                                             ++character_pos ) {
-    const auto &previous_character = *previous_character_pos;
-    const auto &character = *character_pos;
+  for ( size_t index = 1; index < characters.size(); ++index ) {
+    const auto &previous_character = characters[ index - 1 ];
+    const auto &character = characters[ index ];
 
     if ( ( !previous_character->IsUppercase() && character->IsUppercase() ) ||
          ( previous_character->IsPunctuation() && character->IsLetter() ) ) {
-      word_boundary_chars_.push_back( character );
+      indexes.push_back( static_cast< uint32_t >( index ) );
     }
   }
+
+  return indexes;
 }
 
+} // unnamed namespace
+
 
-void Candidate::ComputeTextIsLowercase() {
+Candidate::Candidate( std::string&& text )
+  : Word( std::move( text ) ),
+    text_is_lowercase_( true ),
+    reference_count_( 0 ) {
+  std::string case_swapped_text;
   for ( const auto &character : Characters() ) {
+    case_swapped_text.append( character->SwappedCase() );
     if ( character->IsUppercase() ) {
       text_is_lowercase_ = false;
-      return;
     }
   }
 
-  text_is_lowercase_ = true;
+  std::vector< uint32_t > word_boundary_indexes =
+    FindWordBoundaryIndexes( Characters() );
+
+  num_word_boundary_chars_ =
+    static_cast< uint32_t >( word_boundary_indexes.size() );
+  case_swapped_text_size_ = static_cast< uint32_t >( case_swapped_text.size() );
+
+  // Always allocate so that the text pointer is valid even if empty.
+  size_t text_units = ( case_swapped_text_size_ + sizeof( uint32_t ) - 1 ) /
+                      sizeof( uint32_t );
+  data_.reset( new uint32_t[ num_word_boundary_chars_ + text_units + 1 ] );
+  std::copy( word_boundary_indexes.begin(),
+             word_boundary_indexes.end(),
+             data_.get() );
+  std::memcpy( data_.get() + num_word_boundary_chars_,
+               case_swapped_text.data(),
+               case_swapped_text_size_ );
 }
 
 
-Candidate::Candidate( std::string&& text )
-  : Word( std::move( text ) ) {
-  ComputeCaseSwappedText();
-  ComputeWordBoundaryChars();
-  ComputeTextIsLowercase();
+CharacterSequence Candidate::WordBoundaryChars() const {
+  CharacterSequence word_boundary_chars;
+  word_boundary_chars.reserve( num_word_boundary_chars_ );
+  for ( size_t index = 0; index < num_word_boundary_chars_; ++index ) {
+    word_boundary_chars.push_back( WordBoundaryChar( index ) );
+  }
+  return word_boundary_chars;
 }
 
 
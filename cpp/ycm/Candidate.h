@@ -20,6 +20,10 @@
 
 #include "Word.h"
 
+#include <algorithm>
+#include <atomic>
+#include <cstdint>
+#include <cstring>
 #include <memory>
 #include <string>
 
@@ -34,18 +38,30 @@ public:
   // Make class noncopyable
   Candidate( const Candidate& ) = delete;
   Candidate& operator=( const Candidate& ) = delete;
-  Candidate( Candidate&& ) = default;
-  Candidate& operator=( Candidate&& ) = default;
   ~Candidate() = default;
 
-  inline const std::string &CaseSwappedText() const {
-    return case_swapped_text_;
+  // Returns true if the text with its case swapped comes before the one of the
+  // other candidate in lexicographic order.
+  inline bool CaseSwappedTextLessThan( const Candidate &other ) const {
+    int comparison = std::memcmp(
+      CaseSwappedText(),
+      other.CaseSwappedText(),
+      std::min( case_swapped_text_size_, other.case_swapped_text_size_ ) );
+    return comparison < 0 ||
+           ( comparison == 0 &&
+             case_swapped_text_size_ < other.case_swapped_text_size_ );
   }
 
-  inline const CharacterSequence &WordBoundaryChars() const {
-    return word_boundary_chars_;
+  inline size_t NumWordBoundaryChars() const {
+    return num_word_boundary_chars_;
   }
 
+  inline const Character *WordBoundaryChar( size_t index ) const {
+    return Characters()[ WordBoundaryIndexes()[ index ] ];
+  }
+
+  YCM_EXPORT CharacterSequence WordBoundaryChars() const;
+
   inline bool TextIsLowercase() const {
     return text_is_lowercase_;
   }
@@ -53,13 +69,27 @@ public:
   YCM_EXPORT Result QueryMatchResult( const Word &query ) const;
 
 private:
-  void ComputeCaseSwappedText();
-  void ComputeTextIsLowercase();
-  void ComputeWordBoundaryChars();
+  friend class CandidateRepository;
+
+  inline const uint32_t *WordBoundaryIndexes() const {
+    return data_.get();
+  }
+
+  inline const char *CaseSwappedText() const {
+    return reinterpret_cast< const char * >(
+             data_.get() + num_word_boundary_chars_ );
+  }
 
-  std::string case_swapped_text_;
-  CharacterSequence word_boundary_chars_;
+  // The indexes of the word boundary characters followed by the text with its
+  // case swapped, stored in a single allocation.
+  std::unique_ptr< uint32_t[] > data_;
+  uint32_t num_word_boundary_chars_;
+  uint32_t case_swapped_text_size_;
   bool text_is_lowercase_;
+
+  // Number of references held on this candidate through the
+  // CandidateRepository.
+  mutable std::atomic< size_t > reference_count_;
 };
 
 } // namespace YouCompleteMe
@@ -19,6 +19,8 @@
 #include "Candidate.h"
 #include "Utils.h"
 
+#include <algorithm>
+#include <functional>
 #include <mutex>
 
 #ifdef USE_CLANG_COMPLETER
@@ -33,6 +35,10 @@ namespace {
 // entering the database. Such large candidates are almost never desirable.
 const size_t MAX_CANDIDATE_SIZE = 80;
 
+// Unused candidates are deleted when there are at least that many of them and
+// they make up at least half of the repository.
+const std::ptrdiff_t MIN_UNUSED_CANDIDATES_TO_CLEAR = 16384;
+
 }  // unnamed namespace
 
 
@@ -42,35 +48,92 @@ CandidateRepository &CandidateRepository::Instance() {
 }
 
 
+CandidateRepository::CandidateRepository()
+  : num_stored_candidates_( 0 ),
+    num_unused_candidates_( 0 ) {
+}
+
+
 size_t CandidateRepository::NumStoredCandidates() {
-  std::lock_guard< std::mutex > locker( candidate_holder_mutex_ );
-  return candidate_holder_.size();
+  return num_stored_candidates_;
+}
+
+
+size_t CandidateRepository::NumUnusedCandidates() {
+  return static_cast< size_t >( std::max( num_unused_candidates_.load(),
+                                          std::ptrdiff_t( 0 ) ) );
 }
 
 
 std::vector< const Candidate * > CandidateRepository::GetCandidatesForStrings(
   std::vector< std::string >&& strings ) {
-  std::vector< const Candidate * > candidates;
-  candidates.reserve( strings.size() );
-
-  {
-    std::lock_guard< std::mutex > locker( candidate_holder_mutex_ );
+  std::vector< const Candidate * > candidates( strings.size(), nullptr );
+
+  // Group the strings by shard so that each mutex is locked once per pass.
+  std::array< std::vector< size_t >, NUM_SHARDS > indexes_per_shard;
+  std::hash< std::string > hash;
+  for ( size_t i = 0; i < strings.size(); ++i ) {
+    std::string &candidate_text = strings[ i ];
+    if ( candidate_text.size() > MAX_CANDIDATE_SIZE ) {
+      candidate_text = "";
+    }
+    indexes_per_shard[ hash( candidate_text ) & ( NUM_SHARDS - 1 ) ]
+      .push_back( i );
+  }
 
-    for ( auto&& candidate_text : strings ) {
-      if ( candidate_text.size() > MAX_CANDIDATE_SIZE ) {
-        candidate_text = "";
+  for ( size_t shard_index = 0; shard_index < NUM_SHARDS; ++shard_index ) {
+    std::vector< size_t > &indexes = indexes_per_shard[ shard_index ];
+    if ( indexes.empty() ) {
+      continue;
+    }
+    Shard &shard = shards_[ shard_index ];
+
+    // Look up the stored candidates and keep the indexes of the others.
+    std::vector< size_t > unstored_indexes;
+    {
+      std::lock_guard< std::mutex > locker( shard.candidate_holder_mutex );
+      for ( size_t index : indexes ) {
+        auto it = shard.candidate_holder.find( strings[ index ] );
+        if ( it != shard.candidate_holder.end() ) {
+          if ( it->second->reference_count_++ == 0 ) {
+            --num_unused_candidates_;
+          }
+          candidates[ index ] = it->second.get();
+        } else {
+          unstored_indexes.push_back( index );
+        }
       }
+    }
+
+    if ( unstored_indexes.empty() ) {
+      continue;
+    }
 
+    // Building a candidate is expensive so it's done without holding the lock.
+    std::vector< std::unique_ptr< Candidate > > new_candidates;
+    new_candidates.reserve( unstored_indexes.size() );
+    for ( size_t index : unstored_indexes ) {
+      new_candidates.emplace_back( new Candidate( std::string(
+                                                    strings[ index ] ) ) );
+    }
+
+    // Another thread or a duplicate string may have stored the same candidate
+    // in the meantime. In that case, the stored one is used and ours dropped.
+    std::lock_guard< std::mutex > locker( shard.candidate_holder_mutex );
+    for ( size_t i = 0; i < unstored_indexes.size(); ++i ) {
+      size_t index = unstored_indexes[ i ];
       std::unique_ptr< Candidate > &candidate = GetValueElseInsert(
-                                                  candidate_holder_,
-                                                  candidate_text,
+                                                  shard.candidate_holder,
+                                                  strings[ index ],
                                                   nullptr );
-
       if ( !candidate ) {
-        candidate.reset( new Candidate( std::move( candidate_text ) ) );
+        candidate = std::move( new_candidates[ i ] );
+        ++num_stored_candidates_;
+      } else if ( candidate->reference_count_ == 0 ) {
+        --num_unused_candidates_;
       }
-
-      candidates.push_back( candidate.get() );
+      ++candidate->reference_count_;
+      candidates[ index ] = candidate.get();
     }
   }
 
@@ -78,8 +141,59 @@ std::vector< const Candidate * > CandidateRepository::GetCandidatesForStrings(
 }
 
 
+void CandidateRepository::AcquireCandidates(
+  const std::vector< const Candidate * > &candidates ) {
+  for ( const Candidate *candidate : candidates ) {
+    ++candidate->reference_count_;
+  }
+}
+
+
+void CandidateRepository::ReleaseCandidates(
+  const std::vector< const Candidate * > &candidates ) {
+  // A candidate must not be accessed once its reference is released since it
+  // may be deleted by another thread.
+  for ( const Candidate *candidate : candidates ) {
+    if ( --candidate->reference_count_ == 0 ) {
+      ++num_unused_candidates_;
+    }
+  }
+
+  std::ptrdiff_t num_unused_candidates = num_unused_candidates_;
+  if ( num_unused_candidates >= MIN_UNUSED_CANDIDATES_TO_CLEAR &&
+       static_cast< size_t >( num_unused_candidates ) * 2 >=
+         num_stored_candidates_ ) {
+    ClearUnusedCandidates();
+  }
+}
+
+
+void CandidateRepository::ClearUnusedCandidates() {
+  // References can only be added to an unused candidate while holding the
+  // lock of its shard so a candidate without references found under that lock
+  // can safely be deleted.
+  for ( auto &shard : shards_ ) {
+    std::lock_guard< std::mutex > locker( shard.candidate_holder_mutex );
+    auto it = shard.candidate_holder.begin();
+    while ( it != shard.candidate_holder.end() ) {
+      if ( it->second->reference_count_ == 0 ) {
+        it = shard.candidate_holder.erase( it );
+        --num_stored_candidates_;
+        --num_unused_candidates_;
+      } else {
+        ++it;
+      }
+    }
+  }
+}
+
+
 void CandidateRepository::ClearCandidates() {
-  candidate_holder_.clear();
+  for ( auto &shard : shards_ ) {
+    shard.candidate_holder.clear();
+  }
+  num_stored_candidates_ = 0;
+  num_unused_candidates_ = 0;
 }
 
 } // namespace YouCompleteMe
@@ -20,6 +20,9 @@
 
 #include "Candidate.h"
 
+#include <array>
+#include <atomic>
+#include <cstddef>
 #include <memory>
 #include <mutex>
 #include <string>
@@ -39,6 +42,15 @@ using CandidateHolder = std::unordered_map< std::string,
 // This is shared by the identifier completer and the clang completer so that
 // work is not repeated.
 //
+// Candidates are split into shards by the hash of their text, each protected by
+// its own mutex, and new Candidate objects are built outside of any lock so
+// that concurrent requests rarely wait on each other.
+//
+// Candidates are reference counted. Each candidate returned by
+// GetCandidatesForStrings comes with a reference that must be given back
+// through ReleaseCandidates once it's not used anymore. Candidates without
+// references are deleted when they make up a large part of the repository.
+//
 // This class is thread-safe.
 class CandidateRepository {
 public:
@@ -47,24 +59,45 @@ public:
   CandidateRepository( const CandidateRepository& ) = delete;
   CandidateRepository& operator=( const CandidateRepository& ) = delete;
 
-  size_t NumStoredCandidates();
+  YCM_EXPORT size_t NumStoredCandidates();
+
+  YCM_EXPORT size_t NumUnusedCandidates();
 
   YCM_EXPORT std::vector< const Candidate * > GetCandidatesForStrings(
     std::vector< std::string >&& strings );
 
+  // Adds a reference on candidates the caller already holds a reference on.
+  YCM_EXPORT void AcquireCandidates(
+    const std::vector< const Candidate * > &candidates );
+
+  YCM_EXPORT void ReleaseCandidates(
+    const std::vector< const Candidate * > &candidates );
+
+  // Deletes the candidates without references.
+  YCM_EXPORT void ClearUnusedCandidates();
+
   // This should only be used to isolate tests and benchmarks.
   YCM_EXPORT void ClearCandidates();
 
 private:
-  CandidateRepository() = default;
+  CandidateRepository();
   ~CandidateRepository() = default;
 
-  const std::string &ValidatedCandidateText(
-      const std::string &candidate_text );
+  // Must be a power of two.
+  static const size_t NUM_SHARDS = 16;
+
+  struct Shard {
+    // This data structure owns the Candidate pointers of the shard.
+    CandidateHolder candidate_holder;
+    std::mutex candidate_holder_mutex;
+  };
+
+  std::array< Shard, NUM_SHARDS > shards_;
 
-  // This data structure owns all the Candidate pointers
-  CandidateHolder candidate_holder_;
-  std::mutex candidate_holder_mutex_;
+  std::atomic< size_t > num_stored_candidates_;
+  // This may be temporarily off by the candidates being released while unused
+  // candidates are cleared, hence the signed type.
+  std::atomic< std::ptrdiff_t > num_unused_candidates_;
 };
 
 } // namespace YouCompleteMe
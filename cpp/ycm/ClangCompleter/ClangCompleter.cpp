@@ -33,8 +33,18 @@ using std::shared_ptr;
 namespace YouCompleteMe {
 
 ClangCompleter::ClangCompleter()
+  : ClangCompleter( 0, 0 ) {
+}
+
+
+ClangCompleter::ClangCompleter( std::size_t max_units,
+                                std::size_t max_memory_usage,
+                                const std::string &preamble_cache_directory )
   : clang_index_( clang_createIndex( 0, 0 ) ),
-    translation_unit_store_( clang_index_ ) {
+    translation_unit_store_( clang_index_,
+                             max_units,
+                             max_memory_usage,
+                             preamble_cache_directory ) {
   // The libclang docs don't say what is the default value for crash recovery.
   // I'm pretty sure it's turned on by default, but I'm not going to take any
   // chances.
@@ -69,6 +79,11 @@ bool ClangCompleter::UpdatingTranslationUnit( const std::string &filename ) {
 }
 
 
+bool ClangCompleter::HasTranslationUnit( const std::string &filename ) {
+  return static_cast< bool >( translation_unit_store_.Get( filename ) );
+}
+
+
 std::vector< Diagnostic > ClangCompleter::UpdateTranslationUnit(
   const std::string &translation_unit,
   const std::vector< UnsavedFile > &unsaved_files,
@@ -281,4 +296,16 @@ void ClangCompleter::DeleteCachesForFile( const std::string &filename ) {
 }
 
 
+TranslationUnitStoreStatistics
+ClangCompleter::GetTranslationUnitStoreStatistics() {
+  return translation_unit_store_.GetStatistics();
+}
+
+
+UnsavedFilesSnapshot ClangCompleter::UpdateUnsavedFiles(
+  std::vector< UnsavedFile > &unsaved_files ) {
+  return unsaved_file_store_.Update( unsaved_files );
+}
+
+
 } // namespace YouCompleteMe
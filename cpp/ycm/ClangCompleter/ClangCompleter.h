@@ -22,6 +22,7 @@
 #include "Documentation.h"
 #include "TranslationUnitStore.h"
 #include "UnsavedFile.h"
+#include "UnsavedFileStore.h"
 
 #include <string>
 
@@ -40,12 +41,22 @@ using CompletionDatas = std::vector< CompletionData >;
 class ClangCompleter {
 public:
   YCM_EXPORT ClangCompleter();
+  // See TranslationUnitStore for the meaning of |max_units|,
+  // |max_memory_usage|, and |preamble_cache_directory|.
+  YCM_EXPORT ClangCompleter(
+    std::size_t max_units,
+    std::size_t max_memory_usage,
+    const std::string &preamble_cache_directory = std::string() );
   YCM_EXPORT ~ClangCompleter();
   ClangCompleter( const ClangCompleter& ) = delete;
   ClangCompleter& operator=( const ClangCompleter& ) = delete;
 
   bool UpdatingTranslationUnit( const std::string &filename );
 
+  // Returns true if a translation unit, valid or being created, is stored for
+  // |filename|.
+  YCM_EXPORT bool HasTranslationUnit( const std::string &filename );
+
   YCM_EXPORT std::vector< Diagnostic > UpdateTranslationUnit(
     const std::string &translation_unit,
     const std::vector< UnsavedFile > &unsaved_files,
@@ -124,6 +135,14 @@ public:
 
   void DeleteCachesForFile( const std::string &filename );
 
+  YCM_EXPORT TranslationUnitStoreStatistics GetTranslationUnitStoreStatistics();
+
+  // Returns the unsaved files to pass to the other methods. Only the files that
+  // changed since the last call need to have their contents set; see
+  // UnsavedFileStore::Update.
+  YCM_EXPORT UnsavedFilesSnapshot UpdateUnsavedFiles(
+    std::vector< UnsavedFile > &unsaved_files );
+
 private:
 
   /////////////////////////////
@@ -133,6 +152,8 @@ private:
   CXIndex clang_index_;
 
   TranslationUnitStore translation_unit_store_;
+
+  UnsavedFileStore unsaved_file_store_;
 };
 
 } // namespace YouCompleteMe
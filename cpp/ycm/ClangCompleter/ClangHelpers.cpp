@@ -23,6 +23,7 @@
 #include "UnsavedFile.h"
 #include "Utils.h"
 
+#include <functional>
 #include <unordered_map>
 #include <utility>
 
@@ -204,6 +205,27 @@ std::vector< CXUnsavedFile > ToCXUnsavedFiles(
 }
 
 
+void EnsureCompilerNamePresent( std::vector< const char * > &flags ) {
+  bool no_compiler_name_set = !flags.empty() && flags.front()[ 0 ] == '-';
+
+  if ( flags.empty() || no_compiler_name_set ) {
+    flags.insert( flags.begin(), "clang" );
+  }
+}
+
+
+std::size_t HashForFlags( const std::vector< std::string > &flags ) {
+  // The algorithm has been taken straight from a TR1:
+  // "Library Extension Technical Report - Issue List" section 6.18.
+  // This is also the way Boost implements it.
+  size_t seed = 0;
+  for ( const auto &flag : flags )  {
+    seed ^= std::hash< std::string >()( flag ) + ( seed << 6 ) + ( seed >> 2 );
+  }
+  return seed;
+}
+
+
 std::vector< CompletionData > ToCompletionDataVector(
   CXCodeCompleteResults *results ) {
   std::vector< CompletionData > completions;
@@ -24,6 +24,7 @@
 
 #include <clang-c/Index.h>
 #include <memory>
+#include <string>
 #include <vector>
 
 namespace YouCompleteMe {
@@ -42,6 +43,11 @@ std::vector< CXUnsavedFile > ToCXUnsavedFiles(
 Diagnostic BuildDiagnostic( const DiagnosticWrap &diagnostic_wrap,
                             CXTranslationUnit translation_unit );
 
+// Inserts a compiler name at the start of |flags| if there is none.
+void EnsureCompilerNamePresent( std::vector< const char * > &flags );
+
+std::size_t HashForFlags( const std::vector< std::string > &flags );
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: CLANGHELPERS_H_T3ME71LG */
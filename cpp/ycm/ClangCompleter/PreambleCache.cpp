@@ -0,0 +1,488 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "PreambleCache.h"
+#include "ClangHelpers.h"
+#include "ClangUtils.h"
+#include "Utils.h"
+
+#include <algorithm>
+#include <boost/filesystem/fstream.hpp>
+#include <clang-c/Index.h>
+#include <memory>
+#include <sstream>
+#include <type_traits>
+
+using std::lock_guard;
+using std::mutex;
+using std::remove_pointer;
+using std::shared_ptr;
+using std::chrono::steady_clock;
+
+namespace YouCompleteMe {
+
+namespace {
+
+using TranslationUnitWrap =
+  shared_ptr< remove_pointer< CXTranslationUnit >::type >;
+
+const char *const PCH_EXTENSION = ".pch";
+const char *const DEPENDENCIES_EXTENSION = ".deps";
+const std::chrono::seconds UP_TO_DATE_CHECK_INTERVAL( 1 );
+// Time after which a prefix that could not be parsed is tried again.
+const std::time_t FAILED_PARSE_RETRY_INTERVAL = 60;
+
+
+bool StartsWith( const std::string &text, const std::string &prefix ) {
+  return text.compare( 0, prefix.size(), prefix ) == 0;
+}
+
+
+std::string Trim( const std::string &text ) {
+  const char *const whitespace = " \t\r\n";
+  size_t start = text.find_first_not_of( whitespace );
+  if ( start == std::string::npos ) {
+    return std::string();
+  }
+  size_t end = text.find_last_not_of( whitespace );
+  return text.substr( start, end - start + 1 );
+}
+
+
+std::string FileContents( const std::string &filename,
+                          const std::vector< UnsavedFile > &unsaved_files ) {
+  for ( const UnsavedFile &unsaved_file : unsaved_files ) {
+    if ( unsaved_file.filename_ == filename ) {
+      return unsaved_file.contents_.substr( 0, unsaved_file.length_ );
+    }
+  }
+  return ReadUtf8File( filename );
+}
+
+
+// Writes |contents| to a temporary file then renames it to |filepath| so that
+// other servers sharing the cache directory never read a partial file.
+bool WriteFileAtomically( const fs::path &filepath,
+                          const std::string &contents ) {
+  fs::path temporary_path = filepath.parent_path() / fs::unique_path();
+  {
+    fs::ofstream file( temporary_path, std::ios::out | std::ios::binary );
+    file << contents;
+    if ( !file ) {
+      return false;
+    }
+  }
+  boost::system::error_code error;
+  fs::rename( temporary_path, filepath, error );
+  if ( error ) {
+    fs::remove( temporary_path, error );
+    return false;
+  }
+  return true;
+}
+
+
+// Returns true if one of |filepaths| was modified at or after |time|. File
+// times have a resolution of a second on some file systems so a file modified
+// during the same second is considered more recent.
+bool ModifiedSince( const std::vector< std::string > &filepaths,
+                    std::time_t time ) {
+  boost::system::error_code error;
+  for ( const std::string &filepath : filepaths ) {
+    std::time_t filepath_time = fs::last_write_time( filepath, error );
+    if ( error || filepath_time >= time ) {
+      return true;
+    }
+  }
+  return false;
+}
+
+
+bool HasUnsavedChanges( const UnsavedFile &unsaved_file ) {
+  try {
+    std::string contents = ReadUtf8File( unsaved_file.filename_ );
+    return unsaved_file.contents_.compare(
+             0, unsaved_file.length_, contents ) != 0;
+  } catch ( const fs::filesystem_error & ) {
+    return true;
+  }
+}
+
+
+void CollectInclusion( CXFile included_file,
+                       CXSourceLocation*,
+                       unsigned,
+                       CXClientData client_data ) {
+  static_cast< std::vector< std::string > * >( client_data )->push_back(
+    NormalizePath( CXFileToFilepath( included_file ) ).string() );
+}
+
+}  // unnamed namespace
+
+
+std::string IncludePrefix( const std::string &contents ) {
+  std::istringstream stream( contents );
+  std::string line;
+  std::string prefix;
+  bool in_comment = false;
+
+  while ( std::getline( stream, line ) ) {
+    std::string text = Trim( line );
+
+    if ( in_comment ) {
+      size_t comment_end = text.find( "*/" );
+      if ( comment_end == std::string::npos ) {
+        continue;
+      }
+      in_comment = false;
+      text = Trim( text.substr( comment_end + 2 ) );
+    }
+
+    if ( StartsWith( text, "/*" ) ) {
+      size_t comment_end = text.find( "*/", 2 );
+      if ( comment_end == std::string::npos ) {
+        in_comment = true;
+        continue;
+      }
+      text = Trim( text.substr( comment_end + 2 ) );
+    }
+
+    if ( text.empty() || StartsWith( text, "//" ) ) {
+      continue;
+    }
+
+    if ( text[ 0 ] != '#' ) {
+      break;
+    }
+
+    std::string directive = Trim( text.substr( 1 ) );
+    if ( StartsWith( directive, "include" ) ||
+         StartsWith( directive, "import" ) ) {
+      prefix += "#" + directive + "\n";
+      continue;
+    }
+
+    if ( StartsWith( directive, "pragma" ) &&
+         Trim( directive.substr( 6 ) ) == "once" ) {
+      continue;
+    }
+
+    break;
+  }
+
+  return prefix;
+}
+
+
+PreambleCache::PreambleCache( CXIndex clang_index,
+                              const std::string &cache_directory )
+  : clang_index_( clang_index ),
+    cache_directory_( cache_directory ) {
+}
+
+
+std::vector< std::string > PreambleCache::FlagsWithPreamble(
+  const std::string &filename,
+  const std::vector< UnsavedFile > &unsaved_files,
+  const std::vector< std::string > &flags,
+  std::string &pch_path ) {
+  try {
+    return FlagsWithPreambleOrThrow( filename, unsaved_files, flags, pch_path );
+  } catch ( const std::exception & ) {
+    pch_path.clear();
+    return flags;
+  }
+}
+
+
+std::vector< std::string > PreambleCache::FlagsWithPreambleOrThrow(
+  const std::string &filename,
+  const std::vector< UnsavedFile > &unsaved_files,
+  const std::vector< std::string > &flags,
+  std::string &pch_path ) {
+  pch_path.clear();
+
+  // The file is already compiled with a PCH.
+  if ( std::find( flags.begin(), flags.end(), "-include-pch" ) !=
+       flags.end() ) {
+    return flags;
+  }
+
+  std::string prefix;
+  try {
+    prefix = IncludePrefix( FileContents( filename, unsaved_files ) );
+  } catch ( const fs::filesystem_error & ) {
+    return flags;
+  }
+
+  if ( prefix.empty() ) {
+    return flags;
+  }
+
+  fs::path path( filename );
+  std::vector< std::string > preamble_flags( flags );
+  // Quoted includes are searched in the directory of the file first. Since the
+  // PCH is built from a file in the cache directory, add it to the search
+  // paths.
+  if ( prefix.find( '"' ) != std::string::npos ) {
+    preamble_flags.push_back( "-iquote" );
+    preamble_flags.push_back( path.parent_path().string() );
+  }
+
+  // The PCH can only be loaded with the same language, flags, and version of
+  // Clang it was built with.
+  std::vector< std::string > key( preamble_flags );
+  key.push_back( prefix );
+  key.push_back( path.extension().string() );
+  key.push_back( ClangVersion() );
+  std::ostringstream key_hash;
+  key_hash << std::hex << HashForFlags( key );
+  fs::path base_path = fs::path( cache_directory_ ) / key_hash.str();
+  std::string preamble_path = base_path.string() + PCH_EXTENSION;
+
+  {
+    lock_guard< mutex > lock( build_mutex_ );
+
+    if ( BuildFailedNoLock( preamble_path ) ) {
+      return flags;
+    }
+
+    std::vector< std::string > dependencies;
+    if ( !IsUpToDate( preamble_path ) &&
+         !BuildNoLock( base_path.string() + path.extension().string(),
+                       preamble_path,
+                       prefix,
+                       preamble_flags,
+                       dependencies ) ) {
+      FailedBuild &failed_build = failed_builds_[ preamble_path ];
+      failed_build.time_ = std::time( nullptr );
+      failed_build.dependencies_ = std::move( dependencies );
+      return flags;
+    }
+  }
+
+  if ( HasUnsavedDependencies( preamble_path, filename, unsaved_files ) ) {
+    return flags;
+  }
+
+  preamble_flags.push_back( "-include-pch" );
+  preamble_flags.push_back( preamble_path );
+  pch_path = preamble_path;
+  return preamble_flags;
+}
+
+
+bool PreambleCache::IsUpToDate( const std::string &pch_path ) {
+  boost::system::error_code error;
+  std::time_t pch_time = fs::last_write_time( pch_path, error );
+  if ( error ) {
+    return false;
+  }
+
+  std::vector< std::string > dependencies = Dependencies( pch_path );
+  if ( dependencies.empty() ) {
+    return false;
+  }
+
+  return !ModifiedSince( dependencies, pch_time );
+}
+
+
+bool PreambleCache::IsUsable(
+  const std::string &pch_path,
+  const std::string &filename,
+  const std::vector< UnsavedFile > &unsaved_files ) {
+  if ( HasUnsavedDependencies( pch_path, filename, unsaved_files ) ) {
+    return false;
+  }
+
+  steady_clock::time_point now = steady_clock::now();
+  {
+    lock_guard< mutex > lock( up_to_date_time_mutex_ );
+    auto up_to_date_time = pch_path_to_up_to_date_time_.find( pch_path );
+    if ( up_to_date_time != pch_path_to_up_to_date_time_.end() &&
+         now - up_to_date_time->second < UP_TO_DATE_CHECK_INTERVAL ) {
+      return true;
+    }
+  }
+
+  if ( !IsUpToDate( pch_path ) ) {
+    return false;
+  }
+
+  lock_guard< mutex > lock( up_to_date_time_mutex_ );
+  pch_path_to_up_to_date_time_[ pch_path ] = now;
+  return true;
+}
+
+
+bool PreambleCache::HasUnsavedDependencies(
+  const std::string &pch_path,
+  const std::string &filename,
+  const std::vector< UnsavedFile > &unsaved_files ) {
+  // The PCH is built from the files on disk so it can't be used if one of the
+  // files it includes has unsaved changes.
+  std::vector< std::string > dependencies;
+  bool dependencies_loaded = false;
+  for ( const UnsavedFile &unsaved_file : unsaved_files ) {
+    if ( unsaved_file.filename_ == filename ) {
+      continue;
+    }
+    if ( !dependencies_loaded ) {
+      dependencies = Dependencies( pch_path );
+      dependencies_loaded = true;
+    }
+    if ( std::find( dependencies.begin(),
+                    dependencies.end(),
+                    NormalizePath( unsaved_file.filename_ ).string() ) !=
+         dependencies.end() &&
+         HasUnsavedChanges( unsaved_file ) ) {
+      return true;
+    }
+  }
+  return false;
+}
+
+
+bool PreambleCache::BuildFailedNoLock( const std::string &pch_path ) {
+  auto failed_build = failed_builds_.find( pch_path );
+  if ( failed_build == failed_builds_.end() ) {
+    return false;
+  }
+
+  const FailedBuild &build = failed_build->second;
+  bool retry = build.dependencies_.empty()
+               ? std::time( nullptr ) - build.time_ >=
+                 FAILED_PARSE_RETRY_INTERVAL
+               : ModifiedSince( build.dependencies_, build.time_ );
+  if ( retry ) {
+    failed_builds_.erase( failed_build );
+  }
+  return !retry;
+}
+
+
+std::vector< std::string > PreambleCache::Dependencies(
+  const std::string &pch_path ) {
+  lock_guard< mutex > lock( dependencies_mutex_ );
+  auto dependencies = pch_path_to_dependencies_.find( pch_path );
+  if ( dependencies != pch_path_to_dependencies_.end() ) {
+    return dependencies->second;
+  }
+
+  // The PCH was built by a previous server.
+  std::vector< std::string > &loaded_dependencies =
+    pch_path_to_dependencies_[ pch_path ];
+  try {
+    std::istringstream stream(
+      ReadUtf8File( pch_path + DEPENDENCIES_EXTENSION ) );
+    std::string dependency;
+    while ( std::getline( stream, dependency ) ) {
+      if ( !dependency.empty() ) {
+        loaded_dependencies.push_back( dependency );
+      }
+    }
+  } catch ( const fs::filesystem_error & ) {
+  }
+  return loaded_dependencies;
+}
+
+
+bool PreambleCache::BuildNoLock( const std::string &source_path,
+                                 const std::string &pch_path,
+                                 const std::string &prefix,
+                                 const std::vector< std::string > &flags,
+                                 std::vector< std::string > &dependencies ) {
+  boost::system::error_code error;
+  fs::create_directories( cache_directory_, error );
+  if ( error || !WriteFileAtomically( source_path, prefix ) ) {
+    return false;
+  }
+
+  std::vector< const char * > pointer_flags;
+  pointer_flags.reserve( flags.size() );
+
+  for ( const std::string &flag : flags ) {
+    pointer_flags.push_back( flag.c_str() );
+  }
+
+  EnsureCompilerNamePresent( pointer_flags );
+
+  CXTranslationUnit clang_translation_unit = nullptr;
+  CXErrorCode failure = clang_parseTranslationUnit2FullArgv(
+                          clang_index_,
+                          source_path.c_str(),
+                          &pointer_flags[ 0 ],
+                          pointer_flags.size(),
+                          nullptr,
+                          0,
+                          CXTranslationUnit_Incomplete |
+                          CXTranslationUnit_ForSerialization,
+                          &clang_translation_unit );
+  if ( failure != CXError_Success ) {
+    return false;
+  }
+  // Disposed even if collecting the inclusions throws.
+  TranslationUnitWrap translation_unit( clang_translation_unit,
+                                        clang_disposeTranslationUnit );
+
+  dependencies.clear();
+  clang_getInclusions( translation_unit.get(),
+                       CollectInclusion,
+                       &dependencies );
+  // The file containing the prefix is only modified when the PCH is rebuilt.
+  dependencies.erase( std::remove( dependencies.begin(),
+                                   dependencies.end(),
+                                   NormalizePath( source_path ).string() ),
+                      dependencies.end() );
+
+  // Saving fails if there are errors in the prefix.
+  fs::path temporary_path = fs::path( cache_directory_ ) / fs::unique_path();
+  int save_error = clang_saveTranslationUnit(
+                     translation_unit.get(),
+                     temporary_path.string().c_str(),
+                     clang_defaultSaveOptions( translation_unit.get() ) );
+  translation_unit.reset();
+  if ( save_error != CXSaveError_None ) {
+    fs::remove( temporary_path, error );
+    return false;
+  }
+
+  std::string dependencies_contents;
+  for ( const std::string &dependency : dependencies ) {
+    dependencies_contents += dependency + "\n";
+  }
+
+  // Write the dependencies first so that the PCH is never used without them.
+  if ( !WriteFileAtomically( pch_path + DEPENDENCIES_EXTENSION,
+                             dependencies_contents ) ) {
+    fs::remove( temporary_path, error );
+    return false;
+  }
+
+  fs::rename( temporary_path, pch_path, error );
+  if ( error ) {
+    fs::remove( temporary_path, error );
+    return false;
+  }
+
+  lock_guard< mutex > lock( dependencies_mutex_ );
+  pch_path_to_dependencies_[ pch_path ] = dependencies;
+  return true;
+}
+
+} // namespace YouCompleteMe
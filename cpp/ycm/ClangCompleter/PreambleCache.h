@@ -0,0 +1,135 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#ifndef PREAMBLECACHE_H_XR4BNW7D
+#define PREAMBLECACHE_H_XR4BNW7D
+
+#include "UnsavedFile.h"
+
+#include <chrono>
+#include <ctime>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+using CXIndex = void*;
+
+namespace YouCompleteMe {
+
+// Returns the #include and #import directives at the top of |contents|, one
+// per line. Blank lines, comments and #pragma once directives between them
+// are ignored. Stops at the first line that is none of these.
+YCM_EXPORT std::string IncludePrefix( const std::string &contents );
+
+
+// Shares the include prefix of files, usually the most expensive part to
+// parse, between the TUs with identical flags. The prefix is compiled once
+// into a precompiled header (PCH) stored in |cache_directory| and reused by all
+// the TUs whose flags and include prefix are the same, including after a
+// restart of the server. A PCH is rebuilt when one of the files it includes is
+// modified.
+//
+// The headers of the prefix are included a second time when parsing the file
+// itself so they must be protected by include guards or #pragma once, which is
+// the case for almost all headers.
+class PreambleCache {
+public:
+  YCM_EXPORT PreambleCache( CXIndex clang_index,
+                            const std::string &cache_directory );
+  PreambleCache( const PreambleCache& ) = delete;
+  PreambleCache& operator=( const PreambleCache& ) = delete;
+
+  // Returns |flags| with the options needed to include the PCH of the include
+  // prefix of |filename|, building the PCH if needed, and sets |pch_path| to
+  // the path of the PCH. Returns |flags| unchanged and sets |pch_path| to an
+  // empty string if the file has no include prefix or if the PCH cannot be
+  // built or used. Never throws.
+  YCM_EXPORT std::vector< std::string > FlagsWithPreamble(
+    const std::string &filename,
+    const std::vector< UnsavedFile > &unsaved_files,
+    const std::vector< std::string > &flags,
+    std::string &pch_path );
+
+  // Returns true if none of the files included by the PCH |pch_path| was
+  // modified after it was built. Doesn't wait for PCHs being built.
+  YCM_EXPORT bool IsUpToDate( const std::string &pch_path );
+
+  // Returns true if the PCH |pch_path| used to parse |filename| can still be
+  // used with |unsaved_files|, i.e. none of the files it includes has unsaved
+  // changes and it is up to date. Since checking that the PCH is up to date
+  // requires reading the modification times of all the files it includes, a
+  // PCH found up to date is not checked again for a second.
+  YCM_EXPORT bool IsUsable( const std::string &pch_path,
+                            const std::string &filename,
+                            const std::vector< UnsavedFile > &unsaved_files );
+
+private:
+  struct FailedBuild {
+    std::time_t time_;
+    // Files included by the prefix, if it could be parsed.
+    std::vector< std::string > dependencies_;
+  };
+
+  // Same as FlagsWithPreamble but may throw, e.g. if a path cannot be
+  // normalized.
+  std::vector< std::string > FlagsWithPreambleOrThrow(
+    const std::string &filename,
+    const std::vector< UnsavedFile > &unsaved_files,
+    const std::vector< std::string > &flags,
+    std::string &pch_path );
+
+  // Returns the files included by the PCH |pch_path|.
+  std::vector< std::string > Dependencies( const std::string &pch_path );
+
+  bool HasUnsavedDependencies(
+    const std::string &pch_path,
+    const std::string &filename,
+    const std::vector< UnsavedFile > &unsaved_files );
+
+  // Must be called with |build_mutex_| held. Returns true if the build of
+  // |pch_path| failed and none of the files it depends on was modified since.
+  bool BuildFailedNoLock( const std::string &pch_path );
+
+  // Must be called with |build_mutex_| held. Sets |dependencies| to the files
+  // included by |prefix| if it could be parsed, even if the build fails.
+  bool BuildNoLock( const std::string &source_path,
+                    const std::string &pch_path,
+                    const std::string &prefix,
+                    const std::vector< std::string > &flags,
+                    std::vector< std::string > &dependencies );
+
+  CXIndex clang_index_;
+  std::string cache_directory_;
+  std::unordered_map< std::string, std::vector< std::string > >
+    pch_path_to_dependencies_;
+  std::mutex dependencies_mutex_;
+  // PCHs that failed to build, e.g. because of an error in the prefix. They
+  // are only tried again once one of the files they include is modified or,
+  // if the prefix could not be parsed, after a while.
+  std::unordered_map< std::string, FailedBuild > failed_builds_;
+  // PCHs are built one at a time.
+  std::mutex build_mutex_;
+  // When the PCHs were last found up to date by IsUsable.
+  std::unordered_map< std::string, std::chrono::steady_clock::time_point >
+    pch_path_to_up_to_date_time_;
+  std::mutex up_to_date_time_mutex_;
+};
+
+} // namespace YouCompleteMe
+
+#endif  // PREAMBLECACHE_H_XR4BNW7D
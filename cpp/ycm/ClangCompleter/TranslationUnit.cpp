@@ -50,27 +50,35 @@ unsigned ReparseOptions( CXTranslationUnit translationUnit ) {
 }
 
 
+// Computed with the same algorithm as HashForFlags.
+std::size_t UnsavedFilesFingerprint(
+  const std::vector< UnsavedFile > &unsaved_files ) {
+  std::hash< std::string > hash;
+  size_t seed = 0;
+  for ( const UnsavedFile &unsaved_file : unsaved_files ) {
+    seed ^= hash( unsaved_file.filename_ ) + ( seed << 6 ) + ( seed >> 2 );
+    seed ^= hash( unsaved_file.contents_ ) + ( seed << 6 ) + ( seed >> 2 );
+  }
+  return seed;
+}
+
+
 unsigned CompletionOptions() {
   return clang_defaultCodeCompleteOptions() |
          CXCodeComplete_IncludeBriefComments |
          CXCodeComplete_IncludeCompletionsWithFixIts;
 }
 
-void EnsureCompilerNamePresent( std::vector< const char * > &flags ) {
-  bool no_compiler_name_set = !flags.empty() && flags.front()[ 0 ] == '-';
-
-  if ( flags.empty() || no_compiler_name_set ) {
-    flags.insert( flags.begin(), "clang" );
-  }
-}
-
 }  // unnamed namespace
 
 using CodeCompleteResultsWrap =
   shared_ptr< remove_pointer< CXCodeCompleteResults >::type >;
 
 TranslationUnit::TranslationUnit()
-  : clang_translation_unit_( nullptr ) {
+  : clang_translation_unit_( nullptr ),
+    unsaved_files_fingerprint_( 0 ),
+    unsaved_files_fingerprint_is_valid_( false ),
+    memory_usage_( 0 ) {
 }
 
 TranslationUnit::TranslationUnit(
@@ -78,7 +86,10 @@ TranslationUnit::TranslationUnit(
   const std::vector< UnsavedFile > &unsaved_files,
   const std::vector< std::string > &flags,
   CXIndex clang_index )
-  : clang_translation_unit_( nullptr ) {
+  : clang_translation_unit_( nullptr ),
+    unsaved_files_fingerprint_( UnsavedFilesFingerprint( unsaved_files ) ),
+    unsaved_files_fingerprint_is_valid_( true ),
+    memory_usage_( 0 ) {
   std::vector< const char * > pointer_flags;
   pointer_flags.reserve( flags.size() );
 
@@ -106,6 +117,8 @@ TranslationUnit::TranslationUnit(
   if ( failure != CXError_Success ) {
     throw ClangParseError( failure );
   }
+
+  UpdateMemoryUsage();
 }
 
 
@@ -119,6 +132,7 @@ void TranslationUnit::Destroy() {
   if ( clang_translation_unit_ ) {
     clang_disposeTranslationUnit( clang_translation_unit_ );
     clang_translation_unit_ = nullptr;
+    memory_usage_ = 0;
   }
 }
 
@@ -135,12 +149,17 @@ bool TranslationUnit::IsCurrentlyUpdating() const {
 }
 
 
+std::size_t TranslationUnit::EstimatedMemoryUsage() const {
+  return memory_usage_;
+}
+
+
 std::vector< Diagnostic > TranslationUnit::Reparse(
   const std::vector< UnsavedFile > &unsaved_files ) {
   std::vector< CXUnsavedFile > cxunsaved_files =
     ToCXUnsavedFiles( unsaved_files );
 
-  Reparse( cxunsaved_files );
+  Reparse( cxunsaved_files, UnsavedFilesFingerprint( unsaved_files ) );
 
   unique_lock< mutex > lock( diagnostics_mutex_ );
   return latest_diagnostics_;
@@ -158,6 +177,10 @@ std::vector< CompletionData > TranslationUnit::CandidatesForLocation(
     return std::vector< CompletionData >();
   }
 
+  // Code completion parses the unsaved files into the TU so the next query must
+  // reparse it.
+  unsaved_files_fingerprint_is_valid_ = false;
+
   std::vector< CXUnsavedFile > cxunsaved_files =
     ToCXUnsavedFiles( unsaved_files );
   const CXUnsavedFile *unsaved = cxunsaved_files.empty()
@@ -211,7 +234,7 @@ Location TranslationUnit::GetDeclarationLocation(
   const std::vector< UnsavedFile > &unsaved_files,
   bool reparse ) {
   if ( reparse ) {
-    Reparse( unsaved_files );
+    ReparseIfChanged( unsaved_files );
   }
 
   unique_lock< mutex > lock( clang_access_mutex_ );
@@ -246,7 +269,7 @@ Location TranslationUnit::GetDefinitionLocation(
   const std::vector< UnsavedFile > &unsaved_files,
   bool reparse ) {
   if ( reparse ) {
-    Reparse( unsaved_files );
+    ReparseIfChanged( unsaved_files );
   }
 
   unique_lock< mutex > lock( clang_access_mutex_ );
@@ -271,7 +294,7 @@ Location TranslationUnit::GetDefinitionOrDeclarationLocation(
   const std::vector< UnsavedFile > &unsaved_files,
   bool reparse ) {
   if ( reparse ) {
-    Reparse( unsaved_files );
+    ReparseIfChanged( unsaved_files );
   }
 
   unique_lock< mutex > lock( clang_access_mutex_ );
@@ -313,7 +336,7 @@ std::string TranslationUnit::GetTypeAtLocation(
   bool reparse ) {
 
   if ( reparse ) {
-    Reparse( unsaved_files );
+    ReparseIfChanged( unsaved_files );
   }
 
   unique_lock< mutex > lock( clang_access_mutex_ );
@@ -393,7 +416,7 @@ std::string TranslationUnit::GetEnclosingFunctionAtLocation(
   bool reparse ) {
 
   if ( reparse ) {
-    Reparse( unsaved_files );
+    ReparseIfChanged( unsaved_files );
   }
 
   unique_lock< mutex > lock( clang_access_mutex_ );
@@ -420,24 +443,11 @@ std::string TranslationUnit::GetEnclosingFunctionAtLocation(
   return parent_str;
 }
 
-// Argument taken as non-const ref because we need to be able to pass a
-// non-const pointer to clang. This function (and clang too) will not modify the
-// param though.
-void TranslationUnit::Reparse(
-  std::vector< CXUnsavedFile > &unsaved_files ) {
-  unsigned options = ( clang_translation_unit_
-                       ? ReparseOptions( clang_translation_unit_ )
-                       : static_cast<unsigned>( CXReparse_None ) );
-
-  Reparse( unsaved_files, options );
-}
-
-
 // Argument taken as non-const ref because we need to be able to pass a
 // non-const pointer to clang. This function (and clang too) will not modify the
 // param though.
 void TranslationUnit::Reparse( std::vector< CXUnsavedFile > &unsaved_files,
-                               size_t parse_options ) {
+                               std::size_t unsaved_files_fingerprint ) {
   CXErrorCode failure;
   {
     unique_lock< mutex > lock( clang_access_mutex_ );
@@ -446,6 +456,8 @@ void TranslationUnit::Reparse( std::vector< CXUnsavedFile > &unsaved_files,
       return;
     }
 
+    unsigned parse_options = ReparseOptions( clang_translation_unit_ );
+
     CXUnsavedFile *unsaved = unsaved_files.empty()
                              ? nullptr : &unsaved_files[ 0 ];
 
@@ -456,6 +468,14 @@ void TranslationUnit::Reparse( std::vector< CXUnsavedFile > &unsaved_files,
                                     unsaved_files.size(),
                                     unsaved,
                                     parse_options ) );
+
+    if ( failure == CXError_Success ) {
+      UpdateMemoryUsage();
+      unsaved_files_fingerprint_ = unsaved_files_fingerprint;
+      unsaved_files_fingerprint_is_valid_ = true;
+    } else {
+      unsaved_files_fingerprint_is_valid_ = false;
+    }
   }
 
   if ( failure != CXError_Success ) {
@@ -466,6 +486,41 @@ void TranslationUnit::Reparse( std::vector< CXUnsavedFile > &unsaved_files,
   UpdateLatestDiagnostics();
 }
 
+
+void TranslationUnit::ReparseIfChanged(
+  const std::vector< UnsavedFile > &unsaved_files ) {
+  std::size_t unsaved_files_fingerprint =
+    UnsavedFilesFingerprint( unsaved_files );
+  {
+    unique_lock< mutex > lock( clang_access_mutex_ );
+
+    if ( unsaved_files_fingerprint_is_valid_ &&
+         unsaved_files_fingerprint_ == unsaved_files_fingerprint ) {
+      return;
+    }
+  }
+
+  std::vector< CXUnsavedFile > cxunsaved_files =
+    ToCXUnsavedFiles( unsaved_files );
+
+  Reparse( cxunsaved_files, unsaved_files_fingerprint );
+}
+
+
+void TranslationUnit::UpdateMemoryUsage() {
+  // All the resources reported by libclang are memory amounts in bytes. This
+  // includes the preamble, whether it is kept in memory or memory-mapped.
+  CXTUResourceUsage usage = clang_getCXTUResourceUsage(
+                              clang_translation_unit_ );
+  std::size_t memory_usage = 0;
+  for ( unsigned i = 0; i < usage.numEntries; ++i ) {
+    memory_usage += usage.entries[ i ].amount;
+  }
+  clang_disposeCXTUResourceUsage( usage );
+  memory_usage_ = memory_usage;
+}
+
+
 void TranslationUnit::UpdateLatestDiagnostics() {
   unique_lock< mutex > lock1( clang_access_mutex_ );
   unique_lock< mutex > lock2( diagnostics_mutex_ );
@@ -517,7 +572,7 @@ std::vector< FixIt > TranslationUnit::GetFixItsForLocationInFile(
   bool reparse ) {
 
   if ( reparse ) {
-    Reparse( unsaved_files );
+    ReparseIfChanged( unsaved_files );
   }
 
   std::vector< FixIt > fixits;
@@ -560,7 +615,7 @@ DocumentationData TranslationUnit::GetDocsForLocation(
   bool reparse ) {
 
   if ( reparse ) {
-    Reparse( unsaved_files );
+    ReparseIfChanged( unsaved_files );
   }
 
   unique_lock< mutex > lock( clang_access_mutex_ );
@@ -25,6 +25,7 @@
 
 #include <clang-c/Index.h>
 
+#include <atomic>
 #include <mutex>
 #include <string>
 #include <vector>
@@ -55,9 +56,18 @@ public:
 
   YCM_EXPORT bool IsCurrentlyUpdating() const;
 
+  // Memory used by the TU in bytes, as reported by libclang after the last
+  // parse. Returns 0 for an invalid, sentinel TU.
+  YCM_EXPORT std::size_t EstimatedMemoryUsage() const;
+
   YCM_EXPORT std::vector< Diagnostic > Reparse(
     const std::vector< UnsavedFile > &unsaved_files );
 
+  // The methods below with a |reparse| parameter only reparse the TU if
+  // |unsaved_files| differ from the unsaved files of the last parse. Changes to
+  // files on disk are not taken into account; they are picked up by the next
+  // call to Reparse.
+
   YCM_EXPORT std::vector< CompletionData > CandidatesForLocation(
     const std::string &filename,
     int line,
@@ -114,14 +124,16 @@ public:
   bool LocationIsInSystemHeader( const Location &location );
 
 private:
-  void Reparse( std::vector< CXUnsavedFile > &unsaved_files );
-
   void Reparse( std::vector< CXUnsavedFile > &unsaved_files,
-                size_t parse_options );
+                std::size_t unsaved_files_fingerprint );
+
+  void ReparseIfChanged( const std::vector< UnsavedFile > &unsaved_files );
 
   void UpdateLatestDiagnostics();
 
-  // These four methods must be called under the clang_access_mutex_ lock.
+  // These five methods must be called under the clang_access_mutex_ lock.
+  void UpdateMemoryUsage();
+
   CXSourceLocation GetSourceLocation( const std::string& filename,
                                       int line,
                                       int column );
@@ -141,6 +153,14 @@ private:
 
   mutable std::mutex clang_access_mutex_;
   CXTranslationUnit clang_translation_unit_;
+
+  // Identifies the unsaved files of the last successful parse. Only valid if
+  // unsaved_files_fingerprint_is_valid_ is true. Protected by
+  // clang_access_mutex_.
+  std::size_t unsaved_files_fingerprint_;
+  bool unsaved_files_fingerprint_is_valid_;
+
+  std::atomic< std::size_t > memory_usage_;
 };
 
 } // namespace YouCompleteMe
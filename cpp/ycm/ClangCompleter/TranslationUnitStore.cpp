@@ -16,10 +16,10 @@
 // along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 #include "TranslationUnitStore.h"
+#include "ClangHelpers.h"
 #include "TranslationUnit.h"
 #include "Utils.h"
 
-#include <functional>
 
 using std::lock_guard;
 using std::shared_ptr;
@@ -28,24 +28,20 @@ using std::mutex;
 
 namespace YouCompleteMe {
 
-namespace {
 
-std::size_t HashForFlags( const std::vector< std::string > &flags ) {
-  // The algorithm has been taken straight from a TR1:
-  // "Library Extension Technical Report - Issue List" section 6.18.
-  // This is also the way Boost implements it.
-  size_t seed = 0;
-  for ( const auto &flag : flags )  {
-    seed ^= std::hash< std::string >()( flag ) + ( seed << 6 ) + ( seed >> 2 );
+TranslationUnitStore::TranslationUnitStore(
+  CXIndex clang_index,
+  std::size_t max_units,
+  std::size_t max_memory_usage,
+  const std::string &preamble_cache_directory )
+  : clang_index_( clang_index ),
+    max_units_( max_units ),
+    max_memory_usage_( max_memory_usage ),
+    num_evictions_( 0 ) {
+  if ( !preamble_cache_directory.empty() ) {
+    preamble_cache_.reset( new PreambleCache( clang_index,
+                                              preamble_cache_directory ) );
   }
-  return seed;
-}
-
-}  // unnamed namespace
-
-
-TranslationUnitStore::TranslationUnitStore( CXIndex clang_index )
-  : clang_index_( clang_index ) {
 }
 
 
@@ -69,12 +65,37 @@ shared_ptr< TranslationUnit > TranslationUnitStore::GetOrCreate(
   const std::vector< std::string > &flags,
   bool &translation_unit_created ) {
   translation_unit_created = false;
+  // Declared before the locks so that the evicted TUs are destroyed after the
+  // locks are released.
+  std::vector< shared_ptr< TranslationUnit > > evicted_units;
+
+  // Checking the PCH of the current TU may require reading many files so it is
+  // done without holding the lock.
+  std::string checked_pch_path;
+  {
+    lock_guard< mutex > lock( filename_to_translation_unit_and_flags_mutex_ );
+    checked_pch_path = FindWithDefault( filename_to_pch_path_,
+                                        filename,
+                                        std::string() );
+  }
+  bool pch_usable = checked_pch_path.empty() ||
+                    preamble_cache_->IsUsable( checked_pch_path,
+                                               filename,
+                                               unsaved_files );
+
   {
     lock_guard< mutex > lock( filename_to_translation_unit_and_flags_mutex_ );
     shared_ptr< TranslationUnit > current_unit = GetNoLock( filename );
 
+    // If the PCH changed in the meantime, the TU was just recreated.
     if ( current_unit &&
-         HashForFlags( flags ) == filename_to_flags_hash_[ filename ] ) {
+         HashForFlags( flags ) == filename_to_flags_hash_[ filename ] &&
+         ( pch_usable ||
+           FindWithDefault( filename_to_pch_path_, filename, std::string() ) !=
+           checked_pch_path ) ) {
+      TouchNoLock( filename );
+      // The memory usage of the TUs may have grown since they were reparsed.
+      EvictNoLock( evicted_units );
       return current_unit;
     }
 
@@ -88,16 +109,25 @@ shared_ptr< TranslationUnit > TranslationUnitStore::GetOrCreate(
     // We need to store the flags for the sentinel TU so that other threads end
     // up returning the sentinel TU while the real one is being created.
     filename_to_flags_hash_[ filename ] = HashForFlags( flags );
+    Erase( filename_to_pch_path_, filename );
+    TouchNoLock( filename );
   }
 
   shared_ptr< TranslationUnit > unit;
+  std::string pch_path;
 
   try {
-    unit = make_shared< TranslationUnit >( filename,
-                                           unsaved_files,
-                                           flags,
-                                           clang_index_ );
-  } catch ( const ClangParseError & ) {
+    unit = make_shared< TranslationUnit >(
+      filename,
+      unsaved_files,
+      preamble_cache_ ? preamble_cache_->FlagsWithPreamble( filename,
+                                                            unsaved_files,
+                                                            flags,
+                                                            pch_path )
+                      : flags,
+      clang_index_ );
+  } catch ( ... ) {
+    // Never leave the sentinel TU in the store.
     Remove( filename );
     throw;
   }
@@ -105,7 +135,12 @@ shared_ptr< TranslationUnit > TranslationUnitStore::GetOrCreate(
   {
     lock_guard< mutex > lock( filename_to_translation_unit_and_flags_mutex_ );
     filename_to_translation_unit_[ filename ] = unit;
+    if ( !pch_path.empty() ) {
+      filename_to_pch_path_[ filename ] = pch_path;
+    }
     // Flags have already been stored.
+    TouchNoLock( filename );
+    EvictNoLock( evicted_units );
   }
 
   translation_unit_created = true;
@@ -122,8 +157,7 @@ shared_ptr< TranslationUnit > TranslationUnitStore::Get(
 
 bool TranslationUnitStore::Remove( const std::string &filename ) {
   lock_guard< mutex > lock( filename_to_translation_unit_and_flags_mutex_ );
-  Erase( filename_to_flags_hash_, filename );
-  return Erase( filename_to_translation_unit_, filename );
+  return RemoveNoLock( filename );
 }
 
 
@@ -131,6 +165,24 @@ void TranslationUnitStore::RemoveAll() {
   lock_guard< mutex > lock( filename_to_translation_unit_and_flags_mutex_ );
   filename_to_translation_unit_.clear();
   filename_to_flags_hash_.clear();
+  filename_to_pch_path_.clear();
+  recently_used_filenames_.clear();
+  filename_to_recently_used_position_.clear();
+}
+
+
+TranslationUnitStoreStatistics TranslationUnitStore::GetStatistics() {
+  lock_guard< mutex > lock( filename_to_translation_unit_and_flags_mutex_ );
+  TranslationUnitStoreStatistics statistics;
+  statistics.num_units_ = filename_to_translation_unit_.size();
+  statistics.memory_usage_ = 0;
+  for ( const auto &filename_and_unit : filename_to_translation_unit_ ) {
+    statistics.memory_usage_ += filename_and_unit.second->EstimatedMemoryUsage();
+  }
+  statistics.max_units_ = max_units_;
+  statistics.max_memory_usage_ = max_memory_usage_;
+  statistics.num_evictions_ = num_evictions_;
+  return statistics;
 }
 
 
@@ -141,4 +193,67 @@ shared_ptr< TranslationUnit > TranslationUnitStore::GetNoLock(
                           shared_ptr< TranslationUnit >() );
 }
 
+
+bool TranslationUnitStore::RemoveNoLock( const std::string &filename ) {
+  auto position = filename_to_recently_used_position_.find( filename );
+  if ( position != filename_to_recently_used_position_.end() ) {
+    recently_used_filenames_.erase( position->second );
+    filename_to_recently_used_position_.erase( position );
+  }
+  Erase( filename_to_flags_hash_, filename );
+  Erase( filename_to_pch_path_, filename );
+  return Erase( filename_to_translation_unit_, filename );
+}
+
+
+void TranslationUnitStore::TouchNoLock( const std::string &filename ) {
+  auto position = filename_to_recently_used_position_.find( filename );
+  if ( position != filename_to_recently_used_position_.end() ) {
+    recently_used_filenames_.splice( recently_used_filenames_.begin(),
+                                     recently_used_filenames_,
+                                     position->second );
+    return;
+  }
+  recently_used_filenames_.push_front( filename );
+  filename_to_recently_used_position_[ filename ] =
+    recently_used_filenames_.begin();
+}
+
+
+void TranslationUnitStore::EvictNoLock(
+  std::vector< shared_ptr< TranslationUnit > > &evicted_units ) {
+  if ( !max_units_ && !max_memory_usage_ ) {
+    return;
+  }
+
+  std::size_t memory_usage = 0;
+  for ( const auto &filename_and_unit : filename_to_translation_unit_ ) {
+    memory_usage += filename_and_unit.second->EstimatedMemoryUsage();
+  }
+
+  auto filename = recently_used_filenames_.end();
+  while ( filename != recently_used_filenames_.begin() &&
+          ( ( max_units_ &&
+              filename_to_translation_unit_.size() > max_units_ ) ||
+            ( max_memory_usage_ && memory_usage > max_memory_usage_ ) ) ) {
+    --filename;
+    shared_ptr< TranslationUnit > unit = GetNoLock( *filename );
+
+    // If a TU is referenced by anything other than the store and |unit|, it is
+    // used by another thread. A sentinel TU is always currently updating.
+    if ( !unit || unit.use_count() > 2 || unit->IsCurrentlyUpdating() ) {
+      continue;
+    }
+
+    memory_usage -= unit->EstimatedMemoryUsage();
+    evicted_units.push_back( unit );
+    Erase( filename_to_translation_unit_, *filename );
+    Erase( filename_to_flags_hash_, *filename );
+    Erase( filename_to_pch_path_, *filename );
+    Erase( filename_to_recently_used_position_, *filename );
+    filename = recently_used_filenames_.erase( filename );
+    ++num_evictions_;
+  }
+}
+
 } // namespace YouCompleteMe
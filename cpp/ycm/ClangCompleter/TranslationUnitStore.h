@@ -18,9 +18,11 @@
 #ifndef TRANSLATIONUNITSTORE_H_NGN0MCKB
 #define TRANSLATIONUNITSTORE_H_NGN0MCKB
 
+#include "PreambleCache.h"
 #include "TranslationUnit.h"
 #include "UnsavedFile.h"
 
+#include <list>
 #include <memory>
 #include <mutex>
 #include <string>
@@ -31,9 +33,32 @@ using CXIndex = void*;
 
 namespace YouCompleteMe {
 
+struct TranslationUnitStoreStatistics {
+  std::size_t num_units_;
+  std::size_t memory_usage_;
+  std::size_t max_units_;
+  std::size_t max_memory_usage_;
+  std::size_t num_evictions_;
+};
+
+
+// Stores the TUs by filename. When the number of TUs exceeds |max_units| or
+// their estimated memory usage in bytes exceeds |max_memory_usage|, the least
+// recently used TUs are evicted. TUs currently used by another thread or being
+// created are never evicted. A limit of 0 means no limit.
+//
+// If |preamble_cache_directory| is not empty, TUs with the same flags and
+// include prefix share a precompiled header stored in that directory (see
+// PreambleCache). A TU is recreated without its precompiled header when one of
+// the files included by the header has unsaved changes, and with a new one when
+// the header is outdated.
 class TranslationUnitStore {
 public:
-  YCM_EXPORT explicit TranslationUnitStore( CXIndex clang_index );
+  YCM_EXPORT explicit TranslationUnitStore(
+    CXIndex clang_index,
+    std::size_t max_units = 0,
+    std::size_t max_memory_usage = 0,
+    const std::string &preamble_cache_directory = std::string() );
   YCM_EXPORT ~TranslationUnitStore();
   TranslationUnitStore( const TranslationUnitStore& ) = delete;
   TranslationUnitStore& operator=( const TranslationUnitStore& ) = delete;
@@ -61,21 +86,48 @@ public:
 
   void RemoveAll();
 
+  YCM_EXPORT TranslationUnitStoreStatistics GetStatistics();
+
 private:
 
-  // WARNING: This accesses filename_to_translation_unit_ without a lock!
+  // WARNING: These access filename_to_translation_unit_ without a lock!
   std::shared_ptr< TranslationUnit > GetNoLock( const std::string &filename );
 
+  bool RemoveNoLock( const std::string &filename );
+
+  // Marks the TU of |filename| as the most recently used one.
+  void TouchNoLock( const std::string &filename );
+
+  // Moves the evicted TUs to |evicted_units| so that they are destroyed after
+  // the lock is released.
+  void EvictNoLock(
+    std::vector< std::shared_ptr< TranslationUnit > > &evicted_units );
+
 
   using TranslationUnitForFilename =
     std::unordered_map< std::string, std::shared_ptr< TranslationUnit > >;
 
   using FlagsHashForFilename = std::unordered_map< std::string, std::size_t >;
 
+  using PchPathForFilename = std::unordered_map< std::string, std::string >;
+
+  // Filenames from the most to the least recently used.
+  using RecentlyUsedFilenames = std::list< std::string >;
+
+  using RecentlyUsedPositionForFilename =
+    std::unordered_map< std::string, RecentlyUsedFilenames::iterator >;
+
   CXIndex clang_index_;
+  std::size_t max_units_;
+  std::size_t max_memory_usage_;
+  std::size_t num_evictions_;
   TranslationUnitForFilename filename_to_translation_unit_;
   FlagsHashForFilename filename_to_flags_hash_;
+  PchPathForFilename filename_to_pch_path_;
+  RecentlyUsedFilenames recently_used_filenames_;
+  RecentlyUsedPositionForFilename filename_to_recently_used_position_;
   std::mutex filename_to_translation_unit_and_flags_mutex_;
+  std::unique_ptr< PreambleCache > preamble_cache_;
 };
 
 } // namespace YouCompleteMe
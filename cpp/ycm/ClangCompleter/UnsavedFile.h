@@ -18,14 +18,19 @@
 #ifndef UNSAVEDFILE_H_0GIYZQL4
 #define UNSAVEDFILE_H_0GIYZQL4
 
+#include <cstdint>
 #include <string>
 
 struct UnsavedFile {
-  UnsavedFile() : filename_( "" ), contents_( "" ), length_( 0 ) {}
+  UnsavedFile()
+    : filename_( "" ), contents_( "" ), length_( 0 ), version_( 0 ) {}
 
   std::string filename_;
   std::string contents_;
   unsigned long length_;
+  // Identifies the contents of the file, e.g. a hash. Only used by the
+  // UnsavedFileStore.
+  std::uint64_t version_;
 };
 
 
@@ -0,0 +1,86 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "UnsavedFileStore.h"
+
+#include <stdexcept>
+#include <unordered_map>
+
+using std::lock_guard;
+using std::make_shared;
+using std::mutex;
+
+namespace YouCompleteMe {
+
+UnsavedFilesSnapshot UnsavedFileStore::Update(
+  std::vector< UnsavedFile > &unsaved_files ) {
+  lock_guard< mutex > lock( unsaved_files_mutex_ );
+
+  std::unordered_map< std::string, UnsavedFile * > filename_to_stored_file;
+  if ( unsaved_files_ ) {
+    for ( UnsavedFile &stored_file : *unsaved_files_ ) {
+      filename_to_stored_file[ stored_file.filename_ ] = &stored_file;
+    }
+  }
+
+  // Look up all the stored files before modifying anything so that the store is
+  // left untouched if one is missing.
+  std::vector< UnsavedFile * > stored_files;
+  stored_files.reserve( unsaved_files.size() );
+  bool unchanged = unsaved_files_ &&
+                   unsaved_files.size() == unsaved_files_->size();
+  for ( const UnsavedFile &unsaved_file : unsaved_files ) {
+    if ( !unsaved_file.contents_.empty() ) {
+      stored_files.push_back( nullptr );
+      unchanged = false;
+      continue;
+    }
+
+    auto stored_file = filename_to_stored_file.find( unsaved_file.filename_ );
+    if ( stored_file == filename_to_stored_file.end() ||
+         stored_file->second->version_ != unsaved_file.version_ ) {
+      throw std::runtime_error( "No unsaved file stored for " +
+                                unsaved_file.filename_ + "." );
+    }
+    stored_files.push_back( stored_file->second );
+  }
+
+  if ( unchanged ) {
+    return unsaved_files_;
+  }
+
+  // When no one else uses the current snapshot, the contents of the files that
+  // didn't change are moved to the new one instead of being copied.
+  bool can_move = unsaved_files_ && unsaved_files_.use_count() == 1;
+  UnsavedFilesSnapshot updated_files =
+    make_shared< std::vector< UnsavedFile > >();
+  updated_files->reserve( unsaved_files.size() );
+  for ( size_t i = 0; i < unsaved_files.size(); ++i ) {
+    if ( !stored_files[ i ] ) {
+      updated_files->push_back( std::move( unsaved_files[ i ] ) );
+    } else if ( can_move ) {
+      updated_files->push_back( std::move( *stored_files[ i ] ) );
+    } else {
+      updated_files->push_back( *stored_files[ i ] );
+    }
+  }
+
+  unsaved_files_ = updated_files;
+  return updated_files;
+}
+
+} // namespace YouCompleteMe
@@ -0,0 +1,59 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#ifndef UNSAVEDFILESTORE_H_QP2JHVMN
+#define UNSAVEDFILESTORE_H_QP2JHVMN
+
+#include "UnsavedFile.h"
+
+#include <memory>
+#include <mutex>
+#include <vector>
+
+namespace YouCompleteMe {
+
+using UnsavedFilesSnapshot = std::shared_ptr< std::vector< UnsavedFile > >;
+
+// Keeps the unsaved files of the last request so that the contents of the files
+// that didn't change since then don't need to be sent again. Files are
+// identified by their filename and version.
+//
+// Each update returns a snapshot of the unsaved files that must not be
+// modified. It can be passed to libclang without copying the contents of the
+// files and stays valid while it is used, even if the store is updated in the
+// meantime.
+class UnsavedFileStore {
+public:
+  YCM_EXPORT UnsavedFileStore() = default;
+  UnsavedFileStore( const UnsavedFileStore& ) = delete;
+  UnsavedFileStore& operator=( const UnsavedFileStore& ) = delete;
+
+  // Replaces the stored files by |unsaved_files| and returns them. The contents
+  // of the files in |unsaved_files| are moved to the store. A file with empty
+  // contents stands for the stored file with the same filename and version; a
+  // std::runtime_error is thrown if there is none.
+  YCM_EXPORT UnsavedFilesSnapshot Update(
+    std::vector< UnsavedFile > &unsaved_files );
+
+private:
+  UnsavedFilesSnapshot unsaved_files_;
+  std::mutex unsaved_files_mutex_;
+};
+
+} // namespace YouCompleteMe
+
+#endif  // UNSAVEDFILESTORE_H_QP2JHVMN
@@ -17,11 +17,13 @@
 
 #include "IdentifierCompleter.h"
 
-#include "Candidate.h"
 #include "IdentifierUtils.h"
-#include "Result.h"
 #include "Utils.h"
 
+#include <algorithm>
+#include <future>
+#include <thread>
+
 namespace YouCompleteMe {
 
 
@@ -60,11 +62,42 @@ void IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase(
 }
 
 
+void IdentifierCompleter::RemoveIdentifiersFromDatabase(
+  std::vector< std::string > old_candidates,
+  const std::string &filetype,
+  const std::string &filepath ) {
+  identifier_database_.RemoveIdentifiers( std::move( old_candidates ),
+                                          filetype,
+                                          filepath );
+}
+
+
 void IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles(
-  const std::vector< std::string > &absolute_paths_to_tag_files ) {
-  for( const std::string & path : absolute_paths_to_tag_files ) {
-    identifier_database_.AddIdentifiers(
-      ExtractIdentifiersFromTagsFile( path ) );
+  const std::vector< std::string > &absolute_paths_to_tag_files,
+  const std::string &snapshot_directory ) {
+  // Tags files are parsed in parallel, at most one per hardware thread, and
+  // their identifiers are added to the database in the order of the files.
+  size_t max_threads = std::max( std::thread::hardware_concurrency(), 1u );
+  auto path = absolute_paths_to_tag_files.begin();
+  while ( path != absolute_paths_to_tag_files.end() ) {
+    std::vector< std::future< FiletypeIdentifierMap > > results;
+    for ( ; path != absolute_paths_to_tag_files.end() &&
+            results.size() < max_threads; ++path ) {
+      results.push_back( std::async(
+        std::launch::async,
+        [ &snapshot_directory ]( const std::string &path_to_tag_file ) {
+          if ( snapshot_directory.empty() ) {
+            return ExtractIdentifiersFromTagsFile( path_to_tag_file );
+          }
+          return ExtractIdentifiersFromTagsFileUsingSnapshot(
+            path_to_tag_file, snapshot_directory );
+        },
+        *path ) );
+    }
+
+    for ( auto &result : results ) {
+      identifier_database_.AddIdentifiers( result.get() );
+    }
   }
 }
 
@@ -80,21 +113,9 @@ std::vector< std::string > IdentifierCompleter::CandidatesForQueryAndType(
   std::string query,
   const std::string &filetype,
   const size_t max_candidates ) const {
-
-  std::vector< Result > results;
-  identifier_database_.ResultsForQueryAndType( std::move( query ),
-                                               filetype,
-                                               results,
-                                               max_candidates );
-
-  std::vector< std::string > candidates;
-  candidates.reserve( results.size() );
-
-  for ( const Result & result : results ) {
-    candidates.push_back( result.Text() );
-  }
-
-  return candidates;
+  return identifier_database_.CandidatesForQueryAndType( std::move( query ),
+                                                         filetype,
+                                                         max_candidates );
 }
 
 
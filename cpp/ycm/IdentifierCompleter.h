@@ -43,20 +43,33 @@ public:
                        const std::string &filetype,
                        const std::string &filepath );
 
-  void AddIdentifiersToDatabase(
+  YCM_EXPORT void AddIdentifiersToDatabase(
     std::vector< std::string > new_candidates,
     const std::string &filetype,
     const std::string &filepath );
 
   // Same as above, but clears all identifiers stored for the file before adding
   // new identifiers.
-  void ClearForFileAndAddIdentifiersToDatabase(
+  YCM_EXPORT void ClearForFileAndAddIdentifiersToDatabase(
     std::vector< std::string > new_candidates,
     const std::string &filetype,
     const std::string &filepath );
 
+  // Removes the given identifiers from those stored for the file. This is used
+  // with AddIdentifiersToDatabase to apply the changes between two versions of
+  // a buffer without rebuilding the whole set of identifiers for the file.
+  YCM_EXPORT void RemoveIdentifiersFromDatabase(
+    std::vector< std::string > old_candidates,
+    const std::string &filetype,
+    const std::string &filepath );
+
+  // When |snapshot_directory| is not empty, the identifiers of each tags file
+  // are read from a snapshot stored in that directory if the file didn't change
+  // since the snapshot was written. See
+  // ExtractIdentifiersFromTagsFileUsingSnapshot.
   YCM_EXPORT void AddIdentifiersToDatabaseFromTagFiles(
-    const std::vector< std::string > &absolute_paths_to_tag_files );
+    const std::vector< std::string > &absolute_paths_to_tag_files,
+    const std::string &snapshot_directory = std::string() );
 
   void AddIdentifiersToDatabaseFromBuffer(
     const std::string &buffer_contents,
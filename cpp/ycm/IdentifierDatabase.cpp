@@ -32,17 +32,35 @@ IdentifierDatabase::IdentifierDatabase()
 }
 
 
+IdentifierDatabase::~IdentifierDatabase() {
+  std::vector< const Candidate * > candidates;
+  for ( const auto& filetype_and_map : filetype_candidate_map_ ) {
+    for ( const auto& path_and_candidates : *filetype_and_map.second ) {
+      candidates.insert( candidates.end(),
+                         path_and_candidates.second->begin(),
+                         path_and_candidates.second->end() );
+    }
+  }
+  candidate_repository_.ReleaseCandidates( candidates );
+}
+
+
 void IdentifierDatabase::AddIdentifiers(
   FiletypeIdentifierMap&& filetype_identifier_map ) {
-  std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
+  std::vector< const Candidate * > unused_candidates;
+  {
+    std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
 
-  for ( auto&& filetype_and_map : filetype_identifier_map ) {
-    for ( auto&& filepath_and_identifiers : filetype_and_map.second ) {
-      AddIdentifiersNoLock( std::move( filepath_and_identifiers.second ),
-                            filetype_and_map.first,
-                            filepath_and_identifiers.first );
+    for ( auto&& filetype_and_map : filetype_identifier_map ) {
+      for ( auto&& filepath_and_identifiers : filetype_and_map.second ) {
+        AddIdentifiersNoLock( std::move( filepath_and_identifiers.second ),
+                              filetype_and_map.first,
+                              filepath_and_identifiers.first,
+                              unused_candidates );
+      }
     }
   }
+  candidate_repository_.ReleaseCandidates( unused_candidates );
 }
 
 
@@ -50,62 +68,141 @@ void IdentifierDatabase::AddIdentifiers(
   std::vector< std::string >&& new_candidates,
   const std::string &filetype,
   const std::string &filepath ) {
-  std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
-  AddIdentifiersNoLock( std::move( new_candidates ), filetype, filepath );
+  std::vector< const Candidate * > unused_candidates;
+  {
+    std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
+    AddIdentifiersNoLock( std::move( new_candidates ),
+                          filetype,
+                          filepath,
+                          unused_candidates );
+  }
+  candidate_repository_.ReleaseCandidates( unused_candidates );
+}
+
+
+void IdentifierDatabase::RemoveIdentifiers(
+  std::vector< std::string >&& old_candidates,
+  const std::string &filetype,
+  const std::string &filepath ) {
+  // The references on the looked up candidates are released along with the
+  // ones held by the database on the removed candidates.
+  std::vector< const Candidate * > unused_candidates =
+    candidate_repository_.GetCandidatesForStrings(
+      std::move( old_candidates ) );
+  size_t num_looked_up_candidates = unused_candidates.size();
+
+  {
+    std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
+    std::set< const Candidate * > &candidates =
+      GetCandidateSet( filetype, filepath );
+
+    for ( size_t i = 0; i < num_looked_up_candidates; ++i ) {
+      if ( candidates.erase( unused_candidates[ i ] ) ) {
+        unused_candidates.push_back( unused_candidates[ i ] );
+      }
+    }
+    filetype_query_matches_.erase( filetype );
+  }
+  candidate_repository_.ReleaseCandidates( unused_candidates );
 }
 
 
 void IdentifierDatabase::ClearCandidatesStoredForFile(
   const std::string &filetype,
   const std::string &filepath ) {
-  std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
-  GetCandidateSet( filetype, filepath ).clear();
+  std::vector< const Candidate * > unused_candidates;
+  {
+    std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
+    std::set< const Candidate * > &candidates =
+      GetCandidateSet( filetype, filepath );
+    unused_candidates.assign( candidates.begin(), candidates.end() );
+    candidates.clear();
+    filetype_query_matches_.erase( filetype );
+  }
+  candidate_repository_.ReleaseCandidates( unused_candidates );
 }
 
 
-void IdentifierDatabase::ResultsForQueryAndType(
+std::vector< std::string > IdentifierDatabase::CandidatesForQueryAndType(
   std::string&& query,
   const std::string &filetype,
-  std::vector< Result > &results,
-  const size_t max_results ) const {
+  const size_t max_candidates ) const {
   FiletypeCandidateMap::const_iterator it;
   {
     std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
     it = filetype_candidate_map_.find( filetype );
 
     if ( it == filetype_candidate_map_.end() ) {
-      return;
+      return std::vector< std::string >();
     }
   }
-  Word query_object( std::move( query ) );
-
-  std::unordered_set< const Candidate * > seen_candidates;
-  seen_candidates.reserve( candidate_repository_.NumStoredCandidates() );
+  std::shared_ptr< Word > query_object =
+    std::make_shared< Word >( std::move( query ) );
 
+  std::vector< Result > results;
+  std::vector< const Candidate * > matches;
   {
     std::lock_guard< std::mutex > locker( filetype_candidate_map_mutex_ );
-    for ( const auto& path_and_candidates : *it->second ) {
-      for ( const Candidate * candidate : *path_and_candidates.second ) {
-        if ( ContainsKey( seen_candidates, candidate ) ) {
-          continue;
-        }
-        seen_candidates.insert( candidate );
-
-        if ( candidate->IsEmpty() ||
-             !candidate->ContainsBytes( query_object ) ) {
-          continue;
-        }
-
-        Result result = candidate->QueryMatchResult( query_object );
+    QueryMatches &query_matches = filetype_query_matches_[ filetype ];
 
-        if ( result.IsSubsequence() ) {
-          results.push_back( result );
+    if ( query_matches.query &&
+         query_object->StartsWith( *query_matches.query ) ) {
+      for ( const Candidate * candidate : query_matches.candidates ) {
+        AddResultIfMatching( candidate, *query_object, results, matches );
+      }
+    } else {
+      std::unordered_set< const Candidate * > seen_candidates;
+      seen_candidates.reserve( candidate_repository_.NumStoredCandidates() );
+
+      for ( const auto& path_and_candidates : *it->second ) {
+        for ( const Candidate * candidate : *path_and_candidates.second ) {
+          if ( ContainsKey( seen_candidates, candidate ) ) {
+            continue;
+          }
+          seen_candidates.insert( candidate );
+
+          AddResultIfMatching( candidate, *query_object, results, matches );
         }
       }
     }
+
+    query_matches.query = query_object;
+    query_matches.candidates = matches;
+
+    // The matches may be removed from the database once the lock is released.
+    candidate_repository_.AcquireCandidates( matches );
+  }
+
+  PartialSort( results, max_candidates );
+
+  std::vector< std::string > candidates;
+  candidates.reserve( results.size() );
+
+  for ( const Result & result : results ) {
+    candidates.push_back( result.Text() );
   }
 
-  PartialSort( results, max_results );
+  candidate_repository_.ReleaseCandidates( matches );
+
+  return candidates;
+}
+
+
+void IdentifierDatabase::AddResultIfMatching(
+  const Candidate *candidate,
+  const Word &query,
+  std::vector< Result > &results,
+  std::vector< const Candidate * > &matches ) {
+  if ( candidate->IsEmpty() || !candidate->ContainsBytes( query ) ) {
+    return;
+  }
+
+  Result result = candidate->QueryMatchResult( query );
+
+  if ( result.IsSubsequence() ) {
+    results.push_back( result );
+    matches.push_back( candidate );
+  }
 }
 
 
@@ -137,7 +234,8 @@ std::set< const Candidate * > &IdentifierDatabase::GetCandidateSet(
 void IdentifierDatabase::AddIdentifiersNoLock(
   std::vector< std::string >&& new_candidates,
   const std::string &filetype,
-  const std::string &filepath ) {
+  const std::string &filepath,
+  std::vector< const Candidate * > &unused_candidates ) {
   std::set< const Candidate *> &candidates =
     GetCandidateSet( filetype, filepath );
 
@@ -145,8 +243,14 @@ void IdentifierDatabase::AddIdentifiersNoLock(
     candidate_repository_.GetCandidatesForStrings(
       std::move( new_candidates ) );
 
-  candidates.insert( repository_candidates.begin(),
-                     repository_candidates.end() );
+  // The database holds one reference per candidate and file. The references on
+  // candidates already in the file must be released.
+  for ( const Candidate * candidate : repository_candidates ) {
+    if ( !candidates.insert( candidate ).second ) {
+      unused_candidates.push_back( candidate );
+    }
+  }
+  filetype_query_matches_.erase( filetype );
 }
 
 
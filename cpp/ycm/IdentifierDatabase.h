@@ -18,6 +18,8 @@
 #ifndef IDENTIFIERDATABASE_H_ZESX3CVR
 #define IDENTIFIERDATABASE_H_ZESX3CVR
 
+#include "Word.h"
+
 #include <map>
 #include <memory>
 #include <mutex>
@@ -53,6 +55,7 @@ using FiletypeIdentifierMap = std::map< std::string, FilepathToIdentifiers >;
 class IdentifierDatabase {
 public:
   YCM_EXPORT IdentifierDatabase();
+  YCM_EXPORT ~IdentifierDatabase();
   IdentifierDatabase( const IdentifierDatabase& ) = delete;
   IdentifierDatabase& operator=( const IdentifierDatabase& ) = delete;
 
@@ -63,23 +66,34 @@ public:
     const std::string &filetype,
     const std::string &filepath );
 
+  void RemoveIdentifiers(
+    std::vector< std::string >&& old_candidates,
+    const std::string &filetype,
+    const std::string &filepath );
+
   void ClearCandidatesStoredForFile( const std::string &filetype,
                                      const std::string &filepath );
 
-  void ResultsForQueryAndType( std::string&& query,
-                               const std::string &filetype,
-                               std::vector< Result >& results,
-                               const size_t max_results ) const;
+  std::vector< std::string > CandidatesForQueryAndType(
+    std::string&& query,
+    const std::string &filetype,
+    const size_t max_candidates ) const;
 
 private:
   std::set< const Candidate * > &GetCandidateSet(
     const std::string &filetype,
     const std::string &filepath );
 
+  static void AddResultIfMatching( const Candidate *candidate,
+                                   const Word &query,
+                                   std::vector< Result > &results,
+                                   std::vector< const Candidate * > &matches );
+
   void AddIdentifiersNoLock(
     std::vector< std::string >&& new_candidates,
     const std::string &filetype,
-    const std::string &filepath );
+    const std::string &filepath,
+    std::vector< const Candidate * > &unused_candidates );
 
 
   // filepath -> *( *candidate )
@@ -92,9 +106,23 @@ private:
     std::unordered_map < std::string, std::shared_ptr< FilepathToCandidates > >;
 
 
+  // Query and candidates matching that query. A query extending the stored one
+  // can only match these candidates.
+  struct QueryMatches {
+    std::shared_ptr< Word > query;
+    std::vector< const Candidate * > candidates;
+  };
+
+  // filetype -> matches for the last query on that filetype
+  using FiletypeQueryMatches = std::unordered_map< std::string, QueryMatches >;
+
+
   CandidateRepository &candidate_repository_;
 
   FiletypeCandidateMap filetype_candidate_map_;
+  // Protected by filetype_candidate_map_mutex_ and cleared for a filetype when
+  // its candidates change.
+  mutable FiletypeQueryMatches filetype_query_matches_;
   mutable std::mutex filetype_candidate_map_mutex_;
 };
 
@@ -18,7 +18,10 @@
 #include "IdentifierUtils.h"
 #include "Utils.h"
 
-#include <boost/regex.hpp>
+#include <algorithm>
+#include <boost/filesystem/fstream.hpp>
+#include <cstring>
+#include <sstream>
 #include <unordered_map>
 
 namespace YouCompleteMe {
@@ -29,16 +32,14 @@ namespace {
 
 // For details on the tag format supported, see here for details:
 // http://ctags.sourceforge.net/FORMAT
-// TL;DR: The only supported format is the one Exuberant Ctags emits.
-const char *const TAG_REGEX =
-  "^([^\\t\\n\\r]+)"  // The first field is the identifier
-  "\\t"  // A TAB char is the field separator
-  // The second field is the path to the file that has the identifier; either
-  // absolute or relative to the tags file.
-  "([^\\t\\n\\r]+)"
-  "\\t.*?"  // Non-greedy everything
-  "language:([^\\t\\n\\r]+)"  // We want to capture the language of the file
-  ".*?$";
+// TL;DR: The only supported format is the one Exuberant Ctags emits. Each line
+// of the tags file is made of TAB-separated fields. The first field is the
+// identifier, the second one is the path to the file that has the identifier;
+// either absolute or relative to the tags file. The language of the file is
+// given by the first "language:" field found after these.
+const char TAG_FIELD_SEPARATOR = '\t';
+const char TAG_LANGUAGE_FIELD[] = "language:";
+const size_t TAG_LANGUAGE_FIELD_LENGTH = sizeof( TAG_LANGUAGE_FIELD ) - 1;
 
 // Only used as the equality comparer for the below unordered_map which stores
 // const char* pointers and not std::string but needs to hash based on string
@@ -159,6 +160,385 @@ const std::unordered_map < const char *,
         { "Zephir"              , "zephir"              }
       };
 
+// A snapshot is a binary file made of a header followed by a table of interned
+// strings and a filetype -> filepath -> identifiers table where strings are
+// referred to by their index in the first table. Integers are stored in the
+// native byte order since snapshots are not meant to be shared between
+// machines. The layout is:
+//
+//   magic | version | tags file size | tags file mtime | tags file path index
+//   number of strings | ( string length | string bytes )*
+//   number of filetypes | ( filetype index | number of filepaths |
+//     ( filepath index | number of identifiers | identifier index* )* )*
+const char SNAPSHOT_MAGIC[] = { 'Y', 'C', 'M', 'I', 'D', 'S' };
+const uint32_t SNAPSHOT_VERSION = 1;
+
+
+struct TagsFileInfo {
+  uint64_t size;
+  int64_t modification_time;
+};
+
+
+bool GetTagsFileInfo( const fs::path &path_to_tag_file, TagsFileInfo &info ) {
+  boost::system::error_code error;
+  info.size = fs::file_size( path_to_tag_file, error );
+  if ( error ) {
+    return false;
+  }
+  info.modification_time = fs::last_write_time( path_to_tag_file, error );
+  return !error;
+}
+
+
+fs::path SnapshotPath( const fs::path &path_to_tag_file,
+                       const fs::path &snapshot_directory ) {
+  std::ostringstream filename;
+  filename << std::hex << std::hash< std::string >()(
+    path_to_tag_file.string() ) << ".ycmids";
+  return snapshot_directory / filename.str();
+}
+
+
+class SnapshotWriter {
+public:
+  void WriteInteger( uint32_t value ) {
+    Write( &value, sizeof( value ) );
+  }
+
+  void WriteInteger( uint64_t value ) {
+    Write( &value, sizeof( value ) );
+  }
+
+  void WriteInteger( int64_t value ) {
+    Write( &value, sizeof( value ) );
+  }
+
+  void WriteBytes( const std::string &bytes ) {
+    WriteInteger( static_cast< uint32_t >( bytes.size() ) );
+    buffer_.append( bytes );
+  }
+
+  void Write( const void *data, size_t size ) {
+    buffer_.append( static_cast< const char * >( data ), size );
+  }
+
+  const std::string &Buffer() const {
+    return buffer_;
+  }
+
+private:
+  std::string buffer_;
+};
+
+
+class SnapshotReader {
+public:
+  explicit SnapshotReader( const std::string &buffer )
+    : position_( buffer.data() ),
+      end_( buffer.data() + buffer.size() ) {
+  }
+
+  template< typename Integer >
+  bool ReadInteger( Integer &value ) {
+    return Read( &value, sizeof( value ) );
+  }
+
+  bool ReadBytes( std::string &bytes ) {
+    uint32_t size;
+    if ( !ReadInteger( size ) || static_cast< size_t >( end_ - position_ ) <
+                                 size ) {
+      return false;
+    }
+    bytes.assign( position_, size );
+    position_ += size;
+    return true;
+  }
+
+  bool Read( void *data, size_t size ) {
+    if ( static_cast< size_t >( end_ - position_ ) < size ) {
+      return false;
+    }
+    std::memcpy( data, position_, size );
+    position_ += size;
+    return true;
+  }
+
+  bool AtEnd() const {
+    return position_ == end_;
+  }
+
+private:
+  const char *position_;
+  const char *end_;
+};
+
+
+class StringInterner {
+public:
+  uint32_t Intern( const std::string &text ) {
+    auto it = indices_.find( text );
+    if ( it != indices_.end() ) {
+      return it->second;
+    }
+    uint32_t index = static_cast< uint32_t >( strings_.size() );
+    strings_.push_back( &indices_.emplace( text, index ).first->first );
+    return index;
+  }
+
+  const std::vector< const std::string * > &Strings() const {
+    return strings_;
+  }
+
+private:
+  std::unordered_map< std::string, uint32_t > indices_;
+  std::vector< const std::string * > strings_;
+};
+
+
+void WriteSnapshot( const FiletypeIdentifierMap &filetype_identifier_map,
+                    const fs::path &path_to_tag_file,
+                    const TagsFileInfo &info,
+                    const fs::path &path_to_snapshot ) {
+  StringInterner interner;
+  std::string tag_file = path_to_tag_file.string();
+  uint32_t tag_file_index = interner.Intern( tag_file );
+  for ( const auto &filetype_and_map : filetype_identifier_map ) {
+    interner.Intern( filetype_and_map.first );
+    for ( const auto &filepath_and_identifiers : filetype_and_map.second ) {
+      interner.Intern( filepath_and_identifiers.first );
+      for ( const std::string &identifier : filepath_and_identifiers.second ) {
+        interner.Intern( identifier );
+      }
+    }
+  }
+
+  SnapshotWriter writer;
+  writer.Write( SNAPSHOT_MAGIC, sizeof( SNAPSHOT_MAGIC ) );
+  writer.WriteInteger( SNAPSHOT_VERSION );
+  writer.WriteInteger( info.size );
+  writer.WriteInteger( info.modification_time );
+  writer.WriteInteger( tag_file_index );
+
+  writer.WriteInteger( static_cast< uint32_t >( interner.Strings().size() ) );
+  for ( const std::string *text : interner.Strings() ) {
+    writer.WriteBytes( *text );
+  }
+
+  writer.WriteInteger(
+    static_cast< uint32_t >( filetype_identifier_map.size() ) );
+  for ( const auto &filetype_and_map : filetype_identifier_map ) {
+    writer.WriteInteger( interner.Intern( filetype_and_map.first ) );
+    writer.WriteInteger(
+      static_cast< uint32_t >( filetype_and_map.second.size() ) );
+    for ( const auto &filepath_and_identifiers : filetype_and_map.second ) {
+      writer.WriteInteger( interner.Intern( filepath_and_identifiers.first ) );
+      writer.WriteInteger(
+        static_cast< uint32_t >( filepath_and_identifiers.second.size() ) );
+      for ( const std::string &identifier : filepath_and_identifiers.second ) {
+        writer.WriteInteger( interner.Intern( identifier ) );
+      }
+    }
+  }
+
+  // Write to a temporary file first and rename it so that other servers never
+  // read a partially written snapshot.
+  boost::system::error_code error;
+  fs::create_directories( path_to_snapshot.parent_path(), error );
+  fs::path temporary_path = fs::unique_path(
+    path_to_snapshot.string() + ".%%%%-%%%%", error );
+  if ( error ) {
+    return;
+  }
+  {
+    fs::ofstream file( temporary_path, std::ios::out | std::ios::binary );
+    file.write( writer.Buffer().data(), writer.Buffer().size() );
+    if ( !file ) {
+      file.close();
+      fs::remove( temporary_path, error );
+      return;
+    }
+  }
+  fs::rename( temporary_path, path_to_snapshot, error );
+  if ( error ) {
+    fs::remove( temporary_path, error );
+  }
+}
+
+
+bool ReadSnapshot( const fs::path &path_to_snapshot,
+                   const fs::path &path_to_tag_file,
+                   const TagsFileInfo &info,
+                   FiletypeIdentifierMap &filetype_identifier_map ) {
+  std::string contents;
+  try {
+    contents = ReadUtf8File( path_to_snapshot );
+  } catch ( ... ) {
+    return false;
+  }
+
+  SnapshotReader reader( contents );
+  char magic[ sizeof( SNAPSHOT_MAGIC ) ];
+  uint32_t version;
+  TagsFileInfo snapshot_info;
+  uint32_t tag_file_index;
+  if ( !reader.Read( magic, sizeof( magic ) ) ||
+       std::memcmp( magic, SNAPSHOT_MAGIC, sizeof( magic ) ) != 0 ||
+       !reader.ReadInteger( version ) ||
+       version != SNAPSHOT_VERSION ||
+       !reader.ReadInteger( snapshot_info.size ) ||
+       !reader.ReadInteger( snapshot_info.modification_time ) ||
+       snapshot_info.size != info.size ||
+       snapshot_info.modification_time != info.modification_time ||
+       !reader.ReadInteger( tag_file_index ) ) {
+    return false;
+  }
+
+  uint32_t nb_strings;
+  if ( !reader.ReadInteger( nb_strings ) || tag_file_index >= nb_strings ) {
+    return false;
+  }
+  std::vector< std::string > strings( nb_strings );
+  for ( std::string &text : strings ) {
+    if ( !reader.ReadBytes( text ) ) {
+      return false;
+    }
+  }
+
+  // Different tags files may have the same snapshot name.
+  if ( strings[ tag_file_index ] != path_to_tag_file.string() ) {
+    return false;
+  }
+
+  uint32_t nb_filetypes;
+  if ( !reader.ReadInteger( nb_filetypes ) ) {
+    return false;
+  }
+  for ( uint32_t i = 0; i < nb_filetypes; ++i ) {
+    uint32_t filetype_index;
+    uint32_t nb_filepaths;
+    if ( !reader.ReadInteger( filetype_index ) ||
+         filetype_index >= nb_strings ||
+         !reader.ReadInteger( nb_filepaths ) ) {
+      return false;
+    }
+    FilepathToIdentifiers &filepath_to_identifiers =
+      filetype_identifier_map[ strings[ filetype_index ] ];
+    for ( uint32_t j = 0; j < nb_filepaths; ++j ) {
+      uint32_t filepath_index;
+      uint32_t nb_identifiers;
+      if ( !reader.ReadInteger( filepath_index ) ||
+           filepath_index >= nb_strings ||
+           !reader.ReadInteger( nb_identifiers ) ) {
+        return false;
+      }
+      std::vector< std::string > &identifiers =
+        filepath_to_identifiers[ strings[ filepath_index ] ];
+      identifiers.reserve( nb_identifiers );
+      for ( uint32_t k = 0; k < nb_identifiers; ++k ) {
+        uint32_t identifier_index;
+        if ( !reader.ReadInteger( identifier_index ) ||
+             identifier_index >= nb_strings ) {
+          return false;
+        }
+        identifiers.push_back( strings[ identifier_index ] );
+      }
+    }
+  }
+
+  return reader.AtEnd();
+}
+
+bool IsNewline( char character ) {
+  return character == '\n' || character == '\r';
+}
+
+
+// Parses the lines of a tags file without copying the fields until they are
+// added to the map. Normalizing a path and finding the filetype of a language
+// are expensive compared to the parsing itself and the same paths and languages
+// appear on many lines so their results are cached.
+class TagsFileParser {
+public:
+  TagsFileParser( const fs::path &tags_directory,
+                  FiletypeIdentifierMap &filetype_identifier_map )
+    : tags_directory_( tags_directory ),
+      filetype_identifier_map_( filetype_identifier_map ) {
+  }
+
+  void ParseLine( const char *line_begin, const char *line_end ) {
+    const char *identifier_end = std::find( line_begin,
+                                            line_end,
+                                            TAG_FIELD_SEPARATOR );
+    if ( identifier_end == line_begin || identifier_end == line_end ) {
+      return;
+    }
+
+    const char *path_begin = identifier_end + 1;
+    const char *path_end = std::find( path_begin,
+                                      line_end,
+                                      TAG_FIELD_SEPARATOR );
+    if ( path_end == path_begin || path_end == line_end ) {
+      return;
+    }
+
+    const char *language_begin = path_end + 1;
+    const char *language_end;
+    while ( true ) {
+      language_begin = std::search(
+        language_begin, line_end,
+        TAG_LANGUAGE_FIELD, TAG_LANGUAGE_FIELD + TAG_LANGUAGE_FIELD_LENGTH );
+      if ( language_begin == line_end ) {
+        return;
+      }
+      language_begin += TAG_LANGUAGE_FIELD_LENGTH;
+      language_end = std::find( language_begin,
+                                line_end,
+                                TAG_FIELD_SEPARATOR );
+      if ( language_end != language_begin ) {
+        break;
+      }
+    }
+
+    filetype_identifier_map_[ Filetype( language_begin, language_end ) ]
+                            [ NormalizedPath( path_begin, path_end ) ]
+      .emplace_back( line_begin, identifier_end );
+  }
+
+private:
+  const std::string &Filetype( const char *language_begin,
+                               const char *language_end ) {
+    std::string language( language_begin, language_end );
+    auto it = language_to_filetype_.find( language );
+    if ( it != language_to_filetype_.end() ) {
+      return it->second;
+    }
+    std::string filetype = FindWithDefault( LANG_TO_FILETYPE,
+                                            language.c_str(),
+                                            Lowercase( language ).c_str() );
+    return language_to_filetype_.emplace(
+      std::move( language ), std::move( filetype ) ).first->second;
+  }
+
+  const std::string &NormalizedPath( const char *path_begin,
+                                     const char *path_end ) {
+    std::string path( path_begin, path_end );
+    auto it = normalized_paths_.find( path );
+    if ( it != normalized_paths_.end() ) {
+      return it->second;
+    }
+    std::string normalized_path = NormalizePath( path,
+                                                 tags_directory_ ).string();
+    return normalized_paths_.emplace(
+      std::move( path ), std::move( normalized_path ) ).first->second;
+  }
+
+  const fs::path tags_directory_;
+  FiletypeIdentifierMap &filetype_identifier_map_;
+  std::unordered_map< std::string, std::string > language_to_filetype_;
+  std::unordered_map< std::string, std::string > normalized_paths_;
+};
+
 }  // unnamed namespace
 
 
@@ -173,29 +553,44 @@ FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
     return filetype_identifier_map;
   }
 
-  std::string::const_iterator start = tags_file_contents.begin();
-  std::string::const_iterator end   = tags_file_contents.end();
+  TagsFileParser parser( path_to_tag_file.parent_path(),
+                         filetype_identifier_map );
 
-  boost::smatch matches;
-  const boost::regex expression( TAG_REGEX );
-  const boost::match_flag_type options = boost::match_not_dot_newline;
+  const char *position = tags_file_contents.data();
+  const char *end = position + tags_file_contents.size();
+  while ( position < end ) {
+    const char *line_end = std::find_if( position, end, IsNewline );
+    parser.ParseLine( position, line_end );
+    position = line_end + 1;
+  }
 
-  while ( boost::regex_search( start, end, matches, expression, options ) ) {
-    start = matches[ 0 ].second;
+  return filetype_identifier_map;
+}
 
-    std::string language( matches[ 3 ] );
-    std::string filetype = FindWithDefault( LANG_TO_FILETYPE,
-                                            language.c_str(),
-                                            Lowercase( language ).c_str() );
 
-    std::string identifier( matches[ 1 ] );
-    fs::path path( matches[ 2 ].str() );
-    path = NormalizePath( path, path_to_tag_file.parent_path() );
+FiletypeIdentifierMap ExtractIdentifiersFromTagsFileUsingSnapshot(
+  const fs::path &path_to_tag_file,
+  const fs::path &snapshot_directory ) {
+  TagsFileInfo info;
+  if ( !GetTagsFileInfo( path_to_tag_file, info ) ) {
+    return ExtractIdentifiersFromTagsFile( path_to_tag_file );
+  }
 
-    filetype_identifier_map[ std::move( filetype ) ][ path.string() ]
-      .push_back( std::move( identifier ) );
+  fs::path path_to_snapshot = SnapshotPath( path_to_tag_file,
+                                            snapshot_directory );
+  FiletypeIdentifierMap filetype_identifier_map;
+  if ( ReadSnapshot( path_to_snapshot,
+                     path_to_tag_file,
+                     info,
+                     filetype_identifier_map ) ) {
+    return filetype_identifier_map;
   }
 
+  filetype_identifier_map = ExtractIdentifiersFromTagsFile( path_to_tag_file );
+  WriteSnapshot( filetype_identifier_map,
+                 path_to_tag_file,
+                 info,
+                 path_to_snapshot );
   return filetype_identifier_map;
 }
 
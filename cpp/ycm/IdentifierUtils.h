@@ -27,6 +27,15 @@ namespace YouCompleteMe {
 YCM_EXPORT FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
   const boost::filesystem::path &path_to_tag_file );
 
+// Same as above but the identifiers are read from a snapshot previously written
+// in |snapshot_directory| if the size and modification time of the tags file
+// didn't change since then. Otherwise, the tags file is parsed and a new
+// snapshot is written. This avoids parsing big tags files again each time the
+// server is restarted.
+YCM_EXPORT FiletypeIdentifierMap ExtractIdentifiersFromTagsFileUsingSnapshot(
+  const boost::filesystem::path &path_to_tag_file,
+  const boost::filesystem::path &snapshot_directory );
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: IDENTIFIERUTILS_CPP_WFFUZNET */
@@ -21,6 +21,12 @@
 #include "Result.h"
 #include "Utils.h"
 
+#include <algorithm>
+#include <functional>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <thread>
 #include <utility>
 #include <vector>
 
@@ -58,50 +64,271 @@ std::vector< const Candidate * > CandidatesFromObjectList(
            std::move( candidate_strings ) );
 }
 
+
+std::vector< size_t > AllIndexes( size_t num_candidates ) {
+  std::vector< size_t > indexes( num_candidates );
+  for ( size_t i = 0; i < num_candidates; ++i ) {
+    indexes[ i ] = i;
+  }
+  return indexes;
+}
+
+
+std::vector< size_t > MatchIndexes(
+  const std::vector< ResultAnd< size_t > > &result_and_objects ) {
+  std::vector< size_t > matches;
+  matches.reserve( result_and_objects.size() );
+  for ( const ResultAnd< size_t > &result_and_object : result_and_objects ) {
+    matches.push_back( result_and_object.extra_object_ );
+  }
+  return matches;
+}
+
+
+// Candidates and query of the last call to FilterAndSortCandidates with the
+// indexes of the candidates that matched the query. Callers that don't keep a
+// CandidateList usually filter the same candidates again with a query
+// extending the previous one while the user is typing; only the candidates
+// that previously matched need to be considered then. The cache holds a
+// reference on its candidates.
+struct QueryMatchCache {
+  std::vector< const Candidate * > candidates;
+  std::shared_ptr< Word > query;
+  std::vector< size_t > matches;
+};
+
+QueryMatchCache query_match_cache;
+std::mutex query_match_cache_mutex;
+
+
+// Returns the indexes of the candidates that can match the query: all of them
+// unless the query refines the one in the cache for the same candidates.
+std::vector< size_t > CachedCandidatesToFilter(
+  const std::vector< const Candidate * > &candidates,
+  const Word &query ) {
+  {
+    std::lock_guard< std::mutex > locker( query_match_cache_mutex );
+
+    if ( query_match_cache.query &&
+         query.StartsWith( *query_match_cache.query ) &&
+         query_match_cache.candidates == candidates ) {
+      return query_match_cache.matches;
+    }
+  }
+
+  return AllIndexes( candidates.size() );
+}
+
+
+// Takes over the reference on |candidates|.
+void UpdateQueryMatchCache(
+  std::vector< const Candidate * > &&candidates,
+  const std::shared_ptr< Word > &query,
+  std::vector< size_t > &&matches ) {
+  std::vector< const Candidate * > previous_candidates;
+  {
+    std::lock_guard< std::mutex > locker( query_match_cache_mutex );
+    previous_candidates.swap( query_match_cache.candidates );
+    query_match_cache.candidates = std::move( candidates );
+    query_match_cache.query = query;
+    query_match_cache.matches = std::move( matches );
+  }
+  CandidateRepository::Instance().ReleaseCandidates( previous_candidates );
+}
+
+
+// Filtering and sorting is split into shards of at least that many candidates
+// processed in parallel. Below twice that number, the cost of starting threads
+// outweighs the gain and the candidates are processed on the current thread.
+const size_t MIN_CANDIDATES_PER_SHARD = 8192;
+
+
+// Matches the query against the candidates at the indexes in the range
+// [begin, end).
+std::vector< ResultAnd< size_t > > FilterShard(
+  const std::vector< const Candidate * > &candidates,
+  const std::vector< size_t > &indexes,
+  const Word &query,
+  size_t begin,
+  size_t end ) {
+  std::vector< ResultAnd< size_t > > result_and_objects;
+
+  for ( size_t i = begin; i < end; ++i ) {
+    const Candidate *candidate = candidates[ indexes[ i ] ];
+
+    if ( candidate->IsEmpty() || !candidate->ContainsBytes( query ) ) {
+      continue;
+    }
+
+    Result result = candidate->QueryMatchResult( query );
+
+    if ( result.IsSubsequence() ) {
+      result_and_objects.emplace_back( result, indexes[ i ] );
+    }
+  }
+
+  return result_and_objects;
+}
+
+
+std::vector< ResultAnd< size_t > > FilterShards(
+  const std::vector< const Candidate * > &candidates,
+  const std::vector< size_t > &indexes,
+  const Word &query ) {
+  size_t num_indexes = indexes.size();
+  size_t num_shards = std::min(
+    static_cast< size_t >( std::max( std::thread::hardware_concurrency(),
+                                     1u ) ),
+    num_indexes / MIN_CANDIDATES_PER_SHARD );
+
+  if ( num_shards < 2 ) {
+    return FilterShard( candidates, indexes, query, 0, num_indexes );
+  }
+
+  // The first shard is processed on the current thread while the others are
+  // processed on their own thread. The results of each shard are then merged.
+  size_t shard_size = ( num_indexes + num_shards - 1 ) / num_shards;
+  std::vector< std::future< std::vector< ResultAnd< size_t > > > > shards;
+  for ( size_t begin = shard_size; begin < num_indexes; begin += shard_size ) {
+    shards.push_back( std::async(
+      std::launch::async,
+      FilterShard,
+      std::cref( candidates ),
+      std::cref( indexes ),
+      std::cref( query ),
+      begin,
+      std::min( begin + shard_size, num_indexes ) ) );
+  }
+
+  std::vector< ResultAnd< size_t > > result_and_objects =
+    FilterShard( candidates, indexes, query, 0, shard_size );
+  for ( auto &shard : shards ) {
+    std::vector< ResultAnd< size_t > > shard_results = shard.get();
+    result_and_objects.insert( result_and_objects.end(),
+                               shard_results.begin(),
+                               shard_results.end() );
+  }
+
+  return result_and_objects;
+}
+
 } // unnamed namespace
 
 
+CandidateList::CandidateList( const pylist &candidates,
+                              const std::string &candidate_property )
+  : candidates_( candidates ),
+    repository_candidates_( CandidatesFromObjectList( candidates,
+                                                      candidate_property ) ) {
+}
+
+
+CandidateList::~CandidateList() {
+  CandidateRepository::Instance().ReleaseCandidates( repository_candidates_ );
+}
+
+
+pylist CandidateList::FilterAndSort( std::string query,
+                                     const size_t max_candidates ) {
+  pylist filtered_candidates;
+
+  std::vector< ResultAnd< size_t > > result_and_objects;
+  {
+    pybind11::gil_scoped_release unlock;
+    // Results refer to the query so it must outlive them even if another
+    // thread replaces the last query.
+    std::shared_ptr< Word > query_object =
+      std::make_shared< Word >( std::move( query ) );
+
+    result_and_objects = FilterShards( repository_candidates_,
+                                       CandidatesToFilter( *query_object ),
+                                       *query_object );
+
+    std::vector< size_t > matches = MatchIndexes( result_and_objects );
+    {
+      std::lock_guard< std::mutex > locker( last_query_mutex_ );
+      last_query_ = query_object;
+      last_matches_ = std::move( matches );
+    }
+
+    PartialSort( result_and_objects, max_candidates );
+  }
+
+  for ( const ResultAnd< size_t > &result_and_object : result_and_objects ) {
+    filtered_candidates.append(
+      candidates_[ result_and_object.extra_object_ ] );
+  }
+
+  return filtered_candidates;
+}
+
+
+// Returns the indexes of the candidates that can match the query: all of them
+// unless the query extends the last one.
+std::vector< size_t > CandidateList::CandidatesToFilter( const Word &query ) {
+  {
+    std::lock_guard< std::mutex > locker( last_query_mutex_ );
+
+    if ( last_query_ && query.StartsWith( *last_query_ ) ) {
+      return last_matches_;
+    }
+  }
+
+  return AllIndexes( repository_candidates_.size() );
+}
+
+
 pylist FilterAndSortCandidates(
   const pylist &candidates,
   const std::string &candidate_property,
   std::string query,
   const size_t max_candidates ) {
-  pylist filtered_candidates;
-
-  size_t num_candidates = len( candidates );
   std::vector< const Candidate * > repository_candidates =
     CandidatesFromObjectList( candidates, candidate_property );
 
   std::vector< ResultAnd< size_t > > result_and_objects;
   {
     pybind11::gil_scoped_release unlock;
-    Word query_object( std::move( query ) );
+    // The query is shared with the cache and must outlive the results.
+    std::shared_ptr< Word > query_object =
+      std::make_shared< Word >( std::move( query ) );
 
-    for ( size_t i = 0; i < num_candidates; ++i ) {
-      const Candidate *candidate = repository_candidates[ i ];
+    result_and_objects = FilterShards(
+      repository_candidates,
+      CachedCandidatesToFilter( repository_candidates, *query_object ),
+      *query_object );
 
-      if ( candidate->IsEmpty() || !candidate->ContainsBytes( query_object ) ) {
-        continue;
-      }
-
-      Result result = candidate->QueryMatchResult( query_object );
-
-      if ( result.IsSubsequence() ) {
-        result_and_objects.emplace_back( result, i );
-      }
-    }
+    std::vector< size_t > matches = MatchIndexes( result_and_objects );
 
+    // The results point to the candidates which are only kept alive by
+    // |repository_candidates| so they must be sorted before the candidates are
+    // handed to the cache where another thread may release them.
     PartialSort( result_and_objects, max_candidates );
+
+    UpdateQueryMatchCache( std::move( repository_candidates ),
+                           query_object,
+                           std::move( matches ) );
   }
 
+  // The matches are indexes so the objects are taken from |candidates| even if
+  // the cache was built from other objects with the same properties.
+  pylist filtered_candidates;
   for ( const ResultAnd< size_t > &result_and_object : result_and_objects ) {
-    filtered_candidates.append( candidates[ result_and_object.extra_object_ ] );
+    filtered_candidates.append(
+      candidates[ result_and_object.extra_object_ ] );
   }
 
   return filtered_candidates;
 }
 
 
+void ClearFilterAndSortCandidatesCache() {
+  UpdateQueryMatchCache( std::vector< const Candidate * >(),
+                         nullptr,
+                         std::vector< size_t >() );
+}
+
+
 std::string GetUtf8String( const object &value ) {
   // If already a unicode or string (or something derived from it)
   // pybind will already convert to utf8 when converting to std::string.
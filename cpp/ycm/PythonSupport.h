@@ -20,20 +20,66 @@
 
 #include <pybind11/pybind11.h>
 
+#include <memory>
+#include <mutex>
+#include <string>
+#include <vector>
+
 namespace YouCompleteMe {
 
+class Candidate;
+class Word;
+
+/// Holds a python list of completion candidates with the candidates built from
+/// their |candidate_property| so that the list can be filtered and sorted for
+/// different queries without converting and looking up the candidates again.
+/// The candidates matching the last query are remembered and a query extending
+/// that one is only matched against them.
+///
+/// This class is thread-safe.
+class CandidateList {
+public:
+  YCM_EXPORT CandidateList( const pybind11::list &candidates,
+                            const std::string &candidate_property );
+  YCM_EXPORT ~CandidateList();
+  CandidateList( const CandidateList& ) = delete;
+  CandidateList& operator=( const CandidateList& ) = delete;
+
+  /// Returns a new sorted python list with the original objects that match
+  /// |query|. This list contains at most |max_candidates|. If |max_candidates|
+  /// is omitted or 0, all candidates are sorted.
+  YCM_EXPORT pybind11::list FilterAndSort( std::string query,
+                                           const size_t max_candidates = 0 );
+
+private:
+  std::vector< size_t > CandidatesToFilter( const Word &query );
+
+  pybind11::list candidates_;
+  std::vector< const Candidate * > repository_candidates_;
+
+  std::shared_ptr< Word > last_query_;
+  std::vector< size_t > last_matches_;
+  std::mutex last_query_mutex_;
+};
+
 /// Given a list of python objects (that represent completion candidates) in a
 /// python list |candidates|, a |candidate_property| on which to filter and sort
 /// the candidates and a user query, returns a new sorted python list with the
 /// original objects that survived the filtering. This list contains at most
 /// |max_candidates|. If |max_candidates| is omitted or 0, all candidates are
-/// sorted.
+/// sorted. Like CandidateList, the candidates matching the last query are
+/// remembered and, if the next call is for the same candidates with a query
+/// extending that one, only they are matched against it.
 YCM_EXPORT pybind11::list FilterAndSortCandidates(
   const pybind11::list &candidates,
   const std::string &candidate_property,
   std::string query,
   const size_t max_candidates = 0 );
 
+/// Clears the matches of the last query kept by FilterAndSortCandidates. This
+/// should only be used to isolate tests and benchmarks.
+YCM_EXPORT void ClearFilterAndSortCandidatesCache();
+
 /// Given a Python object that's supposed to be "string-like", returns a UTF-8
 /// encoded std::string. Raises an exception if the object can't be converted to
 /// a string. Supports newstr and newbytes from python-future on Python 2.
@@ -22,32 +22,34 @@ namespace YouCompleteMe {
 
 namespace {
 
-size_t LongestCommonSubsequenceLength( const CharacterSequence &first,
-                                       const CharacterSequence &second ) {
-  const auto &longer  = first.size() > second.size() ? first  : second;
-  const auto &shorter = first.size() > second.size() ? second : first;
-
-  size_t longer_len  = longer.size();
-  size_t shorter_len = shorter.size();
-
-  std::vector< size_t > previous( shorter_len + 1, 0 );
-  std::vector< size_t > current(  shorter_len + 1, 0 );
-
-  for ( size_t i = 0; i < longer_len; ++i ) {
-    for ( size_t j = 0; j < shorter_len; ++j ) {
-      if ( longer[ i ]->EqualsBase( *shorter[ j ] ) ) {
+// Returns the length of the longest common subsequence of the query characters
+// and the word boundary characters of the candidate. The table is sized on the
+// query which is usually the shorter of the two.
+size_t LongestCommonSubsequenceLength( const CharacterSequence &query,
+                                       const Candidate &candidate ) {
+  size_t query_len     = query.size();
+  size_t candidate_len = candidate.NumWordBoundaryChars();
+
+  std::vector< size_t > previous( query_len + 1, 0 );
+  std::vector< size_t > current(  query_len + 1, 0 );
+
+  for ( size_t i = 0; i < candidate_len; ++i ) {
+    const Character *candidate_character = candidate.WordBoundaryChar( i );
+
+    for ( size_t j = 0; j < query_len; ++j ) {
+      if ( candidate_character->EqualsBase( *query[ j ] ) ) {
         current[ j + 1 ] = previous[ j ] + 1;
       } else {
         current[ j + 1 ] = std::max( current[ j ], previous[ j + 1 ] );
       }
     }
 
-    for ( size_t j = 0; j < shorter_len; ++j ) {
+    for ( size_t j = 0; j < query_len; ++j ) {
       previous[ j + 1 ] = current[ j + 1 ];
     }
   }
 
-  return current[ shorter_len ];
+  return current[ query_len ];
 }
 
 
@@ -147,7 +149,7 @@ bool Result::operator< ( const Result &other ) const {
 
   // Lexicographic comparison, but we prioritize lowercase letters over
   // uppercase ones. So "foo" < "Foo".
-  return candidate_->CaseSwappedText() < other.candidate_->CaseSwappedText();
+  return candidate_->CaseSwappedTextLessThan( *other.candidate_ );
 }
 
 
@@ -159,8 +161,8 @@ void Result::SetResultFeaturesFromQuery() {
   first_char_same_in_query_and_text_ =
     candidate_->Characters()[ 0 ]->EqualsBase( *query_->Characters()[ 0 ] );
 
-  num_wb_matches_ = LongestCommonSubsequenceLength(
-    query_->Characters(), candidate_->WordBoundaryChars() );
+  num_wb_matches_ = LongestCommonSubsequenceLength( query_->Characters(),
+                                                    *candidate_ );
 }
 
 } // namespace YouCompleteMe
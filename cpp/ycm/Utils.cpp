@@ -33,10 +33,13 @@ std::string ReadUtf8File( const fs::path &filepath ) {
   // "other" in this case means everything that is not a regular file,
   // directory or a symlink.
   if ( !fs::is_empty( filepath ) && fs::is_regular_file( filepath ) ) {
+    // Read the file directly into the string instead of going through an
+    // intermediate buffer since this function is used on big tags files.
     fs::ifstream file( filepath, std::ios::in | std::ios::binary );
-    std::vector< char > contents( ( std::istreambuf_iterator< char >( file ) ),
-                                  std::istreambuf_iterator< char >() );
-    return std::string( contents.begin(), contents.end() );
+    std::string contents( fs::file_size( filepath ), '\0' );
+    file.read( &contents[ 0 ], contents.size() );
+    contents.resize( file.gcount() );
+    return contents;
   }
   return std::string();
 }
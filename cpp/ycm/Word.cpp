@@ -267,6 +267,27 @@ std::vector< std::string > BreakCodePointsIntoCharacters(
   return characters;
 }
 
+
+// Returns the bit of a byte in the mask of bytes present in a word. Lowercase
+// letters, digits, and the underscore, which make up most identifiers once
+// case-folded, have their own bit. Other ASCII bytes share 11 bits and non-ASCII
+// bytes 16 bits. Uppercase letters never appear since bases are case-folded.
+uint8_t ByteBit( uint8_t byte ) {
+  if ( 'a' <= byte && byte <= 'z' ) {
+    return byte - 'a';
+  }
+  if ( '0' <= byte && byte <= '9' ) {
+    return 26 + byte - '0';
+  }
+  if ( byte == '_' ) {
+    return 36;
+  }
+  if ( byte < 0x80 ) {
+    return 37 + byte % 11;
+  }
+  return 48 + byte % 16;
+}
+
 } // unnamed namespace
 
 void Word::BreakIntoCharacters() {
@@ -280,14 +301,15 @@ void Word::BreakIntoCharacters() {
 void Word::ComputeBytesPresent() {
   for ( const auto &character : characters_ ) {
     for ( uint8_t byte : character->Base() ) {
-      bytes_present_.set( byte );
+      bytes_present_ |= uint64_t( 1 ) << ByteBit( byte );
     }
   }
 }
 
 
 Word::Word( std::string&& text )
-  : text_( std::move( text ) ) {
+  : text_( std::move( text ) ),
+    bytes_present_( 0 ) {
   BreakIntoCharacters();
   ComputeBytesPresent();
 }
@@ -20,16 +20,13 @@
 
 #include "Character.h"
 
-#include <bitset>
+#include <algorithm>
+#include <cstdint>
 #include <string>
 #include <vector>
 
-#define NUM_BYTES 256
-
 namespace YouCompleteMe {
 
-using Bitset = std::bitset< NUM_BYTES >;
-
 
 // This class represents a sequence of UTF-8 characters. It takes a UTF-8
 // encoded string and splits that string into characters following the rules in
@@ -56,12 +53,23 @@ public:
     return characters_.size();
   }
 
-  // Returns true if the word contains the bytes from another word (it may also
-  // contain other bytes).
+  // Returns true if the word may contain the bytes from another word (it may
+  // also contain other bytes). Bytes are tracked in a 64-bit mask where some of
+  // them share the same bit so this can return true even if a byte is missing
+  // but never returns false if all of them are present.
   inline bool ContainsBytes( const Word &other ) const {
     return ( bytes_present_ & other.bytes_present_ ) == other.bytes_present_;
   }
 
+  // Returns true if the word starts with the characters of another word. Any
+  // candidate matching this word then also matches the other word.
+  inline bool StartsWith( const Word &other ) const {
+    return Length() >= other.Length() &&
+           std::equal( other.characters_.begin(),
+                       other.characters_.end(),
+                       characters_.begin() );
+  }
+
   inline bool IsEmpty() const {
     return characters_.empty();
   }
@@ -72,7 +80,7 @@ private:
 
   std::string text_;
   CharacterSequence characters_;
-  Bitset bytes_present_;
+  uint64_t bytes_present_;
 };
 
 } // namespace YouCompleteMe
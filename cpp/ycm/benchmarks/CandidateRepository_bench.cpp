@@ -0,0 +1,87 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "BenchUtils.h"
+#include "CandidateRepository.h"
+#include "CharacterRepository.h"
+#include "CodePointRepository.h"
+
+#include <benchmark/benchmark_api.h>
+
+namespace YouCompleteMe {
+
+// The repositories are shared by all threads so only the first thread clears
+// them. The threads wait for each other on the first call to KeepRunning.
+void ClearRepositories( const benchmark::State& state ) {
+  if ( state.thread_index == 0 ) {
+    CodePointRepository::Instance().ClearCodePoints();
+    CharacterRepository::Instance().ClearCharacters();
+    CandidateRepository::Instance().ClearCandidates();
+  }
+}
+
+
+// Each thread stores new candidates in the repository, like when tag files,
+// buffers, and semantic completions are processed at the same time.
+void GetUnstoredCandidatesConcurrently( benchmark::State& state ) {
+  ClearRepositories( state );
+
+  std::string prefix = "a_A_" + std::to_string( state.thread_index ) + "_";
+  size_t iteration = 0;
+
+  while ( state.KeepRunning() ) {
+    CandidateRepository::Instance().GetCandidatesForStrings(
+      GenerateCandidatesWithCommonPrefix(
+        prefix + std::to_string( iteration++ ) + "_", state.range( 0 ) ) );
+  }
+
+  state.SetItemsProcessed( state.iterations() * state.range( 0 ) );
+}
+
+
+// All threads look up the same stored candidates, like when several
+// completion requests are filtered at the same time.
+void GetStoredCandidatesConcurrently( benchmark::State& state ) {
+  ClearRepositories( state );
+
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_", state.range( 0 ) );
+  if ( state.thread_index == 0 ) {
+    CandidateRepository::Instance().GetCandidatesForStrings(
+      std::vector< std::string >( candidates ) );
+  }
+
+  while ( state.KeepRunning() ) {
+    CandidateRepository::Instance().GetCandidatesForStrings(
+      std::vector< std::string >( candidates ) );
+  }
+
+  state.SetItemsProcessed( state.iterations() * state.range( 0 ) );
+}
+
+
+BENCHMARK( GetUnstoredCandidatesConcurrently )
+    ->Arg( 1 << 12 )
+    ->ThreadRange( 1, 8 )
+    ->UseRealTime();
+
+BENCHMARK( GetStoredCandidatesConcurrently )
+    ->Arg( 1 << 12 )
+    ->ThreadRange( 1, 8 )
+    ->UseRealTime();
+
+} // namespace YouCompleteMe
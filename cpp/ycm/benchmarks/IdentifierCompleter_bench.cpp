@@ -51,14 +51,40 @@ BENCHMARK_DEFINE_F( IdentifierCompleterFixture, CandidatesWithCommonPrefix )(
 }
 
 
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, NoCandidatesWithCommonPrefix )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > candidates;
+  candidates = GenerateCandidatesWithCommonPrefix( "a_A_a_",
+                                                   state.range( 0 ) );
+  IdentifierCompleter completer( std::move( candidates ) );
+
+  // None of the candidates contain a digit. The queries alternate so that the
+  // matches of the previous query are not reused.
+  bool odd_iteration = false;
+  while ( state.KeepRunning() ) {
+    completer.CandidatesForQuery( odd_iteration ? "a1" : "a2",
+                                  state.range( 1 ) );
+    odd_iteration = !odd_iteration;
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
 BENCHMARK_REGISTER_F( IdentifierCompleterFixture, CandidatesWithCommonPrefix )
     ->RangeMultiplier( 1 << 4 )
-    ->Ranges( { { 1, 1 << 16 }, { 0, 0 } } )
+    ->Ranges( { { 1, 1 << 20 }, { 0, 0 } } )
     ->Complexity();
 
 BENCHMARK_REGISTER_F( IdentifierCompleterFixture, CandidatesWithCommonPrefix )
     ->RangeMultiplier( 1 << 4 )
-    ->Ranges( { { 1, 1 << 16 }, { 10, 10 } } )
+    ->Ranges( { { 1, 1 << 20 }, { 10, 10 } } )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, NoCandidatesWithCommonPrefix )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 20 }, { 10, 10 } } )
     ->Complexity();
 
 } // namespace YouCompleteMe
@@ -30,6 +30,7 @@ public:
   void SetUp( const benchmark::State& ) {
     CodePointRepository::Instance().ClearCodePoints();
     CharacterRepository::Instance().ClearCharacters();
+    ClearFilterAndSortCandidatesCache();
     CandidateRepository::Instance().ClearCandidates();
   }
 };
@@ -53,6 +54,7 @@ BENCHMARK_DEFINE_F( PythonSupportFixture,
   while ( state.KeepRunning() ) {
     state.PauseTiming();
     CharacterRepository::Instance().ClearCharacters();
+    ClearFilterAndSortCandidatesCache();
     CandidateRepository::Instance().ClearCandidates();
     state.ResumeTiming();
     FilterAndSortCandidates( candidates, "insertion_text", "aA",
@@ -83,6 +85,9 @@ BENCHMARK_DEFINE_F( PythonSupportFixture,
                            state.range( 1 ) );
 
   while ( state.KeepRunning() ) {
+    state.PauseTiming();
+    ClearFilterAndSortCandidatesCache();
+    state.ResumeTiming();
     FilterAndSortCandidates( candidates, "insertion_text", "aA",
                              state.range( 1 ) );
   }
@@ -91,6 +96,31 @@ BENCHMARK_DEFINE_F( PythonSupportFixture,
 }
 
 
+BENCHMARK_DEFINE_F( PythonSupportFixture,
+                    FilterAndSortCandidateListWithCommonPrefix )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > raw_candidates;
+  raw_candidates = GenerateCandidatesWithCommonPrefix( "a_A_a_",
+                                                       state.range( 0 ) );
+
+  pybind11::list candidates;
+  for ( auto insertion_text : raw_candidates ) {
+    pybind11::dict candidate;
+    candidate[ "insertion_text" ] = insertion_text;
+    candidates.append( candidate );
+  }
+
+  CandidateList candidate_list( candidates, "insertion_text" );
+
+  while ( state.KeepRunning() ) {
+    candidate_list.FilterAndSort( "aA", state.range( 1 ) );
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
 BENCHMARK_REGISTER_F( PythonSupportFixture,
                       FilterAndSortUnstoredCandidatesWithCommonPrefix )
     ->RangeMultiplier( 1 << 4 )
@@ -116,4 +146,17 @@ BENCHMARK_REGISTER_F( PythonSupportFixture,
     ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
     ->Complexity();
 
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      FilterAndSortCandidateListWithCommonPrefix )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 0, 0 } } )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      FilterAndSortCandidateListWithCommonPrefix )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
+    ->Complexity();
+
 } // namespace YouCompleteMe
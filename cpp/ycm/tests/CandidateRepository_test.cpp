@@ -20,6 +20,8 @@
 #include "Candidate.h"
 #include "Result.h"
 
+#include <future>
+
 namespace YouCompleteMe {
 
 class CandidateRepositoryTest : public ::testing::Test {
@@ -83,6 +85,73 @@ TEST_F( CandidateRepositoryTest, NonPrintableCandidates ) {
   EXPECT_EQ( "\x01\x05\x0a\x15", candidates[ 0 ]->Text() );
 }
 
+TEST_F( CandidateRepositoryTest, SameCandidatesFromConcurrentRequests ) {
+  std::vector< std::string > inputs;
+  for ( int i = 0; i < 1000; ++i ) {
+    inputs.push_back( "foo" + std::to_string( i ) );
+  }
+
+  auto get_candidates = [ this, &inputs ]() {
+    return repo_.GetCandidatesForStrings(
+      std::vector< std::string >( inputs ) );
+  };
+  std::future< std::vector< const Candidate * > > other_candidates =
+    std::async( std::launch::async, get_candidates );
+  std::vector< const Candidate * > candidates = get_candidates();
+
+  EXPECT_EQ( candidates, other_candidates.get() );
+  EXPECT_EQ( 1000U, repo_.NumStoredCandidates() );
+  EXPECT_EQ( "foo999", candidates[ 999 ]->Text() );
+}
+
+
+TEST_F( CandidateRepositoryTest, DuplicateCandidates ) {
+  std::vector< const Candidate * > candidates =
+    repo_.GetCandidatesForStrings( { "foo", "bar", "foo" } );
+
+  EXPECT_EQ( candidates[ 0 ], candidates[ 2 ] );
+  EXPECT_NE( candidates[ 0 ], candidates[ 1 ] );
+  EXPECT_EQ( 2U, repo_.NumStoredCandidates() );
+}
+
+TEST_F( CandidateRepositoryTest, ClearUnusedCandidates ) {
+  std::vector< const Candidate * > candidates =
+    repo_.GetCandidatesForStrings( { "foo", "bar", "foo" } );
+  EXPECT_EQ( 0U, repo_.NumUnusedCandidates() );
+
+  // The first "foo" still holds a reference.
+  repo_.ReleaseCandidates( { candidates[ 1 ], candidates[ 2 ] } );
+  EXPECT_EQ( 1U, repo_.NumUnusedCandidates() );
+
+  repo_.ClearUnusedCandidates();
+  EXPECT_EQ( 1U, repo_.NumStoredCandidates() );
+  EXPECT_EQ( 0U, repo_.NumUnusedCandidates() );
+
+  repo_.ReleaseCandidates( { candidates[ 0 ] } );
+  EXPECT_EQ( 1U, repo_.NumUnusedCandidates() );
+
+  // An unused candidate is reused until it's cleared.
+  EXPECT_EQ( candidates[ 0 ],
+             repo_.GetCandidatesForStrings( { "foo" } )[ 0 ] );
+  EXPECT_EQ( 0U, repo_.NumUnusedCandidates() );
+}
+
+
+TEST_F( CandidateRepositoryTest, ClearUnusedCandidatesWhenReleased ) {
+  std::vector< std::string > inputs;
+  for ( int i = 0; i < 20000; ++i ) {
+    inputs.push_back( "foo" + std::to_string( i ) );
+  }
+  std::vector< const Candidate * > candidates =
+    repo_.GetCandidatesForStrings( std::move( inputs ) );
+  repo_.GetCandidatesForStrings( { "bar" } );
+
+  repo_.ReleaseCandidates( candidates );
+
+  EXPECT_EQ( 1U, repo_.NumStoredCandidates() );
+  EXPECT_EQ( 0U, repo_.NumUnusedCandidates() );
+}
+
 
 } // namespace YouCompleteMe
 
@@ -241,4 +241,19 @@ TEST( ClangCompleterTest, ExceptionThrownOnReparseFailure ) {
   }
 }
 
+
+TEST( ClangCompleterTest, HasTranslationUnit ) {
+  ClangCompleter completer;
+  std::string filename = PathToTestFile( "basic.cpp" ).string();
+  EXPECT_FALSE( completer.HasTranslationUnit( filename ) );
+
+  completer.UpdateTranslationUnit( filename,
+                                   std::vector< UnsavedFile >(),
+                                   std::vector< std::string >() );
+  EXPECT_TRUE( completer.HasTranslationUnit( filename ) );
+
+  completer.DeleteCachesForFile( filename );
+  EXPECT_FALSE( completer.HasTranslationUnit( filename ) );
+}
+
 } // namespace YouCompleteMe
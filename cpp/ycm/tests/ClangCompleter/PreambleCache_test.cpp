@@ -0,0 +1,240 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "PreambleCache.h"
+#include "../TestUtils.h"
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+
+#include <boost/filesystem/fstream.hpp>
+#include <clang-c/Index.h>
+#include <ctime>
+
+namespace YouCompleteMe {
+
+using ::testing::ElementsAre;
+using ::testing::IsEmpty;
+using ::testing::Not;
+
+TEST( IncludePrefixTest, NoIncludes ) {
+  EXPECT_EQ( "", IncludePrefix( "" ) );
+  EXPECT_EQ( "", IncludePrefix( "int main() {}\n#include <vector>\n" ) );
+}
+
+
+TEST( IncludePrefixTest, IncludesOnly ) {
+  EXPECT_EQ( "#include <vector>\n"
+             "#include \"foo.h\"\n"
+             "#import <Foundation/Foundation.h>\n",
+             IncludePrefix( "#include <vector>\n"
+                            "  #  include \"foo.h\"  \r\n"
+                            "#import <Foundation/Foundation.h>" ) );
+}
+
+
+TEST( IncludePrefixTest, CommentsBlankLinesAndPragmaOnceIgnored ) {
+  EXPECT_EQ( "#include <vector>\n"
+             "#include <string>\n",
+             IncludePrefix( "// Copyright\n"
+                            "/* A\n"
+                            " * comment. */\n"
+                            "\n"
+                            "#pragma once\n"
+                            "#include <vector>\n"
+                            "/* Inline comment */ #include <string>\n"
+                            "int main() {}\n" ) );
+}
+
+
+TEST( IncludePrefixTest, StopsAtOtherDirectives ) {
+  EXPECT_EQ( "#include <vector>\n",
+             IncludePrefix( "#include <vector>\n"
+                            "#define NDEBUG\n"
+                            "#include <cassert>\n" ) );
+  EXPECT_EQ( "",
+             IncludePrefix( "#ifndef FOO_H\n"
+                            "#include <vector>\n" ) );
+}
+
+
+class PreambleCacheTest : public ::testing::Test {
+protected:
+  virtual void SetUp() {
+    clang_index_ = clang_createIndex( 0, 0 );
+    cache_directory_ = fs::temp_directory_path() / fs::unique_path();
+    unsaved_file_.filename_ = PathToTestFile( "preamble.cpp" ).string();
+    unsaved_file_.contents_ = "#include \"preamble.h\"\n"
+                              "Foo foo;\n";
+    unsaved_file_.length_ = unsaved_file_.contents_.size();
+  }
+
+  virtual void TearDown() {
+    clang_disposeIndex( clang_index_ );
+    fs::remove_all( cache_directory_ );
+  }
+
+  CXIndex clang_index_;
+  fs::path cache_directory_;
+  UnsavedFile unsaved_file_;
+};
+
+
+TEST_F( PreambleCacheTest, PreambleBuiltAndReused ) {
+  PreambleCache cache( clang_index_, cache_directory_.string() );
+  std::vector< std::string > flags{ "-x", "c++" };
+  std::string pch_path;
+
+  std::vector< std::string > flags_with_preamble = cache.FlagsWithPreamble(
+    unsaved_file_.filename_, { unsaved_file_ }, flags, pch_path );
+  EXPECT_THAT( flags_with_preamble,
+               ElementsAre( "-x", "c++",
+                            "-iquote",
+                            fs::path( unsaved_file_.filename_ )
+                              .parent_path().string(),
+                            "-include-pch", pch_path ) );
+  EXPECT_TRUE( fs::exists( pch_path ) );
+  EXPECT_TRUE( cache.IsUpToDate( pch_path ) );
+
+  // Another cache sharing the directory reuses the PCH.
+  std::time_t pch_time = fs::last_write_time( pch_path );
+  PreambleCache other_cache( clang_index_, cache_directory_.string() );
+  std::string other_pch_path;
+  EXPECT_EQ( flags_with_preamble,
+             other_cache.FlagsWithPreamble(
+               unsaved_file_.filename_, { unsaved_file_ }, flags,
+               other_pch_path ) );
+  EXPECT_EQ( pch_path, other_pch_path );
+  EXPECT_EQ( pch_time, fs::last_write_time( pch_path ) );
+}
+
+
+TEST_F( PreambleCacheTest, PreambleOutdatedWhenIncludedFileModified ) {
+  PreambleCache cache( clang_index_, cache_directory_.string() );
+  std::string pch_path;
+  cache.FlagsWithPreamble( unsaved_file_.filename_,
+                           { unsaved_file_ },
+                           { "-x", "c++" },
+                           pch_path );
+  ASSERT_TRUE( cache.IsUpToDate( pch_path ) );
+
+  fs::path header = PathToTestFile( "preamble.h" );
+  std::time_t header_time = fs::last_write_time( header );
+  fs::last_write_time( header, fs::last_write_time( pch_path ) + 1 );
+  EXPECT_FALSE( cache.IsUpToDate( pch_path ) );
+  fs::last_write_time( header, header_time );
+}
+
+
+TEST_F( PreambleCacheTest, NoPreambleWhenIncludedFileHasUnsavedChanges ) {
+  PreambleCache cache( clang_index_, cache_directory_.string() );
+  UnsavedFile header;
+  header.filename_ = PathToTestFile( "preamble.h" ).string();
+  header.contents_ = "struct Foo {};";
+  header.length_ = header.contents_.size();
+  std::vector< std::string > flags{ "-x", "c++" };
+  std::string pch_path;
+
+  EXPECT_EQ( flags, cache.FlagsWithPreamble( unsaved_file_.filename_,
+                                             { unsaved_file_, header },
+                                             flags,
+                                             pch_path ) );
+  EXPECT_THAT( pch_path, IsEmpty() );
+}
+
+
+TEST_F( PreambleCacheTest, PreambleNotUsableWithUnsavedIncludedFile ) {
+  PreambleCache cache( clang_index_, cache_directory_.string() );
+  std::string pch_path;
+  cache.FlagsWithPreamble( unsaved_file_.filename_,
+                           { unsaved_file_ },
+                           { "-x", "c++" },
+                           pch_path );
+  ASSERT_THAT( pch_path, Not( IsEmpty() ) );
+  EXPECT_TRUE( cache.IsUsable( pch_path,
+                               unsaved_file_.filename_,
+                               { unsaved_file_ } ) );
+
+  UnsavedFile header;
+  header.filename_ = PathToTestFile( "preamble.h" ).string();
+  header.contents_ = "struct Foo {};";
+  header.length_ = header.contents_.size();
+  EXPECT_FALSE( cache.IsUsable( pch_path,
+                                unsaved_file_.filename_,
+                                { unsaved_file_, header } ) );
+}
+
+
+TEST_F( PreambleCacheTest, NoPreambleWhenPrefixHasErrors ) {
+  PreambleCache cache( clang_index_, cache_directory_.string() );
+  unsaved_file_.contents_ = "#include \"missing.h\"\n";
+  unsaved_file_.length_ = unsaved_file_.contents_.size();
+  std::vector< std::string > flags{ "-x", "c++" };
+  std::string pch_path;
+
+  EXPECT_EQ( flags, cache.FlagsWithPreamble( unsaved_file_.filename_,
+                                             { unsaved_file_ },
+                                             flags,
+                                             pch_path ) );
+  EXPECT_THAT( pch_path, IsEmpty() );
+}
+
+
+TEST_F( PreambleCacheTest, FailedPreambleRetriedWhenIncludedFileModified ) {
+  fs::path header_directory = fs::temp_directory_path() / fs::unique_path();
+  fs::create_directories( header_directory );
+  fs::path header = header_directory / "broken.h";
+  fs::ofstream( header ) << "int foo = ;\n";
+  unsaved_file_.contents_ = "#include \"" + header.string() + "\"\n";
+  unsaved_file_.length_ = unsaved_file_.contents_.size();
+  PreambleCache cache( clang_index_, cache_directory_.string() );
+  std::vector< std::string > flags{ "-x", "c++" };
+  std::string pch_path;
+
+  EXPECT_EQ( flags, cache.FlagsWithPreamble( unsaved_file_.filename_,
+                                             { unsaved_file_ },
+                                             flags,
+                                             pch_path ) );
+  EXPECT_THAT( pch_path, IsEmpty() );
+
+  // The header is fixed.
+  fs::ofstream( header ) << "int foo = 42;\n";
+  fs::last_write_time( header, std::time( nullptr ) + 1 );
+  cache.FlagsWithPreamble( unsaved_file_.filename_,
+                           { unsaved_file_ },
+                           flags,
+                           pch_path );
+  EXPECT_THAT( pch_path, Not( IsEmpty() ) );
+
+  fs::remove_all( header_directory );
+}
+
+
+TEST_F( PreambleCacheTest, NoPreambleWhenAlreadyUsingPch ) {
+  PreambleCache cache( clang_index_, cache_directory_.string() );
+  std::vector< std::string > flags{ "-include-pch", "foo.pch" };
+  std::string pch_path;
+
+  EXPECT_EQ( flags, cache.FlagsWithPreamble( unsaved_file_.filename_,
+                                             { unsaved_file_ },
+                                             flags,
+                                             pch_path ) );
+  EXPECT_THAT( pch_path, IsEmpty() );
+  EXPECT_FALSE( fs::exists( cache_directory_ ) );
+}
+
+} // namespace YouCompleteMe
@@ -0,0 +1,144 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "TranslationUnitStore.h"
+#include "../TestUtils.h"
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+
+#include <clang-c/Index.h>
+
+namespace YouCompleteMe {
+
+class TranslationUnitStoreTest : public ::testing::Test {
+protected:
+  virtual void SetUp() {
+    clang_index_ = clang_createIndex( 0, 0 );
+    basic_file_ = PathToTestFile( "basic.cpp" ).string();
+    goto_file_ = PathToTestFile( "goto.cpp" ).string();
+    unsaved_file_.filename_ = PathToTestFile( "unsaved_file.cpp" ).string();
+    unsaved_file_.contents_ = "int main() { return 0; }\n";
+    unsaved_file_.length_ = unsaved_file_.contents_.size();
+  }
+
+  virtual void TearDown() {
+    clang_disposeIndex( clang_index_ );
+  }
+
+  std::shared_ptr< TranslationUnit > GetOrCreate(
+    TranslationUnitStore &store,
+    const std::string &filename ) {
+    return store.GetOrCreate( filename,
+                              std::vector< UnsavedFile >{ unsaved_file_ },
+                              std::vector< std::string >() );
+  }
+
+  CXIndex clang_index_;
+  std::string basic_file_;
+  std::string goto_file_;
+  UnsavedFile unsaved_file_;
+};
+
+
+TEST_F( TranslationUnitStoreTest, UnlimitedByDefault ) {
+  TranslationUnitStore store( clang_index_ );
+  GetOrCreate( store, basic_file_ );
+  GetOrCreate( store, goto_file_ );
+  GetOrCreate( store, unsaved_file_.filename_ );
+
+  TranslationUnitStoreStatistics statistics = store.GetStatistics();
+  EXPECT_EQ( 3, statistics.num_units_ );
+  EXPECT_LT( 0, statistics.memory_usage_ );
+  EXPECT_EQ( 0, statistics.max_units_ );
+  EXPECT_EQ( 0, statistics.max_memory_usage_ );
+  EXPECT_EQ( 0, statistics.num_evictions_ );
+}
+
+
+TEST_F( TranslationUnitStoreTest, LeastRecentlyUsedUnitEvicted ) {
+  TranslationUnitStore store( clang_index_, 2 );
+  GetOrCreate( store, basic_file_ );
+  GetOrCreate( store, goto_file_ );
+  // The basic file is now more recently used than the goto one.
+  GetOrCreate( store, basic_file_ );
+  GetOrCreate( store, unsaved_file_.filename_ );
+
+  EXPECT_TRUE( store.Get( basic_file_ ) );
+  EXPECT_FALSE( store.Get( goto_file_ ) );
+  EXPECT_TRUE( store.Get( unsaved_file_.filename_ ) );
+
+  TranslationUnitStoreStatistics statistics = store.GetStatistics();
+  EXPECT_EQ( 2, statistics.num_units_ );
+  EXPECT_EQ( 2, statistics.max_units_ );
+  EXPECT_EQ( 1, statistics.num_evictions_ );
+}
+
+
+TEST_F( TranslationUnitStoreTest, UnitsInUseNotEvicted ) {
+  TranslationUnitStore store( clang_index_, 1 );
+  std::shared_ptr< TranslationUnit > basic_unit =
+    GetOrCreate( store, basic_file_ );
+  GetOrCreate( store, goto_file_ );
+
+  // The basic unit is still used so the goto unit is evicted instead, once it
+  // is not used anymore.
+  EXPECT_TRUE( store.Get( basic_file_ ) );
+  EXPECT_TRUE( store.Get( goto_file_ ) );
+  GetOrCreate( store, basic_file_ );
+  EXPECT_TRUE( store.Get( basic_file_ ) );
+  EXPECT_FALSE( store.Get( goto_file_ ) );
+
+  // The basic unit can be evicted once released.
+  basic_unit.reset();
+  GetOrCreate( store, unsaved_file_.filename_ );
+  EXPECT_FALSE( store.Get( basic_file_ ) );
+  EXPECT_TRUE( store.Get( unsaved_file_.filename_ ) );
+  EXPECT_EQ( 2, store.GetStatistics().num_evictions_ );
+}
+
+
+TEST_F( TranslationUnitStoreTest, UnitsEvictedWhenMaxMemoryUsageReached ) {
+  TranslationUnitStore store( clang_index_, 0, 1 );
+  GetOrCreate( store, basic_file_ );
+  std::shared_ptr< TranslationUnit > goto_unit =
+    GetOrCreate( store, goto_file_ );
+
+  // The goto unit is too large but is kept while it is used.
+  EXPECT_FALSE( store.Get( basic_file_ ) );
+  EXPECT_TRUE( store.Get( goto_file_ ) );
+  EXPECT_LT( 0, goto_unit->EstimatedMemoryUsage() );
+
+  TranslationUnitStoreStatistics statistics = store.GetStatistics();
+  EXPECT_EQ( 1, statistics.num_units_ );
+  EXPECT_EQ( goto_unit->EstimatedMemoryUsage(), statistics.memory_usage_ );
+  EXPECT_EQ( 1, statistics.max_memory_usage_ );
+  EXPECT_EQ( 1, statistics.num_evictions_ );
+}
+
+
+TEST_F( TranslationUnitStoreTest, RemovedUnitNotEvicted ) {
+  TranslationUnitStore store( clang_index_, 1 );
+  GetOrCreate( store, basic_file_ );
+  EXPECT_TRUE( store.Remove( basic_file_ ) );
+  GetOrCreate( store, goto_file_ );
+
+  EXPECT_TRUE( store.Get( goto_file_ ) );
+  EXPECT_EQ( 0, store.GetStatistics().num_evictions_ );
+}
+
+} // namespace YouCompleteMe
@@ -24,6 +24,7 @@
 #include <gmock/gmock.h>
 
 #include <clang-c/Index.h>
+#include <fstream>
 
 using ::testing::ElementsAre;
 using ::testing::WhenSorted;
@@ -165,6 +166,43 @@ TEST_F( TranslationUnitTest, GoToWorks ) {
 }
 
 
+TEST_F( TranslationUnitTest, ReparseOnlyWhenUnsavedFilesChange ) {
+  fs::path directory = fs::temp_directory_path() / fs::unique_path();
+  fs::create_directories( directory );
+  std::string header = ( directory / "header.h" ).string();
+  std::ofstream( header ) << "typedef int Foo;\n";
+
+  UnsavedFile unsaved_file;
+  unsaved_file.filename_ = ( directory / "main.cpp" ).string();
+  unsaved_file.contents_ = "#include \"header.h\"\n"
+                           "Foo foo;\n";
+  unsaved_file.length_ = unsaved_file.contents_.size();
+
+  TranslationUnit unit( unsaved_file.filename_,
+                        { unsaved_file },
+                        { "-x", "c++" },
+                        clang_index_ );
+  EXPECT_EQ( "Foo => int",
+             unit.GetTypeAtLocation( unsaved_file.filename_, 2, 5,
+                                     { unsaved_file } ) );
+
+  // The unsaved file didn't change so the TU is not reparsed and the change to
+  // the header is not seen.
+  std::ofstream( header ) << "typedef double Foo;\n";
+  EXPECT_EQ( "Foo => int",
+             unit.GetTypeAtLocation( unsaved_file.filename_, 2, 5,
+                                     { unsaved_file } ) );
+
+  unsaved_file.contents_ += "\n";
+  unsaved_file.length_ = unsaved_file.contents_.size();
+  EXPECT_EQ( "Foo => double",
+             unit.GetTypeAtLocation( unsaved_file.filename_, 2, 5,
+                                     { unsaved_file } ) );
+
+  fs::remove_all( directory );
+}
+
+
 TEST_F( TranslationUnitTest, InvalidTranslationUnitStore ) {
   // libclang fails to parse a file with no extension and no language flag -x
   // given.
@@ -0,0 +1,102 @@
+// Copyright (C) 2018 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "UnsavedFileStore.h"
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+
+namespace YouCompleteMe {
+
+using ::testing::ElementsAre;
+using ::testing::Field;
+using ::testing::IsEmpty;
+using ::testing::StrEq;
+
+namespace {
+
+UnsavedFile File( const std::string &filename,
+                  std::uint64_t version,
+                  const std::string &contents = std::string() ) {
+  UnsavedFile unsaved_file;
+  unsaved_file.filename_ = filename;
+  unsaved_file.contents_ = contents;
+  unsaved_file.length_ = contents.size();
+  unsaved_file.version_ = version;
+  return unsaved_file;
+}
+
+} // unnamed namespace
+
+
+TEST( UnsavedFileStoreTest, StoredFilesReused ) {
+  UnsavedFileStore store;
+  std::vector< UnsavedFile > unsaved_files{ File( "foo.cpp", 1, "foo" ),
+                                            File( "bar.h", 2, "bar" ) };
+  UnsavedFilesSnapshot first = store.Update( unsaved_files );
+  EXPECT_THAT( *first, ElementsAre(
+    Field( &UnsavedFile::contents_, StrEq( "foo" ) ),
+    Field( &UnsavedFile::contents_, StrEq( "bar" ) ) ) );
+
+  // Nothing changed so the same snapshot is returned.
+  unsaved_files = { File( "bar.h", 2 ), File( "foo.cpp", 1 ) };
+  UnsavedFilesSnapshot second = store.Update( unsaved_files );
+  EXPECT_EQ( first, second );
+
+  // Only the changed file is sent. The previous snapshots are still valid.
+  unsaved_files = { File( "foo.cpp", 3, "foo2" ), File( "bar.h", 2 ) };
+  UnsavedFilesSnapshot third = store.Update( unsaved_files );
+  EXPECT_THAT( *third, ElementsAre(
+    Field( &UnsavedFile::contents_, StrEq( "foo2" ) ),
+    Field( &UnsavedFile::contents_, StrEq( "bar" ) ) ) );
+  EXPECT_THAT( *first, ElementsAre(
+    Field( &UnsavedFile::contents_, StrEq( "foo" ) ),
+    Field( &UnsavedFile::contents_, StrEq( "bar" ) ) ) );
+}
+
+
+TEST( UnsavedFileStoreTest, ClosedFilesRemoved ) {
+  UnsavedFileStore store;
+  std::vector< UnsavedFile > unsaved_files{ File( "foo.cpp", 1, "foo" ),
+                                            File( "bar.h", 2, "bar" ) };
+  store.Update( unsaved_files );
+
+  unsaved_files = { File( "foo.cpp", 1 ) };
+  EXPECT_THAT( *store.Update( unsaved_files ), ElementsAre(
+    Field( &UnsavedFile::filename_, StrEq( "foo.cpp" ) ) ) );
+
+  unsaved_files = {};
+  EXPECT_THAT( *store.Update( unsaved_files ), IsEmpty() );
+}
+
+
+TEST( UnsavedFileStoreTest, UnknownVersion ) {
+  UnsavedFileStore store;
+  std::vector< UnsavedFile > unsaved_files{ File( "foo.cpp", 1, "foo" ) };
+  UnsavedFilesSnapshot snapshot = store.Update( unsaved_files );
+
+  unsaved_files = { File( "foo.cpp", 2 ) };
+  EXPECT_THROW( store.Update( unsaved_files ), std::runtime_error );
+  unsaved_files = { File( "bar.cpp", 1 ) };
+  EXPECT_THROW( store.Update( unsaved_files ), std::runtime_error );
+
+  // The store is left untouched.
+  unsaved_files = { File( "foo.cpp", 1 ) };
+  EXPECT_EQ( snapshot, store.Update( unsaved_files ) );
+}
+
+} // namespace YouCompleteMe
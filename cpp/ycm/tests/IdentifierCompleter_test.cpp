@@ -17,6 +17,7 @@
 
 #include <gtest/gtest.h>
 #include <gmock/gmock.h>
+#include "CandidateRepository.h"
 #include "IdentifierCompleter.h"
 #include "Utils.h"
 #include "TestUtils.h"
@@ -328,5 +329,72 @@ TEST( IdentifierCompleterTest, ManyCandidateSimpleWrongFileType ) {
                IsEmpty() );
 }
 
+
+TEST( IdentifierCompleterTest, RemoveIdentifiersFromDatabase ) {
+  IdentifierCompleter completer;
+  completer.AddIdentifiersToDatabase( { "foobar", "foobaz", "fooqux" },
+                                      "c",
+                                      "foo" );
+  completer.AddIdentifiersToDatabase( { "foobaz" }, "c", "bar" );
+
+  completer.RemoveIdentifiersFromDatabase( { "foobar", "foobaz", "unknown" },
+                                           "c",
+                                           "foo" );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "foo", "c" ),
+               WhenSorted( ElementsAre( "foobaz",
+                                        "fooqux" ) ) );
+}
+
+
+TEST( IdentifierCompleterTest, RefinedQueryMatchesPreviousResults ) {
+  IdentifierCompleter completer( { "foobar", "foobaz", "fooqux", "qux" } );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "fo", "" ),
+               ElementsAre( "foobar", "foobaz", "fooqux" ) );
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "foob", "" ),
+               ElementsAre( "foobar", "foobaz" ) );
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "foobz", "" ),
+               ElementsAre( "foobaz" ) );
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "q", "" ),
+               ElementsAre( "qux", "fooqux" ) );
+}
+
+
+TEST( IdentifierCompleterTest, RefinedQueryMatchesAddedIdentifiers ) {
+  IdentifierCompleter completer;
+  completer.AddIdentifiersToDatabase( { "foobar", "fooqux" }, "c", "foo" );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "fo", "c" ),
+               ElementsAre( "foobar", "fooqux" ) );
+
+  completer.AddIdentifiersToDatabase( { "foobaz" }, "c", "bar" );
+  completer.RemoveIdentifiersFromDatabase( { "foobar" }, "c", "foo" );
+
+  EXPECT_THAT( completer.CandidatesForQueryAndType( "foo", "c" ),
+               ElementsAre( "foobaz", "fooqux" ) );
+}
+
+
+TEST( IdentifierCompleterTest, ReleaseRemovedIdentifiers ) {
+  CandidateRepository &repository = CandidateRepository::Instance();
+  repository.ClearCandidates();
+
+  {
+    IdentifierCompleter completer;
+    completer.AddIdentifiersToDatabase( { "foo", "bar" }, "c", "foo" );
+    completer.AddIdentifiersToDatabase( { "foo" }, "c", "bar" );
+    EXPECT_EQ( 0U, repository.NumUnusedCandidates() );
+
+    completer.RemoveIdentifiersFromDatabase( { "foo", "qux" }, "c", "foo" );
+    EXPECT_EQ( 1U, repository.NumUnusedCandidates() );
+
+    completer.ClearForFileAndAddIdentifiersToDatabase( {}, "c", "bar" );
+    EXPECT_EQ( 2U, repository.NumUnusedCandidates() );
+  }
+
+  EXPECT_EQ( 3U, repository.NumUnusedCandidates() );
+}
+
 } // namespace YouCompleteMe
 
@@ -21,13 +21,16 @@
 
 #include <gtest/gtest.h>
 #include <gmock/gmock.h>
+#include <algorithm>
 #include <boost/filesystem.hpp>
+#include <boost/filesystem/fstream.hpp>
 
 namespace YouCompleteMe {
 
 namespace fs = boost::filesystem;
 using ::testing::ElementsAre;
 using ::testing::ContainerEq;
+using ::testing::Not;
 using ::testing::WhenSorted;
 using ::testing::Pair;
 using ::testing::UnorderedElementsAre;
@@ -93,5 +96,53 @@ TEST( IdentifierUtilsTest, TagFileInvalidPath ) {
                ContainerEq( FiletypeIdentifierMap() ) );
 }
 
+
+TEST( IdentifierUtilsTest, ExtractIdentifiersFromTagsFileUsingSnapshot ) {
+  fs::path directory = fs::temp_directory_path() / fs::unique_path();
+  fs::create_directories( directory );
+  fs::path tag_file = directory / "tags";
+  fs::copy_file( PathToTestFile( "basic.tags" ), tag_file );
+  fs::path snapshot_directory = directory / "snapshots";
+  FiletypeIdentifierMap identifiers = ExtractIdentifiersFromTagsFile(
+    tag_file );
+
+  // The tags file is parsed and a snapshot is written.
+  EXPECT_THAT( ExtractIdentifiersFromTagsFileUsingSnapshot(
+                 tag_file, snapshot_directory ),
+               ContainerEq( identifiers ) );
+  EXPECT_FALSE( fs::is_empty( snapshot_directory ) );
+
+  // Modify the tags file without changing its size and modification time. The
+  // identifiers are read from the snapshot.
+  std::time_t modification_time = fs::last_write_time( tag_file );
+  std::string contents;
+  {
+    fs::ifstream file( tag_file, std::ios::in | std::ios::binary );
+    contents.assign( std::istreambuf_iterator< char >( file ),
+                     std::istreambuf_iterator< char >() );
+  }
+  std::replace( contents.begin(), contents.end(), 'f', 'g' );
+  {
+    fs::ofstream file( tag_file, std::ios::out | std::ios::binary );
+    file << contents;
+  }
+  fs::last_write_time( tag_file, modification_time );
+
+  EXPECT_THAT( ExtractIdentifiersFromTagsFileUsingSnapshot(
+                 tag_file, snapshot_directory ),
+               ContainerEq( identifiers ) );
+
+  // The snapshot is invalidated when the modification time changes.
+  fs::last_write_time( tag_file, modification_time + 10 );
+  FiletypeIdentifierMap new_identifiers = ExtractIdentifiersFromTagsFile(
+    tag_file );
+  EXPECT_THAT( new_identifiers, Not( ContainerEq( identifiers ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromTagsFileUsingSnapshot(
+                 tag_file, snapshot_directory ),
+               ContainerEq( new_identifiers ) );
+
+  fs::remove_all( directory );
+}
+
 } // namespace YouCompleteMe
 
@@ -0,0 +1,8 @@
+#ifndef PREAMBLE_H
+#define PREAMBLE_H
+
+struct Foo {
+  int bar;
+};
+
+#endif
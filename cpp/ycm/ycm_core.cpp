@@ -15,6 +15,8 @@
 // You should have received a copy of the GNU General Public License
 // along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
+#include "CandidateRepository.h"
+#include "CharacterRepository.h"
 #include "CodePoint.h"
 #include "IdentifierCompleter.h"
 #include "PythonSupport.h"
@@ -30,6 +32,7 @@
 #  include "Location.h"
 #  include "Range.h"
 #  include "UnsavedFile.h"
+#  include "UnsavedFileStore.h"
 #endif // USE_CLANG_COMPLETER
 
 #include <pybind11/stl_bind.h>
@@ -66,8 +69,26 @@ PYBIND11_MODULE( ycm_core, mod )
            py::arg("query"),
            py::arg("max_candidates") = 0 );
 
+  py::class_< CandidateList >( mod, "CandidateList" )
+    .def( py::init< const py::list &, const std::string & >(),
+          py::arg( "candidates" ),
+          py::arg( "candidate_property" ) )
+    .def( "FilterAndSort",
+          &CandidateList::FilterAndSort,
+          py::arg( "query" ),
+          py::arg( "max_candidates" ) = 0 );
+
   mod.def( "YcmCoreVersion", &YcmCoreVersion );
 
+  mod.def( "NumStoredCandidates", []() {
+    return CandidateRepository::Instance().NumStoredCandidates(); } );
+
+  mod.def( "NumUnusedCandidates", []() {
+    return CandidateRepository::Instance().NumUnusedCandidates(); } );
+
+  mod.def( "NumStoredCharacters", []() {
+    return CharacterRepository::Instance().NumStoredCharacters(); } );
+
   // This is exposed so that we can test it.
   mod.def( "GetUtf8String", []( py::object o ) -> py::bytes {
                                   return GetUtf8String( o ); } );
@@ -80,9 +101,14 @@ PYBIND11_MODULE( ycm_core, mod )
     .def( "ClearForFileAndAddIdentifiersToDatabase",
           &IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase,
           py::call_guard< py::gil_scoped_release >() )
+    .def( "RemoveIdentifiersFromDatabase",
+          &IdentifierCompleter::RemoveIdentifiersFromDatabase,
+          py::call_guard< py::gil_scoped_release >() )
     .def( "AddIdentifiersToDatabaseFromTagFiles",
           &IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles,
-          py::call_guard< py::gil_scoped_release >() )
+          py::call_guard< py::gil_scoped_release >(),
+          py::arg( "absolute_paths_to_tag_files" ),
+          py::arg( "snapshot_directory" ) = std::string() )
     .def( "CandidatesForQueryAndType",
           &IdentifierCompleter::CandidatesForQueryAndType,
           py::call_guard< py::gil_scoped_release >(),
@@ -105,12 +131,28 @@ PYBIND11_MODULE( ycm_core, mod )
     .def( py::init<>() )
     .def_readwrite( "filename_", &UnsavedFile::filename_ )
     .def_readwrite( "contents_", &UnsavedFile::contents_ )
-    .def_readwrite( "length_", &UnsavedFile::length_ );
-
-  py::bind_vector< std::vector< UnsavedFile > >( mod, "UnsavedFileVector" );
+    .def_readwrite( "length_", &UnsavedFile::length_ )
+    .def_readwrite( "version_", &UnsavedFile::version_ );
+
+  // Held by a shared pointer so that the snapshots returned by
+  // UpdateUnsavedFiles are not copied.
+  py::bind_vector< std::vector< UnsavedFile >, UnsavedFilesSnapshot >(
+    mod, "UnsavedFileVector" );
+
+  py::class_< TranslationUnitStoreStatistics >(
+      mod, "TranslationUnitStoreStatistics" )
+    .def_readonly( "num_units_", &TranslationUnitStoreStatistics::num_units_ )
+    .def_readonly( "memory_usage_",
+                   &TranslationUnitStoreStatistics::memory_usage_ )
+    .def_readonly( "max_units_", &TranslationUnitStoreStatistics::max_units_ )
+    .def_readonly( "max_memory_usage_",
+                   &TranslationUnitStoreStatistics::max_memory_usage_ )
+    .def_readonly( "num_evictions_",
+                   &TranslationUnitStoreStatistics::num_evictions_ );
 
   py::class_< ClangCompleter >( mod, "ClangCompleter" )
     .def( py::init<>() )
+    .def( py::init< std::size_t, std::size_t, const std::string & >() )
     .def( "GetDeclarationLocation",
           &ClangCompleter::GetDeclarationLocation,
           py::call_guard< py::gil_scoped_release >() )
@@ -126,6 +168,9 @@ PYBIND11_MODULE( ycm_core, mod )
     .def( "UpdatingTranslationUnit",
           &ClangCompleter::UpdatingTranslationUnit,
           py::call_guard< py::gil_scoped_release >() )
+    .def( "HasTranslationUnit",
+          &ClangCompleter::HasTranslationUnit,
+          py::call_guard< py::gil_scoped_release >() )
     .def( "UpdateTranslationUnit",
           &ClangCompleter::UpdateTranslationUnit,
           py::call_guard< py::gil_scoped_release >() )
@@ -143,6 +188,12 @@ PYBIND11_MODULE( ycm_core, mod )
           py::call_guard< py::gil_scoped_release >() )
     .def( "GetDocsForLocationInFile",
           &ClangCompleter::GetDocsForLocationInFile,
+          py::call_guard< py::gil_scoped_release >() )
+    .def( "GetTranslationUnitStoreStatistics",
+          &ClangCompleter::GetTranslationUnitStoreStatistics,
+          py::call_guard< py::gil_scoped_release >() )
+    .def( "UpdateUnsavedFiles",
+          &ClangCompleter::UpdateUnsavedFiles,
           py::call_guard< py::gil_scoped_release >() );
 
   py::enum_< CompletionKind >( mod, "CompletionKind" )
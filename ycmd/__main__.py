@@ -28,6 +28,11 @@ sys.path.insert( 0, os.path.dirname( os.path.abspath( __file__ ) ) )
 from server_utils import SetUpPythonPath
 SetUpPythonPath()
 
+# Imports are profiled as soon as possible to include those made at startup.
+from ycmd import import_profiler
+if '--profile_imports' in sys.argv:
+  import_profiler.Enable()
+
 # Not installing aliases from python-future; it's unreliable and slow.
 from builtins import *  # noqa
 
@@ -40,8 +45,13 @@ import signal
 import os
 import base64
 
-from ycmd import extra_conf_store, user_options_store, utils
+from ycmd import extra_conf_store, metrics, user_options_store, utils
 from ycmd.hmac_plugin import HmacPlugin
+from ycmd.recording_plugin import CONTENTS_MODES, RecordingPlugin
+from ycmd.http_server import ( StdioServer,
+                               ThreadedHTTPServer,
+                               ThreadedUnixHTTPServer,
+                               UNIX_SOCKETS_SUPPORTED )
 from ycmd.utils import ( ImportAndCheckCore,
                          OpenForStdHandle,
                          ReadFile,
@@ -118,6 +128,32 @@ def ParseArguments():
                        help = 'optional file to use for stderr' )
   parser.add_argument( '--keep_logfiles', action = 'store_true', default = None,
                        help = 'retain logfiles after the server exits' )
+  parser.add_argument( '--http_server', type = str, default = 'waitress',
+                       choices = [ 'waitress', 'threaded' ],
+                       help = 'HTTP server front-end; threaded keeps '
+                              'connections alive and authenticates requests '
+                              'while reading them' )
+  parser.add_argument( '--enable_metrics', action = 'store_true',
+                       help = 'collect timings and cache statistics, served '
+                              'by the /metrics handler' )
+  parser.add_argument( '--profile_imports', action = 'store_true',
+                       help = 'measure the time spent importing modules, '
+                              'reported by the /debug_info handler' )
+  parser.add_argument( '--record_requests', type = str, default = None,
+                       metavar = 'PATH',
+                       help = 'append the incoming requests to this '
+                              'gzip-compressed JSON Lines file' )
+  parser.add_argument( '--record_requests_contents', type = str,
+                       default = 'keep', choices = CONTENTS_MODES,
+                       help = 'record the buffer contents as is, their hash, '
+                              'or with their word characters redacted' )
+  transport = parser.add_mutually_exclusive_group()
+  transport.add_argument( '--unix_socket', type = str, default = None,
+                          help = 'listen on this Unix domain socket instead '
+                                 'of TCP' )
+  transport.add_argument( '--stdio', action = 'store_true',
+                          help = 'serve length-prefixed HTTP messages on '
+                                 'stdin and stdout instead of TCP' )
   return parser.parse_args()
 
 
@@ -147,8 +183,27 @@ def CloseStdin():
   os.close( 0 )
 
 
+def OpenStdioStreams():
+  """Returns the standard input and output as binary streams and redirects
+  sys.stdout to sys.stderr so that printed messages do not corrupt the
+  output stream."""
+  # The input is read without buffering: a thread blocked on a buffered stream
+  # prevents the interpreter from exiting.
+  input_stream = os.fdopen( sys.__stdin__.fileno(), 'rb', 0 )
+  output_stream = getattr( sys.__stdout__, 'buffer', sys.__stdout__ )
+  if utils.OnWindows():
+    import msvcrt
+    msvcrt.setmode( input_stream.fileno(), os.O_BINARY )
+    msvcrt.setmode( output_stream.fileno(), os.O_BINARY )
+  if sys.stdout is sys.__stdout__:
+    sys.stdout = sys.stderr
+  return input_stream, output_stream
+
+
 def Main():
   args = ParseArguments()
+  if args.unix_socket and not UNIX_SOCKETS_SUPPORTED:
+    sys.exit( 'Unix domain sockets are not supported on this platform.' )
 
   if args.stdout is not None:
     sys.stdout = OpenForStdHandle( args.stdout )
@@ -174,9 +229,12 @@ def Main():
   # preload has executed.
   from ycmd import handlers
   from ycmd.watchdog_plugin import WatchdogPlugin
+  if args.enable_metrics:
+    metrics.Enable()
   handlers.UpdateUserOptions( options )
   handlers.SetHmacSecret( hmac_secret )
   handlers.KeepSubserversAlive( args.check_interval_seconds )
+  handlers.PrewarmFiletypeCompleters()
   SetUpSignalHandler()
   # Functions registered by the atexit module are called at program termination
   # in last in, first out order.
@@ -186,12 +244,35 @@ def Main():
   atexit.register( handlers.ServerCleanup )
   handlers.app.install( WatchdogPlugin( args.idle_suicide_seconds,
                                         args.check_interval_seconds ) )
-  handlers.app.install( HmacPlugin( hmac_secret ) )
-  CloseStdin()
-  handlers.wsgi_server = StoppableWSGIServer( handlers.app,
-                                              host = args.host,
-                                              port = args.port,
-                                              threads = 30 )
+  if args.record_requests:
+    recording_plugin = RecordingPlugin( args.record_requests,
+                                        args.record_requests_contents )
+    atexit.register( recording_plugin.close )
+    handlers.app.install( recording_plugin )
+  # Unlike StoppableWSGIServer, these servers check the HMAC of requests and
+  # responses themselves.
+  if args.stdio:
+    handlers.wsgi_server = StdioServer( handlers.app,
+                                        hmac_secret,
+                                        *OpenStdioStreams() )
+  elif args.unix_socket:
+    CloseStdin()
+    handlers.wsgi_server = ThreadedUnixHTTPServer( handlers.app,
+                                                   hmac_secret,
+                                                   args.unix_socket )
+  elif args.http_server == 'threaded':
+    CloseStdin()
+    handlers.wsgi_server = ThreadedHTTPServer( handlers.app,
+                                               hmac_secret,
+                                               host = args.host,
+                                               port = args.port )
+  else:
+    CloseStdin()
+    handlers.app.install( HmacPlugin( hmac_secret ) )
+    handlers.wsgi_server = StoppableWSGIServer( handlers.app,
+                                                host = args.host,
+                                                port = args.port,
+                                                threads = 30 )
   handlers.wsgi_server.Run()
 
 
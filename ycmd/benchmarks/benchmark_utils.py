@@ -0,0 +1,85 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from base64 import b64encode
+import contextlib
+import json
+import threading
+
+from ycmd.hmac_utils import CreateRequestHmac
+from ycmd.utils import ToBytes
+
+HMAC_SECRET_LENGTH = 16
+SERVER_TYPES = [ 'waitress', 'threaded' ]
+
+
+def PrepareRequest( method, path, data, hmac_secret ):
+  """Returns the method, path, headers, and body of an authenticated request
+  sending |data| as JSON."""
+  body = ToBytes( json.dumps( data ) if data else '' )
+  headers = {
+    'content-type': 'application/json',
+    'x-ycm-hmac': b64encode( CreateRequestHmac( ToBytes( method ),
+                                                ToBytes( path ),
+                                                body,
+                                                hmac_secret ) )
+  }
+  return method, path, headers, body
+
+
+def Percentile( sorted_values, percentile ):
+  """Nearest-rank percentile of the non-empty sorted list |sorted_values|."""
+  rank = int( round( percentile / 100 * len( sorted_values ) ) )
+  return sorted_values[ min( max( rank, 1 ), len( sorted_values ) ) - 1 ]
+
+
+@contextlib.contextmanager
+def RunServer( server_type, app, hmac_secret ):
+  """Serves |app| on a free port of 127.0.0.1 from a thread with the server
+  |server_type|, one of SERVER_TYPES, and yields its location."""
+  plugin = None
+  if server_type == 'waitress':
+    from ycmd.hmac_plugin import HmacPlugin
+    from ycmd.wsgi_server import StoppableWSGIServer
+
+    plugin = app.install( HmacPlugin( hmac_secret ) )
+    server = StoppableWSGIServer( app, host = '127.0.0.1', port = 0,
+                                  threads = 30 )
+    port = server.effective_port
+  else:
+    from ycmd.http_server import ThreadedHTTPServer
+
+    server = ThreadedHTTPServer( app, hmac_secret, host = '127.0.0.1',
+                                 port = 0 )
+    port = server.server_address[ 1 ]
+
+  server_thread = threading.Thread( target = server.Run )
+  server_thread.start()
+  try:
+    yield 'http://127.0.0.1:{0}'.format( port )
+  finally:
+    server.Shutdown()
+    server_thread.join()
+    if plugin:
+      app.uninstall( plugin )
@@ -0,0 +1,448 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Replays a trace of requests against a ycmd server started in this process
+and reports the latency percentiles of the requests and the throughput.
+
+A trace is a JSON Lines file, optionally compressed with gzip. Each line is a
+request with the following fields:
+ - timestamp: the time in seconds at which the request was sent;
+ - method: the HTTP method of the request;
+ - path: the handler of the request, e.g. /completions;
+ - params (optional): the query parameters of the request;
+ - body: the JSON body of the request, if any;
+ - label (optional): the name under which the request latencies are grouped.
+   Requests without label are grouped by path.
+Other fields are ignored. This is the format of the traces recorded by the
+server with the --record_requests option. Requests are sent at the same
+intervals as in the trace, divided by the --speed factor.
+
+When no trace is given, a trace is generated that simulates typing in three
+buffers, respectively completed by the identifier completer, the filename
+completer, and a language server completer backed by a stub server (see
+stub_language_server.py).
+
+Usage: python -m ycmd.benchmarks.replay [options]"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+from ycmd.server_utils import SetUpPythonPath
+SetUpPythonPath()
+
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from collections import defaultdict
+from future.utils import iteritems, native
+from random import Random
+from tempfile import mkdtemp
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import requests
+import shutil
+import sys
+import threading
+import time
+
+from ycmd import user_options_store
+from ycmd.benchmarks.benchmark_utils import ( HMAC_SECRET_LENGTH,
+                                              Percentile,
+                                              PrepareRequest,
+                                              RunServer,
+                                              SERVER_TYPES )
+from ycmd.completers.language_server.simple_language_server_completer import (
+  SimpleLSPCompleter )
+from ycmd.utils import ToBytes, ToUnicode
+
+if sys.version_info[ 0 ] == 2:
+  from Queue import Queue
+else:
+  from queue import Queue
+
+DIR_OF_THIS_SCRIPT = os.path.dirname( os.path.abspath( __file__ ) )
+ROOT_DIR = os.path.normpath( os.path.join( DIR_OF_THIS_SCRIPT, '..', '..' ) )
+PATH_TO_STUB_SERVER = os.path.join( DIR_OF_THIS_SCRIPT,
+                                    'stub_language_server.py' )
+STUB_FILETYPE = 'ycmd_stub'
+# Filetype without semantic completer.
+IDENTIFIER_FILETYPE = 'ycmd_replay'
+SUBSERVER_READY_TIMEOUT = 30
+PERCENTILES = [ 50, 90, 99 ]
+GZIP_MAGIC_NUMBER = b'\x1f\x8b'
+
+
+def ParseArguments():
+  parser = argparse.ArgumentParser()
+  parser.add_argument( '--trace', type = str,
+                       help = 'trace to replay (default: generated trace)' )
+  parser.add_argument( '--save_trace', type = str,
+                       help = 'save the generated trace to this file' )
+  parser.add_argument( '--keystrokes', type = int, default = 150,
+                       help = 'number of keystrokes in each buffer of the '
+                              'generated trace (default: %(default)s)' )
+  parser.add_argument( '--speed', type = float, default = 1.0,
+                       help = 'replay speed factor; 0 sends requests as fast '
+                              'as possible (default: %(default)s)' )
+  parser.add_argument( '--server', choices = SERVER_TYPES,
+                       default = SERVER_TYPES[ 0 ],
+                       help = 'HTTP server front-end (default: %(default)s)' )
+  parser.add_argument( '--clients', type = int, default = 4,
+                       help = 'maximum number of requests in flight '
+                              '(default: %(default)s)' )
+  parser.add_argument( '--stub_latency_ms', type = float, default = 0,
+                       help = 'time taken by the stub language server to '
+                              'answer completion requests '
+                              '(default: %(default)s)' )
+  return parser.parse_args()
+
+
+class StubLanguageServerCompleter( SimpleLSPCompleter ):
+  """Language server completer for the STUB_FILETYPE filetype using the stub
+  language server."""
+
+  def __init__( self, user_options, completion_latency = 0 ):
+    self._completion_latency = completion_latency
+    super( StubLanguageServerCompleter, self ).__init__( user_options )
+
+
+  def GetServerName( self ):
+    return 'Stub Language Server'
+
+
+  def GetCommandLine( self ):
+    return [ sys.executable,
+             PATH_TO_STUB_SERVER,
+             str( self._completion_latency ) ]
+
+
+  def SupportedFiletypes( self ):
+    return [ STUB_FILETYPE ]
+
+
+def _OpenTrace( path, mode, compressed ):
+  if compressed:
+    return io.TextIOWrapper( gzip.open( path, mode + 'b' ), encoding = 'utf8' )
+  return io.open( path, mode, encoding = 'utf8' )
+
+
+def ReadTrace( path ):
+  with open( path, 'rb' ) as trace_file:
+    magic_number = trace_file.read( len( GZIP_MAGIC_NUMBER ) )
+  with _OpenTrace( path, 'r', magic_number == GZIP_MAGIC_NUMBER ) as trace_file:
+    return [ json.loads( line ) for line in trace_file if line.strip() ]
+
+
+def WriteTrace( path, trace ):
+  with _OpenTrace( path, 'w', path.endswith( '.gz' ) ) as trace_file:
+    for record in trace:
+      trace_file.write( ToUnicode( json.dumps( record ) ) + '\n' )
+
+
+class _TypingSimulator( object ):
+  """Generates the requests sent by an editor while a user types lines at the
+  end of a buffer: a completion request on each keystroke and a
+  FileReadyToParse event after each line."""
+
+  def __init__( self, random, label, filepath, filetype, contents ):
+    self._random = random
+    self._label = label
+    self._filepath = filepath
+    self._filetype = filetype
+    self._lines = contents.split( '\n' )
+
+
+  def _Body( self, line_num, column_num, **kwargs ):
+    body = {
+      'line_num': line_num,
+      'column_num': column_num,
+      'filepath': self._filepath,
+      'file_data': {
+        self._filepath: {
+          'contents': '\n'.join( self._lines ),
+          'filetypes': [ self._filetype ]
+        }
+      }
+    }
+    body.update( kwargs )
+    return body
+
+
+  def _Record( self, timestamp, path, body ):
+    return { 'timestamp': timestamp,
+             'method': 'POST',
+             'path': path,
+             'body': body,
+             'label': self._label }
+
+
+  def _Event( self, timestamp, event_name ):
+    line_num = len( self._lines )
+    return self._Record( timestamp,
+                         '/event_notification',
+                         self._Body( line_num,
+                                     len( ToBytes( self._lines[ -1 ] ) ) + 1,
+                                     event_name = event_name ) )
+
+
+  def Type( self, timestamp, typed_lines, num_keystrokes ):
+    """Returns the requests sent while typing at most |num_keystrokes|
+    characters of |typed_lines| and the timestamp after the last keystroke."""
+    trace = [ self._Event( timestamp, 'BufferVisit' ),
+              self._Event( timestamp, 'FileReadyToParse' ) ]
+    for typed_line in typed_lines:
+      self._lines.append( '' )
+      for character in typed_line:
+        if num_keystrokes <= 0:
+          return trace, timestamp
+        num_keystrokes -= 1
+        # Typing speed of an average typist with some variance.
+        timestamp += max( 0.03, self._random.gauss( 0.15, 0.05 ) )
+        self._lines[ -1 ] += character
+        trace.append( self._Record(
+          timestamp,
+          '/completions',
+          self._Body( len( self._lines ),
+                      len( ToBytes( self._lines[ -1 ] ) ) + 1 ) ) )
+      # Pause at the end of the line.
+      timestamp += max( 0.1, self._random.gauss( 0.5, 0.2 ) )
+      trace.append( self._Event( timestamp, 'FileReadyToParse' ) )
+    return trace, timestamp
+
+
+def GenerateTrace( directory, num_keystrokes, seed = 0 ):
+  """Generates the requests sent while typing |num_keystrokes| characters in
+  each of three buffers stored in |directory|: a buffer only completed by the
+  identifier completer, a buffer where paths are typed for the filename
+  completer, and a buffer completed by the stub language server completer."""
+  random = Random( seed )
+  identifiers = [ 'identifier_{0}'.format( i ) for i in range( 500 ) ]
+  contents = '\n'.join(
+    '{0} = compute_value_{1}( {2} )'.format( identifier,
+                                             i % 50,
+                                             random.choice( identifiers ) )
+    for i, identifier in enumerate( identifiers ) )
+
+  def TypedLines( template ):
+    while True:
+      yield template.format( random.choice( identifiers ),
+                             random.choice( identifiers ) )
+
+  scenarios = [
+    ( 'identifier', IDENTIFIER_FILETYPE,
+      TypedLines( 'result = {0} + {1}' ) ),
+    ( 'filename', IDENTIFIER_FILETYPE,
+      iter( lambda: "path = '{0}'".format(
+        os.path.join( ROOT_DIR, 'ycmd', 'completers', 'language_server',
+                      'language_server_completer.py' ) ), None ) ),
+    ( STUB_FILETYPE, STUB_FILETYPE,
+      TypedLines( 'result = self.{0}.{1}' ) ),
+  ]
+
+  trace = []
+  timestamp = 0.0
+  for label, filetype, typed_lines in scenarios:
+    simulator = _TypingSimulator( random,
+                                  label,
+                                  os.path.join( directory, label ),
+                                  filetype,
+                                  contents )
+    records, timestamp = simulator.Type( timestamp,
+                                         typed_lines,
+                                         num_keystrokes )
+    trace.extend( records )
+    # Switching to the next buffer.
+    timestamp += 1
+  return trace
+
+
+def _Request( session, location, method, path, data, hmac_secret,
+              params = None ):
+  method, path, headers, body = PrepareRequest( method,
+                                                path,
+                                                data,
+                                                hmac_secret )
+  return session.request( method,
+                          native( ToBytes( location + path ) ),
+                          headers = headers,
+                          data = body,
+                          params = params )
+
+
+def WarmUp( location, hmac_secret, trace ):
+  """Sends the first FileReadyToParse event of each buffer in |trace| and waits
+  for the semantic subservers of their filetypes to be ready, so that the
+  server start-up is not measured."""
+  session = requests.Session()
+  buffers = {}
+  for record in trace:
+    body = record.get( 'body' ) or {}
+    if ( body.get( 'event_name' ) == 'FileReadyToParse' and
+         body[ 'filepath' ] not in buffers ):
+      buffers[ body[ 'filepath' ] ] = body
+      _Request( session, location, 'POST', '/event_notification', body,
+                hmac_secret )
+
+  filetypes = {}
+  for filepath, body in iteritems( buffers ):
+    filetypes[ body[ 'file_data' ][ filepath ][ 'filetypes' ][ 0 ] ] = body
+  for filetype, body in iteritems( filetypes ):
+    if not _Request( session, location, 'POST',
+                     '/semantic_completion_available', body,
+                     hmac_secret ).json():
+      continue
+    expiration = time.time() + SUBSERVER_READY_TIMEOUT
+    while ( time.time() < expiration and
+            not _Request( session, location, 'GET', '/ready', None, hmac_secret,
+                          params = { 'subserver': filetype } ).json() ):
+      time.sleep( 0.1 )
+  session.close()
+
+
+def _ReplayClient( location, hmac_secret, pending_requests, results ):
+  session = requests.Session()
+  try:
+    while True:
+      record = pending_requests.get()
+      if record is None:
+        return
+      start_time = time.time()
+      response = _Request( session,
+                           location,
+                           record[ 'method' ],
+                           record[ 'path' ],
+                           record.get( 'body' ),
+                           hmac_secret,
+                           params = record.get( 'params' ) )
+      latency = time.time() - start_time
+      superseded = ( response.status_code == requests.codes.ok and
+                     isinstance( response.json(), dict ) and
+                     response.json().get( 'superseded', False ) )
+      results.append( ( record.get( 'label' ) or record[ 'path' ],
+                        latency,
+                        response.status_code,
+                        superseded ) )
+  finally:
+    session.close()
+
+
+def Replay( location, hmac_secret, trace, speed, num_clients ):
+  """Sends the requests of |trace| to the server at |location| and returns the
+  list of ( label, latency in seconds, status code, superseded ) tuples and the
+  total replay time."""
+  pending_requests = Queue()
+  results = []
+  clients = [ threading.Thread( target = _ReplayClient,
+                                args = ( location,
+                                         hmac_secret,
+                                         pending_requests,
+                                         results ) )
+              for _ in range( num_clients ) ]
+  for client in clients:
+    client.start()
+
+  start_time = time.time()
+  first_timestamp = trace[ 0 ][ 'timestamp' ] if trace else 0
+  for record in trace:
+    if speed:
+      delay = ( start_time + ( record[ 'timestamp' ] - first_timestamp ) / speed
+                - time.time() )
+      if delay > 0:
+        time.sleep( delay )
+    pending_requests.put( record )
+
+  for _ in clients:
+    pending_requests.put( None )
+  for client in clients:
+    client.join()
+  return results, time.time() - start_time
+
+
+def PrintReport( results, elapsed_time ):
+  latencies = defaultdict( list )
+  errors = defaultdict( int )
+  superseded = defaultdict( int )
+  for label, latency, status_code, was_superseded in results:
+    latencies[ label ].append( latency * 1000 )
+    if status_code != requests.codes.ok:
+      errors[ label ] += 1
+    if was_superseded:
+      superseded[ label ] += 1
+
+  print( '{0:<20} {1:>7} {2:>9} {3:>9} {4:>9} {5:>9} {6:>7} {7:>10}'.format(
+    'label', 'count', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'max (ms)', 'errors',
+    'superseded' ) )
+  for label in sorted( latencies ):
+    values = sorted( latencies[ label ] )
+    print( '{0:<20} {1:>7} {2:>9.2f} {3:>9.2f} {4:>9.2f} {5:>9.2f} {6:>7} '
+           '{7:>10}'.format( label,
+                             len( values ),
+                             *( [ Percentile( values, percentile )
+                                  for percentile in PERCENTILES ] +
+                                [ values[ -1 ],
+                                  errors[ label ],
+                                  superseded[ label ] ] ) ) )
+  print( '{0} requests in {1:.2f}s: {2:.1f} requests/s'.format(
+    len( results ), elapsed_time, len( results ) / elapsed_time ) )
+
+
+def Main():
+  args = ParseArguments()
+  logging.disable( logging.CRITICAL )
+
+  # Imported here because it transitively imports ycm_core.
+  from ycmd import handlers
+  options = user_options_store.DefaultOptions()
+  handlers.UpdateUserOptions( options )
+  handlers._server_state._filetype_completers[ STUB_FILETYPE ] = (
+    StubLanguageServerCompleter( options, args.stub_latency_ms / 1000 ) )
+
+  directory = mkdtemp()
+  try:
+    if args.trace:
+      trace = ReadTrace( args.trace )
+    else:
+      trace = GenerateTrace( directory, args.keystrokes )
+      if args.save_trace:
+        WriteTrace( args.save_trace, trace )
+    # Recorded traces end with a shutdown request.
+    trace = sorted( ( record for record in trace
+                      if record[ 'path' ] != '/shutdown' ),
+                    key = lambda record: record[ 'timestamp' ] )
+
+    hmac_secret = os.urandom( HMAC_SECRET_LENGTH )
+    with RunServer( args.server, handlers.app, hmac_secret ) as location:
+      WarmUp( location, hmac_secret, trace )
+      results, elapsed_time = Replay( location,
+                                      hmac_secret,
+                                      trace,
+                                      args.speed,
+                                      args.clients )
+    PrintReport( results, elapsed_time )
+  finally:
+    handlers.ServerCleanup()
+    shutil.rmtree( directory )
+
+
+if __name__ == '__main__':
+  Main()
@@ -0,0 +1,146 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures the number of requests per second handled by the waitress server
+(StoppableWSGIServer) and the threaded server (ThreadedHTTPServer). Both
+servers are started in this process and receive the same authenticated
+requests from several clients, each client keeping its connection alive.
+
+Usage: python -m ycmd.benchmarks.server_throughput [options]"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+from ycmd.server_utils import SetUpPythonPath
+SetUpPythonPath()
+
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from future.utils import native
+import argparse
+import logging
+import os
+import requests
+import threading
+import time
+
+from ycmd import user_options_store
+from ycmd.benchmarks.benchmark_utils import ( HMAC_SECRET_LENGTH,
+                                              PrepareRequest,
+                                              RunServer,
+                                              SERVER_TYPES )
+from ycmd.utils import ToBytes
+
+
+def ParseArguments():
+  parser = argparse.ArgumentParser()
+  parser.add_argument( '--requests', type = int, default = 2000,
+                       help = 'number of requests sent to each server '
+                              '(default: %(default)s)' )
+  parser.add_argument( '--clients', type = int, default = 4,
+                       help = 'number of concurrent clients '
+                              '(default: %(default)s)' )
+  parser.add_argument( '--lines', type = int, default = 1000,
+                       help = 'number of lines of the buffer sent with '
+                              'completion requests (default: %(default)s)' )
+  return parser.parse_args()
+
+
+def BuildRequests( num_lines, filepath ):
+  contents = '\n'.join( 'identifier_{0} = other_identifier_{0}'.format( i )
+                        for i in range( num_lines ) ) + '\nident'
+  request_data = {
+    'line_num': num_lines + 1,
+    'column_num': 6,
+    'filepath': filepath,
+    'file_data': {
+      filepath: {
+        'contents': contents,
+        'filetypes': [ 'benchmark' ]
+      }
+    }
+  }
+  event_data = dict( request_data, event_name = 'FileReadyToParse' )
+  return [ ( 'GET', '/healthy', None ),
+           ( 'POST', '/event_notification', event_data ),
+           ( 'POST', '/completions', request_data ) ]
+
+
+def RunClients( location, prepared_requests, num_requests ):
+  """Sends |num_requests| in total from one client per list of requests in
+  |prepared_requests| and returns the number of requests per second."""
+  errors = []
+  count = num_requests // len( prepared_requests )
+
+  def Client( client_requests ):
+    session = requests.Session()
+    try:
+      for i in range( count ):
+        method, path, headers, body = client_requests[
+          i % len( client_requests ) ]
+        response = session.request( method,
+                                    native( ToBytes( location + path ) ),
+                                    headers = headers,
+                                    data = body )
+        if response.status_code != requests.codes.ok:
+          errors.append( response.status_code )
+    finally:
+      session.close()
+
+  clients = [ threading.Thread( target = Client, args = ( client_requests, ) )
+              for client_requests in prepared_requests ]
+  start_time = time.time()
+  for client in clients:
+    client.start()
+  for client in clients:
+    client.join()
+  elapsed_time = time.time() - start_time
+
+  if errors:
+    raise RuntimeError( '{0} requests failed with status codes {1}'.format(
+      len( errors ), sorted( set( errors ) ) ) )
+  return count * len( prepared_requests ) / elapsed_time
+
+
+def Main():
+  args = ParseArguments()
+  logging.disable( logging.CRITICAL )
+
+  # Imported here because it transitively imports ycm_core.
+  from ycmd import handlers
+  handlers.UpdateUserOptions( user_options_store.DefaultOptions() )
+
+  hmac_secret = os.urandom( HMAC_SECRET_LENGTH )
+  # Each client edits its own file so that its completion requests are not
+  # superseded by the ones of other clients.
+  prepared_requests = [
+    [ PrepareRequest( method, path, data, hmac_secret )
+      for method, path, data in BuildRequests(
+        args.lines, '/benchmark_{0}.py'.format( client ) ) ]
+    for client in range( args.clients ) ]
+
+  for server_type in SERVER_TYPES:
+    with RunServer( server_type, handlers.app, hmac_secret ) as location:
+      throughput = RunClients( location, prepared_requests, args.requests )
+    print( '{0:<10} {1:>10.1f} requests/s'.format( server_type, throughput ) )
+
+
+if __name__ == '__main__':
+  Main()
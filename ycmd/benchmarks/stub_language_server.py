@@ -0,0 +1,157 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Minimal language server communicating over stdio, used by the replay
+benchmark to measure the language server completer without depending on a
+real server. It keeps the contents of the open documents and answers
+completion requests with the identifiers of the document. Other requests get a
+MethodNotFound error.
+
+This script is run as a standalone program and must not import ycmd."""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import json
+import re
+import sys
+import time
+
+IDENTIFIER_REGEX = re.compile( r'[^\W\d]\w*', re.UNICODE )
+METHOD_NOT_FOUND = -32601
+MAX_COMPLETION_ITEMS = 100
+
+
+def ReadMessage( stream ):
+  """Returns the next message from |stream| or None if it is closed."""
+  content_length = None
+  while True:
+    line = stream.readline()
+    if not line:
+      return None
+    line = line.strip()
+    if not line:
+      break
+    name, _, value = line.partition( b':' )
+    if name.strip().lower() == b'content-length':
+      content_length = int( value )
+  return json.loads( stream.read( content_length ).decode( 'utf-8' ) )
+
+
+def WriteMessage( stream, message ):
+  data = json.dumps( message ).encode( 'utf-8' )
+  stream.write( 'Content-Length: {0}\r\n\r\n'.format(
+    len( data ) ).encode( 'ascii' ) )
+  stream.write( data )
+  stream.flush()
+
+
+class StubLanguageServer( object ):
+
+  def __init__( self, completion_latency ):
+    self._completion_latency = completion_latency
+    self._documents = {}
+
+
+  def Initialize( self, params ):
+    return {
+      'capabilities': {
+        'textDocumentSync': 1,
+        'completionProvider': {
+          'resolveProvider': False,
+          'triggerCharacters': [ '.' ]
+        }
+      }
+    }
+
+
+  def Shutdown( self, params ):
+    return None
+
+
+  def DidOpen( self, params ):
+    document = params[ 'textDocument' ]
+    self._documents[ document[ 'uri' ] ] = document[ 'text' ]
+
+
+  def DidChange( self, params ):
+    # Only full synchronization is supported.
+    self._documents[ params[ 'textDocument' ][ 'uri' ] ] = (
+      params[ 'contentChanges' ][ -1 ][ 'text' ] )
+
+
+  def DidClose( self, params ):
+    self._documents.pop( params[ 'textDocument' ][ 'uri' ], None )
+
+
+  def Completion( self, params ):
+    if self._completion_latency:
+      time.sleep( self._completion_latency )
+    text = self._documents.get( params[ 'textDocument' ][ 'uri' ], '' )
+    identifiers = sorted( set( IDENTIFIER_REGEX.findall( text ) ) )
+    return {
+      'isIncomplete': False,
+      'items': [ { 'label': identifier, 'kind': 6 }
+                 for identifier in identifiers[ : MAX_COMPLETION_ITEMS ] ]
+    }
+
+
+  def Handle( self, message ):
+    """Returns the response to |message| or None if it is a notification."""
+    handlers = {
+      'initialize': self.Initialize,
+      'shutdown': self.Shutdown,
+      'textDocument/didOpen': self.DidOpen,
+      'textDocument/didChange': self.DidChange,
+      'textDocument/didClose': self.DidClose,
+      'textDocument/completion': self.Completion,
+    }
+    handler = handlers.get( message[ 'method' ] )
+    params = message.get( 'params' )
+    if 'id' not in message:
+      if handler:
+        handler( params )
+      return None
+
+    response = { 'jsonrpc': '2.0', 'id': message[ 'id' ] }
+    if handler:
+      response[ 'result' ] = handler( params )
+    else:
+      response[ 'error' ] = { 'code': METHOD_NOT_FOUND,
+                              'message': 'Method not found' }
+    return response
+
+
+def Main():
+  completion_latency = float( sys.argv[ 1 ] ) if len( sys.argv ) > 1 else 0
+  input_stream = getattr( sys.stdin, 'buffer', sys.stdin )
+  output_stream = getattr( sys.stdout, 'buffer', sys.stdout )
+  server = StubLanguageServer( completion_latency )
+
+  while True:
+    message = ReadMessage( input_stream )
+    if message is None or message.get( 'method' ) == 'exit':
+      return
+    response = server.Handle( message )
+    if response:
+      WriteMessage( output_stream, response )
+
+
+if __name__ == '__main__':
+  Main()
@@ -0,0 +1,147 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from bisect import bisect_left
+
+from ycmd.utils import ( ByteOffsetToCodepointOffset,
+                         CodepointOffsetToByteOffset,
+                         re,
+                         SplitLines,
+                         ToUnicode )
+
+NON_ASCII_REGEX = re.compile( '[^\x00-\x7f]' )
+
+
+class BufferIndex( object ):
+  """Splits the contents of a buffer into lines once and converts offsets on
+  these lines between UTF-8 bytes, unicode codepoints, and UTF-16 code units.
+  The offsets of each line are only computed the first time a conversion is
+  requested on that line and are not computed at all for ASCII lines. Line
+  numbers and offsets are 1-based and an IndexError is raised if the line does
+  not exist."""
+
+  def __init__( self, contents ):
+    self._contents = ToUnicode( contents )
+    self._lines = None
+    self._line_offsets = {}
+
+
+  def Lines( self ):
+    if self._lines is None:
+      self._lines = SplitLines( self._contents )
+    return self._lines
+
+
+  def Line( self, line_num ):
+    if line_num < 1:
+      raise IndexError( 'Line number {0} is not valid'.format( line_num ) )
+    return self.Lines()[ line_num - 1 ]
+
+
+  def ByteOffsetToCodepointOffset( self, line_num, byte_offset ):
+    """Equivalent of utils.ByteOffsetToCodepointOffset on line |line_num|."""
+    if byte_offset < 1:
+      return ByteOffsetToCodepointOffset( self.Line( line_num ), byte_offset )
+    offsets = self._LineOffsets( line_num )
+    if offsets is None:
+      return min( byte_offset, len( self.Line( line_num ) ) + 1 )
+    byte_offsets, _ = offsets
+    # A byte offset inside a multi-byte character counts that character.
+    return bisect_left( byte_offsets,
+                        byte_offset - 1,
+                        0,
+                        len( byte_offsets ) - 1 ) + 1
+
+
+  def CodepointOffsetToByteOffset( self, line_num, codepoint_offset ):
+    """Equivalent of utils.CodepointOffsetToByteOffset on line |line_num|."""
+    if codepoint_offset < 1:
+      return CodepointOffsetToByteOffset( self.Line( line_num ),
+                                          codepoint_offset )
+    offsets = self._LineOffsets( line_num )
+    if offsets is None:
+      return min( codepoint_offset, len( self.Line( line_num ) ) + 1 )
+    byte_offsets, _ = offsets
+    return byte_offsets[ min( codepoint_offset, len( byte_offsets ) ) - 1 ] + 1
+
+
+  def CodepointsToUTF16CodeUnits( self, line_num, codepoint_offset ):
+    """Equivalent of language_server_protocol.CodepointsToUTF16CodeUnits on line
+    |line_num|. |codepoint_offset| must not be negative."""
+    offsets = self._LineOffsets( line_num )
+    if offsets is None:
+      return min( codepoint_offset, len( self.Line( line_num ) ) + 1 )
+    _, utf16_offsets = offsets
+    if codepoint_offset >= len( utf16_offsets ):
+      return utf16_offsets[ -1 ] + 1
+    return utf16_offsets[ codepoint_offset ]
+
+
+  def UTF16CodeUnitsToCodepoints( self, line_num, code_unit_offset ):
+    """Equivalent of language_server_protocol.UTF16CodeUnitsToCodepoints on line
+    |line_num|. |code_unit_offset| must not be negative."""
+    offsets = self._LineOffsets( line_num )
+    if offsets is None:
+      return min( code_unit_offset, len( self.Line( line_num ) ) + 1 )
+    _, utf16_offsets = offsets
+    if code_unit_offset >= utf16_offsets[ -1 ] + 1:
+      return len( utf16_offsets )
+    # An offset inside a surrogate pair counts the corresponding codepoint.
+    return bisect_left( utf16_offsets, code_unit_offset )
+
+
+  def _LineOffsets( self, line_num ):
+    """Returns None if the line |line_num| only contains ASCII characters.
+    Otherwise, returns a tuple of two lists containing the UTF-8 byte offset and
+    the UTF-16 code unit offset of each codepoint of the line followed by the
+    length of the line in bytes and in code units."""
+    try:
+      return self._line_offsets[ line_num ]
+    except KeyError:
+      pass
+
+    line = self.Line( line_num )
+    offsets = None
+    if NON_ASCII_REGEX.search( line ):
+      byte_offsets = [ 0 ]
+      utf16_offsets = [ 0 ]
+      for character in line:
+        codepoint = ord( character )
+        if codepoint < 0x80:
+          num_bytes, num_code_units = 1, 1
+        elif codepoint < 0x800:
+          num_bytes, num_code_units = 2, 1
+        elif 0xD800 <= codepoint < 0xE000:
+          # Half of a surrogate pair on narrow Python 2 builds.
+          num_bytes, num_code_units = 2, 1
+        elif codepoint < 0x10000:
+          num_bytes, num_code_units = 3, 1
+        else:
+          num_bytes, num_code_units = 4, 2
+        byte_offsets.append( byte_offsets[ -1 ] + num_bytes )
+        utf16_offsets.append( utf16_offsets[ -1 ] + num_code_units )
+      offsets = ( byte_offsets, utf16_offsets )
+
+    self._line_offsets[ line_num ] = offsets
+    return offsets
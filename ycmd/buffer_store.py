@@ -0,0 +1,144 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+import threading
+from collections import OrderedDict
+
+from ycmd.responses import ServerError, UnknownBufferVersion
+
+# Number of versions kept for each buffer. Clients may send several requests
+# before receiving a response so a delta can be based on a version that is not
+# the latest one received by the server.
+MAX_VERSIONS_PER_BUFFER = 5
+
+
+class Buffer( object ):
+  """Immutable version of a buffer. Its contents are stored as a list of lines,
+  each line including its terminator, so that edits can be applied without
+  joining and splitting the whole buffer. The contents string is only built
+  when requested."""
+
+  def __init__( self, lines ):
+    self._lines = lines
+    self._contents = None
+
+
+  @classmethod
+  def FromContents( cls, contents ):
+    buf = cls( _SplitLinesKeepingEnds( contents ) )
+    buf._contents = contents
+    return buf
+
+
+  def Contents( self ):
+    if self._contents is None:
+      self._contents = ''.join( self._lines )
+    return self._contents
+
+
+  def ApplyEdits( self, edits ):
+    """Returns a new buffer with the line-range edits |edits| applied in order.
+    Each edit replaces the lines from |start_line_num| (included) to
+    |end_line_num| (excluded), both 1-based, with the lines in |contents|.
+    Lines are never merged: a newline is added to the last line of |contents|
+    if other lines follow it and to the last line of the buffer if lines are
+    inserted after it."""
+    lines = self._lines
+    for edit in edits:
+      start_line_num = edit[ 'start_line_num' ]
+      end_line_num = edit[ 'end_line_num' ]
+      if not 1 <= start_line_num <= end_line_num <= len( lines ) + 1:
+        raise ServerError( 'Invalid line range [{0}, {1}) for a buffer of '
+                           '{2} lines'.format( start_line_num,
+                                               end_line_num,
+                                               len( lines ) ) )
+      before = lines[ : start_line_num - 1 ]
+      new_lines = _SplitLinesKeepingEnds( edit[ 'contents' ] )
+      after = lines[ end_line_num - 1 : ]
+      if new_lines or after:
+        if before and not before[ -1 ].endswith( '\n' ):
+          before[ -1 ] += '\n'
+        if new_lines and after and not new_lines[ -1 ].endswith( '\n' ):
+          new_lines[ -1 ] += '\n'
+      lines = before + new_lines + after
+    return Buffer( lines )
+
+
+class BufferStore( object ):
+  """Keeps the latest versions of the buffers sent by the client so that
+  requests only need to include the changes since a previous version. A
+  buffer version is identified by its filepath and an integer chosen by the
+  client."""
+
+  def __init__( self ):
+    self._buffers = {}
+    self._buffers_lock = threading.Lock()
+
+
+  def Update( self, filepath, file_data ):
+    """Stores the version of the buffer described by |file_data| and returns
+    it. |file_data| contains one of:
+     - the entire |contents| of the buffer;
+     - |edits| to apply to the version |base_version| of the buffer;
+     - no contents nor edits if the buffer is unchanged since |version|.
+    Raises UnknownBufferVersion if the referenced version is not stored."""
+    version = file_data[ 'version' ]
+
+    if 'contents' in file_data:
+      buf = Buffer.FromContents( file_data[ 'contents' ] )
+    elif 'edits' in file_data:
+      buf = self._Get( filepath, file_data[ 'base_version' ] ).ApplyEdits(
+        file_data[ 'edits' ] )
+    else:
+      return self._Get( filepath, version )
+
+    with self._buffers_lock:
+      versions = self._buffers.setdefault( filepath, OrderedDict() )
+      versions.pop( version, None )
+      versions[ version ] = buf
+      while len( versions ) > MAX_VERSIONS_PER_BUFFER:
+        versions.popitem( last = False )
+    return buf
+
+
+  def Remove( self, filepath ):
+    with self._buffers_lock:
+      self._buffers.pop( filepath, None )
+
+
+  def _Get( self, filepath, version ):
+    with self._buffers_lock:
+      try:
+        return self._buffers[ filepath ][ version ]
+      except KeyError:
+        raise UnknownBufferVersion( filepath, version )
+
+
+def _SplitLinesKeepingEnds( contents ):
+  # Like SplitLines in utils, only split on \n.
+  lines = [ line + '\n' for line in contents.split( '\n' ) ]
+  lines[ -1 ] = lines[ -1 ][ : -1 ]
+  if not lines[ -1 ]:
+    lines.pop()
+  return lines
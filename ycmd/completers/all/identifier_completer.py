@@ -23,11 +23,14 @@ from __future__ import absolute_import
 from builtins import *  # noqa
 
 import os
+import threading
 import ycm_core
-from collections import defaultdict
+from collections import Counter, defaultdict
+from future.utils import iteritems
 from ycmd.completers.general_completer import GeneralCompleter
-from ycmd import identifier_utils
-from ycmd.utils import LOGGER, ToCppStringCompatible, SplitLines
+from ycmd import identifier_utils, metrics
+from ycmd.utils import ( ExpandVariablesInPath, LOGGER, ToCppStringCompatible,
+                         SplitLines )
 from ycmd import responses
 
 SYNTAX_FILENAME = 'YCM_PLACEHOLDER_FOR_SYNTAX'
@@ -38,7 +41,13 @@ class IdentifierCompleter( GeneralCompleter ):
     super( IdentifierCompleter, self ).__init__( user_options )
     self._completer = ycm_core.IdentifierCompleter()
     self._tags_file_last_mtime = defaultdict( int )
+    self._buffer_identifiers = defaultdict( _BufferIdentifiers )
+    self._buffer_identifiers_lock = threading.Lock()
     self._max_candidates = user_options[ 'max_num_identifier_candidates' ]
+    snapshot_directory = user_options[ 'tag_files_snapshot_directory' ]
+    self._tag_files_snapshot_directory = (
+      ExpandVariablesInPath( snapshot_directory ) if snapshot_directory else
+      '' )
 
 
   def ShouldUseNow( self, request_data ):
@@ -49,10 +58,11 @@ class IdentifierCompleter( GeneralCompleter ):
     if not self.ShouldUseNow( request_data ):
       return []
 
-    completions = self._completer.CandidatesForQueryAndType(
-      ToCppStringCompatible( _SanitizeQuery( request_data[ 'query' ] ) ),
-      ToCppStringCompatible( request_data[ 'first_filetype' ] ),
-      self._max_candidates )
+    with metrics.Span( 'IdentifierCompleter', 'CandidatesForQueryAndType' ):
+      completions = self._completer.CandidatesForQueryAndType(
+        ToCppStringCompatible( _SanitizeQuery( request_data[ 'query' ] ) ),
+        ToCppStringCompatible( request_data[ 'first_filetype' ] ),
+        self._max_candidates )
 
     completions = _RemoveSmallCandidates(
       completions, self.user_options[ 'min_num_identifier_candidate_chars' ] )
@@ -75,10 +85,13 @@ class IdentifierCompleter( GeneralCompleter ):
     vector = ycm_core.StringVector()
     vector.append( ToCppStringCompatible( identifier ) )
     LOGGER.info( 'Adding ONE buffer identifier for file: %s', filepath )
-    self._completer.AddIdentifiersToDatabase(
-      vector,
-      ToCppStringCompatible( filetype ),
-      ToCppStringCompatible( filepath ) )
+    with self._buffer_identifiers_lock:
+      self._buffer_identifiers[ ( filetype, filepath ) ].AddIdentifier(
+        identifier )
+      self._completer.AddIdentifiersToDatabase(
+        vector,
+        ToCppStringCompatible( filetype ),
+        ToCppStringCompatible( filepath ) )
 
 
   def _AddPreviousIdentifier( self, request_data ):
@@ -108,13 +121,34 @@ class IdentifierCompleter( GeneralCompleter ):
     collect_from_comments_and_strings = bool( self.user_options[
       'collect_identifiers_from_comments_and_strings' ] )
     text = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-    LOGGER.info( 'Adding buffer identifiers for file: %s', filepath )
-    self._completer.ClearForFileAndAddIdentifiersToDatabase(
-        _IdentifiersFromBuffer( text,
-                                filetype,
-                                collect_from_comments_and_strings ),
-        ToCppStringCompatible( filetype ),
-        ToCppStringCompatible( filepath ) )
+
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers[ ( filetype, filepath ) ]
+      first_update = buffer_identifiers.text is None
+      added, removed = buffer_identifiers.Update(
+        text, filetype, collect_from_comments_and_strings )
+
+      if first_update:
+        LOGGER.info( 'Adding buffer identifiers for file: %s', filepath )
+        self._completer.ClearForFileAndAddIdentifiersToDatabase(
+          _ToStringVector( added ),
+          ToCppStringCompatible( filetype ),
+          ToCppStringCompatible( filepath ) )
+        return
+
+      LOGGER.info( 'Updating buffer identifiers for file: %s '
+                   '(%d added, %d removed)',
+                   filepath, len( added ), len( removed ) )
+      if removed:
+        self._completer.RemoveIdentifiersFromDatabase(
+          _ToStringVector( removed ),
+          ToCppStringCompatible( filetype ),
+          ToCppStringCompatible( filepath ) )
+      if added:
+        self._completer.AddIdentifiersToDatabase(
+          _ToStringVector( added ),
+          ToCppStringCompatible( filetype ),
+          ToCppStringCompatible( filepath ) )
 
 
   def _FilterUnchangedTagFiles( self, tag_files ):
@@ -145,7 +179,8 @@ class IdentifierCompleter( GeneralCompleter ):
       return
 
     self._completer.AddIdentifiersToDatabaseFromTagFiles(
-      absolute_paths_to_tag_files )
+      absolute_paths_to_tag_files,
+      ToCppStringCompatible( self._tag_files_snapshot_directory ) )
 
 
   def _AddIdentifiersFromSyntax( self, keyword_list, filetype ):
@@ -169,6 +204,16 @@ class IdentifierCompleter( GeneralCompleter ):
                                      request_data[ 'first_filetype' ] )
 
 
+  def OnBufferUnload( self, request_data ):
+    # The identifiers of the buffer are kept in the database but there is no
+    # need to track their changes anymore.
+    filepath = request_data[ 'filepath' ]
+    with self._buffer_identifiers_lock:
+      for key in list( self._buffer_identifiers ):
+        if key[ 1 ] == filepath:
+          del self._buffer_identifiers[ key ]
+
+
   def OnInsertLeave( self, request_data ):
     self._AddIdentifierUnderCursor( request_data )
 
@@ -192,13 +237,10 @@ def _PreviousIdentifier( min_num_candidate_size_chars,
 
   line_num = request_data[ 'line_num' ] - 1
   column_num = request_data[ 'column_codepoint' ] - 1
-  filepath = request_data[ 'filepath' ]
   filetype = request_data[ 'first_filetype' ]
 
-  contents = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-  if not collect_from_comments_and_strings:
-    contents = identifier_utils.RemoveIdentifierFreeText( contents, filetype )
-  contents_per_line = SplitLines( contents )
+  contents_per_line = _ContentsPerLine( collect_from_comments_and_strings,
+                                       request_data )
 
   ident = PreviousIdentifierOnLine( contents_per_line[ line_num ],
                                     column_num,
@@ -229,28 +271,146 @@ def _RemoveSmallCandidates( candidates, min_num_candidate_size_chars ):
 
 def _GetCursorIdentifier( collect_from_comments_and_strings,
                           request_data ):
-  filepath = request_data[ 'filepath' ]
-  contents = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-  filetype = request_data[ 'first_filetype' ]
-  if not collect_from_comments_and_strings:
-    contents = identifier_utils.RemoveIdentifierFreeText( contents, filetype )
-  contents_per_line = SplitLines( contents )
+  contents_per_line = _ContentsPerLine( collect_from_comments_and_strings,
+                                       request_data )
   line = contents_per_line[ request_data[ 'line_num' ] - 1 ]
   return identifier_utils.IdentifierAtIndex(
       line,
       request_data[ 'column_codepoint' ] - 1,
-      filetype )
+      request_data[ 'first_filetype' ] )
 
 
-def _IdentifiersFromBuffer( text,
-                            filetype,
-                            collect_from_comments_and_strings ):
-  if not collect_from_comments_and_strings:
-    text = identifier_utils.RemoveIdentifierFreeText( text, filetype )
-  idents = identifier_utils.ExtractIdentifiersFromText( text, filetype )
+def _ContentsPerLine( collect_from_comments_and_strings, request_data ):
+  # Reuse the lines of the request unless comments and strings are removed.
+  if collect_from_comments_and_strings:
+    return request_data[ 'lines' ]
+  filepath = request_data[ 'filepath' ]
+  contents = request_data[ 'file_data' ][ filepath ][ 'contents' ]
+  return SplitLines( identifier_utils.RemoveIdentifierFreeText(
+    contents, request_data[ 'first_filetype' ] ) )
+
+
+class _BufferIdentifiers( object ):
+  """Keeps track of the identifiers found on each line of a buffer so that only
+  the lines that changed since the last parse need to be scanned again. The
+  number of occurrences of each identifier in the buffer is counted so that an
+  identifier is only added to the database when it first appears and removed
+  when its last occurrence disappears."""
+
+  def __init__( self ):
+    self.text = None
+    self._collect_from_comments_and_strings = None
+    self._lines = []
+    self._identifiers_per_line = []
+    self._identifier_counts = Counter()
+    self._identifiers_added_between_updates = set()
+
+
+  def AddIdentifier( self, identifier ):
+    """Records that |identifier| was added to the database between two updates,
+    e.g. while it was typed, so that the next update removes it if it is not in
+    the buffer by then."""
+    if identifier not in self._identifier_counts:
+      self._identifiers_added_between_updates.add( identifier )
+
+
+  def Update( self, text, filetype, collect_from_comments_and_strings ):
+    """Updates the identifiers stored for the buffer with its new contents
+    |text| and returns a tuple (added, removed) of the identifiers that appeared
+    in and disappeared from the buffer since the last update."""
+    added_between_updates = self._identifiers_added_between_updates
+    self._identifiers_added_between_updates = set()
+
+    if ( text == self.text and
+         collect_from_comments_and_strings ==
+           self._collect_from_comments_and_strings ):
+      return [], self._NotInBuffer( added_between_updates )
+
+    options_changed = ( collect_from_comments_and_strings !=
+                        self._collect_from_comments_and_strings )
+    self.text = text
+    self._collect_from_comments_and_strings = collect_from_comments_and_strings
+
+    # Comments and strings can span multiple lines so they are removed from the
+    # whole buffer. Since they are replaced by the same number of newlines, the
+    # resulting lines still match the ones of the buffer.
+    if not collect_from_comments_and_strings:
+      text = identifier_utils.RemoveIdentifierFreeText( text, filetype )
+    lines = SplitLines( text )
+
+    if options_changed:
+      start = 0
+      old_end = len( self._identifiers_per_line )
+      new_end = len( lines )
+    else:
+      start, old_end, new_end = _ChangedLineRange( self._lines, lines )
+
+    new_identifiers_per_line = [
+      identifier_utils.ExtractIdentifiersFromText( line, filetype )
+      for line in lines[ start : new_end ] ]
+
+    added, removed = self._UpdateIdentifierCounts(
+      self._identifiers_per_line[ start : old_end ],
+      new_identifiers_per_line )
+
+    self._lines = lines
+    self._identifiers_per_line[ start : old_end ] = new_identifiers_per_line
+    # These identifiers were not counted so they are not in |removed| yet.
+    removed.extend( self._NotInBuffer( added_between_updates ) )
+    return added, removed
+
+
+  def _NotInBuffer( self, identifiers ):
+    return [ identifier for identifier in identifiers
+             if identifier not in self._identifier_counts ]
+
+
+  def _UpdateIdentifierCounts( self,
+                               old_identifiers_per_line,
+                               new_identifiers_per_line ):
+    counts = self._identifier_counts
+    previous_counts = {}
+    for line_identifiers in old_identifiers_per_line:
+      for identifier in line_identifiers:
+        previous_counts.setdefault( identifier, counts[ identifier ] )
+        counts[ identifier ] -= 1
+    for line_identifiers in new_identifiers_per_line:
+      for identifier in line_identifiers:
+        previous_counts.setdefault( identifier, counts[ identifier ] )
+        counts[ identifier ] += 1
+
+    added = []
+    removed = []
+    for identifier, previous_count in iteritems( previous_counts ):
+      if counts[ identifier ] <= 0:
+        del counts[ identifier ]
+        if previous_count > 0:
+          removed.append( identifier )
+      elif previous_count <= 0:
+        added.append( identifier )
+    return added, removed
+
+
+def _ChangedLineRange( old_lines, new_lines ):
+  """Returns a tuple (start, old_end, new_end) such that old_lines[ start :
+  old_end ] was replaced by new_lines[ start : new_end ]."""
+  start = 0
+  max_start = min( len( old_lines ), len( new_lines ) )
+  while start < max_start and old_lines[ start ] == new_lines[ start ]:
+    start += 1
+  old_end = len( old_lines )
+  new_end = len( new_lines )
+  while ( old_end > start and new_end > start and
+          old_lines[ old_end - 1 ] == new_lines[ new_end - 1 ] ):
+    old_end -= 1
+    new_end -= 1
+  return start, old_end, new_end
+
+
+def _ToStringVector( identifiers ):
   vector = ycm_core.StringVector()
-  for ident in idents:
-    vector.append( ToCppStringCompatible( ident ) )
+  for identifier in identifiers:
+    vector.append( ToCppStringCompatible( identifier ) )
   return vector
 
 
@@ -24,6 +24,7 @@ from builtins import *  # noqa
 
 import abc
 import threading
+from ycmd import metrics
 from ycmd.completers import completer_utils
 from ycmd.responses import NoDiagnosticSupport
 from future.utils import with_metaclass
@@ -228,24 +229,36 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
   # It's highly likely you DON'T want to override this function but the *Inner
   # version of it.
   def ComputeCandidates( self, request_data ):
-    if ( not request_data[ 'force_semantic' ] and
-         not self.ShouldUseNow( request_data ) ):
-      return []
+    name = type( self ).__name__
+    if not request_data[ 'force_semantic' ]:
+      with metrics.Span( name, 'ShouldUseNow' ):
+        should_use_now = self.ShouldUseNow( request_data )
+      if not should_use_now:
+        return []
 
     candidates = self._GetCandidatesFromSubclass( request_data )
-    candidates = self.FilterAndSortCandidates( candidates,
-                                               request_data[ 'query' ] )
-    return self.DetailCandidates( request_data, candidates )
+    request_data[ 'cancellation_token' ].RaiseIfCancelled()
+    with metrics.Span( name, 'FilterAndSortCandidates' ):
+      candidates = self.FilterAndSortCandidates( candidates,
+                                                 request_data[ 'query' ] )
+    request_data[ 'cancellation_token' ].RaiseIfCancelled()
+    with metrics.Span( name, 'DetailCandidates' ):
+      return self.DetailCandidates( request_data, candidates )
 
 
   def _GetCandidatesFromSubclass( self, request_data ):
+    name = type( self ).__name__
     cache_completions = self._completions_cache.GetCompletionsIfCacheValid(
       request_data )
+    metrics.RecordCacheAccess( bool( cache_completions ),
+                               name,
+                               'completions_cache' )
 
     if cache_completions:
       return cache_completions
 
-    raw_completions = self.ComputeCandidatesInner( request_data )
+    with metrics.Span( name, 'ComputeCandidatesInner' ):
+      raw_completions = self.ComputeCandidatesInner( request_data )
     self._completions_cache.Update( request_data, raw_completions )
     return raw_completions
 
@@ -300,18 +313,13 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
     if not candidates:
       return []
 
-    # We need to handle both an omni_completer style completer and a server
-    # style completer
-    if isinstance( candidates, dict ) and 'words' in candidates:
-      candidates = candidates[ 'words' ]
-
-    sort_property = ''
-    if isinstance( candidates[ 0 ], dict ):
-      if 'word' in candidates[ 0 ]:
-        sort_property = 'word'
-      elif 'insertion_text' in candidates[ 0 ]:
-        sort_property = 'insertion_text'
+    # Completions stored in the cache were already converted for the C++ layer.
+    candidate_list = self._completions_cache.GetCandidateList( candidates )
+    if candidate_list is not None:
+      return completer_utils.FilterAndSortCandidateListWrap(
+        candidate_list, query, self._max_candidates )
 
+    candidates, sort_property = _CandidatesAndSortProperty( candidates )
     return self.FilterAndSortCandidatesInner( candidates, sort_property, query )
 
 
@@ -407,6 +415,22 @@ class Completer( with_metaclass( abc.ABCMeta, object ) ):
     return False
 
 
+def _CandidatesAndSortProperty( candidates ):
+  # We need to handle both an omni_completer style completer and a server
+  # style completer
+  if isinstance( candidates, dict ) and 'words' in candidates:
+    candidates = candidates[ 'words' ]
+
+  sort_property = ''
+  if candidates and isinstance( candidates[ 0 ], dict ):
+    if 'word' in candidates[ 0 ]:
+      sort_property = 'word'
+    elif 'insertion_text' in candidates[ 0 ]:
+      sort_property = 'insertion_text'
+
+  return candidates, sort_property
+
+
 class CompletionsCache( object ):
   """Cache of computed completions for a particular request."""
 
@@ -419,12 +443,40 @@ class CompletionsCache( object ):
     with self._access_lock:
       self._request_data = None
       self._completions = None
+      self._candidate_list = None
 
 
   def Update( self, request_data, completions ):
     with self._access_lock:
       self._request_data = request_data
       self._completions = completions
+      self._candidate_list = None
+
+
+  def GetCandidateList( self, completions ):
+    """Returns the C++ candidate list for |completions| if they are the cached
+    completions, None otherwise. The list is built on first use so that
+    completers overriding FilterAndSortCandidates never pay for it; it is then
+    reused so that filtering again on each keystroke only requires the
+    query."""
+    with self._access_lock:
+      if completions is not self._completions:
+        return None
+      if self._candidate_list is not None:
+        return self._candidate_list
+
+    candidates, sort_property = _CandidatesAndSortProperty( completions )
+    if not candidates or not isinstance( candidates, list ):
+      return None
+    candidate_list = completer_utils.CandidateListWrap( candidates,
+                                                        sort_property )
+
+    with self._access_lock:
+      if completions is not self._completions:
+        return candidate_list
+      if self._candidate_list is None:
+        self._candidate_list = candidate_list
+      return self._candidate_list
 
 
   def GetCompletionsIfCacheValid( self, request_data ):
@@ -26,8 +26,8 @@ from builtins import *  # noqa
 # We don't want ycm_core inside Vim.
 from collections import defaultdict
 from future.utils import iteritems
-from ycmd.utils import ( LOGGER, ToCppStringCompatible, ToUnicode, re, ReadFile,
-                         SplitLines )
+from ycmd.buffer_index import BufferIndex
+from ycmd.utils import LOGGER, ToCppStringCompatible, ToUnicode, re, ReadFile
 
 
 class PreparedTriggers( object ):
@@ -193,6 +193,18 @@ def FilterAndSortCandidatesWrap( candidates, sort_property, query,
                                   max_candidates )
 
 
+def CandidateListWrap( candidates, sort_property ):
+  from ycm_core import CandidateList
+
+  # See FilterAndSortCandidatesWrap for why the sort property is converted.
+  return CandidateList( candidates, ToCppStringCompatible( sort_property ) )
+
+
+def FilterAndSortCandidateListWrap( candidate_list, query, max_candidates ):
+  return candidate_list.FilterAndSort( ToCppStringCompatible( query ),
+                                       max_candidates )
+
+
 TRIGGER_REGEX_PREFIX = 're!'
 
 DEFAULT_FILETYPE_TRIGGERS = {
@@ -247,9 +259,20 @@ def GetFileContents( request_data, filename ):
     return ''
 
 
+def GetBufferIndex( request_data, filename ):
+  """Returns a BufferIndex of the contents of the absolute path |filename| as
+  returned by GetFileContents. The index is built once per request so that the
+  contents are only read, split, and converted once."""
+  buffer_indexes = request_data[ 'buffer_indexes' ]
+  try:
+    return buffer_indexes[ filename ]
+  except KeyError:
+    buffer_index = BufferIndex( GetFileContents( request_data, filename ) )
+    buffer_indexes[ filename ] = buffer_index
+    return buffer_index
+
+
 def GetFileLines( request_data, filename ):
   """Like GetFileContents but return the contents as a list of lines. Avoid
-  splitting the lines if they have already been split for the current file."""
-  if filename == request_data[ 'filepath' ]:
-    return request_data[ 'lines' ]
-  return SplitLines( GetFileContents( request_data, filename ) )
+  splitting the lines if they have already been split for that file."""
+  return GetBufferIndex( request_data, filename ).Lines()
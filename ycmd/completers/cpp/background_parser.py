@@ -0,0 +1,121 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+import itertools
+import multiprocessing
+import threading
+
+from ycmd.utils import LOGGER, StartThread
+
+
+# Parses files ahead of time on a pool of worker threads so that their
+# translation units are ready when the user starts typing. Jobs are identified
+# by the path of the file to parse: enqueuing a file already waiting to be
+# parsed only updates its job. Jobs with the lowest priority value are run
+# first, in the order they were enqueued.
+#
+# The number of workers is capped to the number of cores. The workers are only
+# started on the first enqueued job and no job is run if the number of workers
+# is 0.
+#
+# Example usage:
+#    parser = BackgroundParser( ParseFile, 2 )
+#    parser.Enqueue( '/foo.cpp', 0, request_data )  # ParseFile( '/foo.cpp',
+#                                                   #            request_data )
+#    ...
+#    parser.CancelOrWait( '/foo.cpp' )
+class BackgroundParser( object ):
+  def __init__( self, parse_function, num_workers ):
+    self._parse_function = parse_function
+    try:
+      num_workers = min( num_workers, multiprocessing.cpu_count() )
+    except NotImplementedError:
+      pass
+    self._num_workers = max( num_workers, 0 )
+    self._workers_started = False
+    self._condition = threading.Condition()
+    # Map of file paths to a tuple ( priority, sequence number, arguments ).
+    self._pending_jobs = {}
+    self._running_jobs = set()
+    self._sequence = itertools.count()
+
+
+  def NumWorkers( self ):
+    return self._num_workers
+
+
+  def Enqueue( self, filepath, priority, *args ):
+    if not self._num_workers:
+      return
+    with self._condition:
+      if filepath in self._running_jobs:
+        return
+      if filepath in self._pending_jobs:
+        priority = min( priority, self._pending_jobs[ filepath ][ 0 ] )
+      self._pending_jobs[ filepath ] = ( priority,
+                                         next( self._sequence ),
+                                         args )
+      if not self._workers_started:
+        self._workers_started = True
+        for _ in range( self._num_workers ):
+          StartThread( self._Work )
+      self._condition.notify_all()
+
+
+  def CancelOrWait( self, filepath ):
+    """Removes the job for |filepath| if it has not started yet. Otherwise,
+    waits for it to complete."""
+    with self._condition:
+      self._pending_jobs.pop( filepath, None )
+      while filepath in self._running_jobs:
+        self._condition.wait()
+
+
+  def PendingJobs( self ):
+    """Returns the file paths waiting to be parsed in the order they will be
+    parsed."""
+    with self._condition:
+      return sorted( self._pending_jobs,
+                     key = lambda filepath: self._pending_jobs[ filepath ] )
+
+
+  def _Work( self ):
+    while True:
+      with self._condition:
+        while not self._pending_jobs:
+          self._condition.wait()
+        filepath = min( self._pending_jobs,
+                        key = lambda filepath: self._pending_jobs[ filepath ] )
+        args = self._pending_jobs.pop( filepath )[ 2 ]
+        self._running_jobs.add( filepath )
+
+      try:
+        self._parse_function( filepath, *args )
+      except Exception:
+        LOGGER.exception( 'Error while parsing %s in the background',
+                          filepath )
+      finally:
+        with self._condition:
+          self._running_jobs.remove( filepath )
+          self._condition.notify_all()
@@ -24,22 +24,28 @@ from builtins import *  # noqa
 
 from collections import defaultdict
 from future.utils import iteritems
+import hashlib
 import os.path
 import textwrap
+import threading
 import xml.etree.ElementTree
 from xml.etree.ElementTree import ParseError as XmlParseError
 
 import ycm_core
 from ycmd import responses
-from ycmd.utils import ( PathLeftSplit,
+from ycmd.utils import ( LOGGER,
+                         PathLeftSplit,
                          re,
                          ToBytes,
                          ToCppStringCompatible,
                          ToUnicode )
 from ycmd.completers.completer import Completer
-from ycmd.completers.cpp.flags import ( Flags, PrepareFlagsForClang,
-                                        UserIncludePaths )
-from ycmd.completers.cpp.ephemeral_values_set import EphemeralValuesSet
+from ycmd.completers.cpp.background_parser import BackgroundParser
+from ycmd.completers.cpp.flags import ( Flags, HEADER_EXTENSIONS,
+                                        PrepareFlagsForClang,
+                                        SOURCE_EXTENSIONS, UserIncludePaths )
+from ycmd.completers.cpp.ephemeral_values_set import (
+  ALREADY_PARSING_MESSAGE, EphemeralValuesSet )
 from ycmd.completers.cpp.include_cache import IncludeCache, IncludeList
 from ycmd.responses import NoExtraConfDetected, UnknownExtraConf
 
@@ -51,6 +57,7 @@ NO_DIAGNOSTIC_MESSAGE = 'No diagnostic for current line!'
 PRAGMA_DIAG_TEXT_TO_IGNORE = '#pragma once in main file'
 TOO_MANY_ERRORS_DIAG_TEXT_TO_IGNORE = 'too many errors emitted, stopping now'
 NO_DOCUMENTATION_MESSAGE = 'No documentation available for current context'
+MEGABYTE = 1024 * 1024
 INCLUDE_REGEX = re.compile(
   '(\\s*#\\s*(?:include|import)\\s*)(?:"[^"]*|<[^>]*)' )
 
@@ -58,11 +65,20 @@ INCLUDE_REGEX = re.compile(
 class ClangCompleter( Completer ):
   def __init__( self, user_options ):
     super( ClangCompleter, self ).__init__( user_options )
-    self._completer = ycm_core.ClangCompleter()
+    self._completer = ycm_core.ClangCompleter(
+      user_options[ 'clang_max_translation_units' ],
+      user_options[ 'clang_max_translation_units_memory_mb' ] * MEGABYTE,
+      ToCppStringCompatible( os.path.expanduser(
+        user_options[ 'clang_preamble_cache_directory' ] ) ) )
     self._flags = Flags()
     self._include_cache = IncludeCache()
     self._diagnostic_store = None
     self._files_being_compiled = EphemeralValuesSet()
+    self._unsaved_file_versions = {}
+    self._unsaved_files_lock = threading.Lock()
+    self._background_parser = BackgroundParser(
+      self._ParseInBackground,
+      user_options[ 'clang_background_parsing_threads' ] )
 
 
   def SupportedFiletypes( self ):
@@ -70,21 +86,32 @@ class ClangCompleter( Completer ):
 
 
   def GetUnsavedFilesVector( self, request_data ):
+    # The unsaved files of the previous request are kept by ycm_core so only
+    # the contents of the files that changed since then are converted and sent.
+    # Files are identified by a digest of their contents.
     files = ycm_core.UnsavedFileVector()
-    for filename, file_data in iteritems( request_data[ 'file_data' ] ):
-      if not ClangAvailableForFiletypes( file_data[ 'filetypes' ] ):
-        continue
-      contents = file_data[ 'contents' ]
-      if not contents or not filename:
-        continue
-
-      unsaved_file = ycm_core.UnsavedFile()
-      utf8_contents = ToCppStringCompatible( contents )
-      unsaved_file.contents_ = utf8_contents
-      unsaved_file.length_ = len( utf8_contents )
-      unsaved_file.filename_ = ToCppStringCompatible( filename )
-
-      files.append( unsaved_file )
+    with self._unsaved_files_lock:
+      versions = {}
+      for filename, file_data in iteritems( request_data[ 'file_data' ] ):
+        if not ClangAvailableForFiletypes( file_data[ 'filetypes' ] ):
+          continue
+        contents = file_data[ 'contents' ]
+        if not contents or not filename:
+          continue
+
+        unsaved_file = ycm_core.UnsavedFile()
+        unsaved_file.filename_ = ToCppStringCompatible( filename )
+        unsaved_file.version_ = _ContentsVersion( contents )
+        if unsaved_file.version_ != self._unsaved_file_versions.get( filename ):
+          utf8_contents = ToCppStringCompatible( contents )
+          unsaved_file.contents_ = utf8_contents
+          unsaved_file.length_ = len( utf8_contents )
+        versions[ filename ] = unsaved_file.version_
+
+        files.append( unsaved_file )
+
+      files = self._completer.UpdateUnsavedFiles( files )
+      self._unsaved_file_versions = versions
     return files
 
 
@@ -377,6 +404,11 @@ class ClangCompleter( Completer ):
 
 
   def OnFileReadyToParse( self, request_data ):
+    # Parsing the file in the foreground and the background at the same time
+    # would fail so we wait for the background parse, which makes the
+    # foreground one fast as the translation unit already exists.
+    self._background_parser.CancelOrWait( request_data[ 'filepath' ] )
+
     flags, filename = self._FlagsForRequest( request_data )
     if not flags:
       raise ValueError( NO_COMPILE_FLAGS_MESSAGE )
@@ -394,7 +426,47 @@ class ClangCompleter( Completer ):
                                               self.max_diagnostics_to_display )
 
 
+  def OnBufferVisit( self, request_data ):
+    # Build the translation units of the visited file and of its counterpart
+    # header or source file, which is likely to be opened next, so that they
+    # are ready when the user starts typing.
+    filepath = request_data[ 'filepath' ]
+    self._background_parser.Enqueue( filepath, 0, request_data )
+    # The compilation flags of the request only apply to the visited file.
+    if 'compilation_flags' in request_data:
+      return
+    for counterpart_filepath in _CounterpartFilepaths( filepath ):
+      self._background_parser.Enqueue( counterpart_filepath, 1, request_data )
+
+
+  def _ParseInBackground( self, filepath, request_data ):
+    try:
+      flags, filename = self._FlagsForRequest( request_data, filepath )
+    except ( NoExtraConfDetected, UnknownExtraConf ) as error:
+      # The same error is reported to the user when the file is parsed in the
+      # foreground.
+      LOGGER.debug( 'Not parsing %s in the background: %s', filepath, error )
+      return
+    if ( not flags or
+         self._completer.HasTranslationUnit(
+           ToCppStringCompatible( filename ) ) ):
+      return
+
+    try:
+      with self._files_being_compiled.GetExclusive( filename ):
+        self._completer.UpdateTranslationUnit(
+          ToCppStringCompatible( filename ),
+          self.GetUnsavedFilesVector( request_data ),
+          flags )
+    except RuntimeError as error:
+      # The file is already being parsed in the foreground.
+      if str( error ) != ALREADY_PARSING_MESSAGE:
+        raise
+
+
   def OnBufferUnload( self, request_data ):
+    self._background_parser.CancelOrWait( request_data[ 'filepath' ] )
+
     # FIXME: The filepath here is (possibly) wrong when overriding the
     # translation unit filename. If the buffer that the user closed is not the
     # "translation unit" filename, then we won't close the unit. It would
@@ -404,6 +476,8 @@ class ClangCompleter( Completer ):
     #
     # Solving this would require remembering the graph of files to translation
     # units and only closing a unit when there are no files open which use it.
+    # In the meantime, units left open are eventually evicted once the maximum
+    # number of units or their maximum memory usage is reached.
     self._completer.DeleteCachesForFile(
         ToCppStringCompatible( request_data[ 'filepath' ] ) )
 
@@ -458,15 +532,21 @@ class ClangCompleter( Completer ):
       key = 'flags', value = '{0}'.format( list( flags ) ) )
     filename_item = responses.DebugInfoItem(
       key = 'translation unit', value = filename )
+    translation_units_item = responses.DebugInfoItem(
+      key = 'translation units',
+      value = _FormatTranslationUnitStoreStatistics(
+        self._completer.GetTranslationUnitStoreStatistics() ) )
 
-    return responses.BuildDebugInfoResponse( name = 'C-family',
-                                             items = [ database_item,
-                                                       flags_item,
-                                                       filename_item ] )
+    return responses.BuildDebugInfoResponse(
+      name = 'C-family',
+      items = [ database_item,
+                flags_item,
+                filename_item,
+                translation_units_item ] )
 
 
-  def _FlagsForRequest( self, request_data ):
-    filename = request_data[ 'filepath' ]
+  def _FlagsForRequest( self, request_data, filepath = None ):
+    filename = filepath or request_data[ 'filepath' ]
 
     if 'compilation_flags' in request_data:
       # Not supporting specifying the translation unit using this method as it
@@ -511,6 +591,22 @@ def ClangAvailableForFiletypes( filetypes ):
   return any( filetype in CLANG_FILETYPES for filetype in filetypes )
 
 
+def _CounterpartFilepaths( filepath ):
+  """Returns the existing source files with the same name as the header file
+  |filepath| or the existing header files with the same name as the source file
+  |filepath|."""
+  basename, extension = os.path.splitext( filepath )
+  if extension in HEADER_EXTENSIONS:
+    counterpart_extensions = SOURCE_EXTENSIONS
+  elif extension in SOURCE_EXTENSIONS:
+    counterpart_extensions = HEADER_EXTENSIONS
+  else:
+    return []
+  return [ basename + counterpart_extension
+           for counterpart_extension in counterpart_extensions
+           if os.path.isfile( basename + counterpart_extension ) ]
+
+
 def _FilterDiagnostics( diagnostics ):
   # Clang has an annoying warning that shows up when we try to compile header
   # files if the header has "#pragma once" inside it. The error is not
@@ -600,6 +696,19 @@ def _BuildGetDocResponse( doc_data ):
       ToUnicode( _FormatRawComment( doc_data.raw_comment ) ) ) )
 
 
+def _FormatTranslationUnitStoreStatistics( statistics ):
+  max_units = statistics.max_units_ or 'unlimited'
+  max_memory_usage = ( '{0} MB'.format( statistics.max_memory_usage_ //
+                                        MEGABYTE )
+                       if statistics.max_memory_usage_ else 'unlimited' )
+  return ( '{0} ({1:.1f} MB), {2} evicted; maximum: {3} units, {4}'.format(
+             statistics.num_units_,
+             statistics.memory_usage_ / MEGABYTE,
+             statistics.num_evictions_,
+             max_units,
+             max_memory_usage ) )
+
+
 def _GetAbsolutePath( include_file_name, include_paths ):
   for path in include_paths:
     include_file_path = os.path.join( path, include_file_name )
@@ -651,3 +760,10 @@ def GetFullIncludeValue( line ):
   if close_char_pos == -1:
     return None, quoted_include
   return line[ include_start : close_char_pos ], quoted_include
+
+
+def _ContentsVersion( contents ):
+  """Returns the first 64 bits of the SHA-1 digest of |contents|. Unlike hash,
+  it is the same size on all platforms and collisions are unlikely enough for
+  ycm_core to keep serving the stored contents when it is unchanged."""
+  return int( hashlib.sha1( ToBytes( contents ) ).hexdigest()[ : 16 ], 16 )
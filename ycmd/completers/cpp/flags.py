@@ -26,7 +26,7 @@ import ycm_core
 import os
 import inspect
 from future.utils import PY2, native
-from ycmd import extra_conf_store
+from ycmd import extra_conf_store, metrics
 from ycmd.utils import ( OnMac,
                          OnWindows,
                          PathsToAllParentFolders,
@@ -132,18 +132,21 @@ class Flags( object ):
     # may be called from multiple threads, and python gives us
     # 1-python-statement synchronisation for "free" (via the GIL)
     try:
-      return self.flags_for_file[ filename, client_data ]
+      flags = self.flags_for_file[ filename, client_data ]
+      metrics.RecordCacheAccess( True, 'Flags', 'flags_cache' )
+      return flags
     except KeyError:
-      pass
+      metrics.RecordCacheAccess( False, 'Flags', 'flags_cache' )
 
-    results = self._GetFlagsFromExtraConfOrDatabase( filename, client_data )
-    if not results.get( 'flags_ready', True ):
-      return [], filename
+    with metrics.Span( 'Flags', 'FlagsForFile' ):
+      results = self._GetFlagsFromExtraConfOrDatabase( filename, client_data )
+      if not results.get( 'flags_ready', True ):
+        return [], filename
 
-    return self._ParseFlagsFromExtraConfOrDatabase( filename,
-                                                    results,
-                                                    add_extra_clang_flags,
-                                                    client_data )
+      return self._ParseFlagsFromExtraConfOrDatabase( filename,
+                                                      results,
+                                                      add_extra_clang_flags,
+                                                      client_data )
 
 
   def _ParseFlagsFromExtraConfOrDatabase( self,
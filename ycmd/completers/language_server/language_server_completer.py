@@ -31,9 +31,12 @@ import os
 import queue
 import threading
 
-from ycmd import extra_conf_store, responses, utils
+from ycmd import extra_conf_store, metrics, responses, utils
 from ycmd.completers.completer import Completer, CompletionsCache
-from ycmd.completers.completer_utils import GetFileContents, GetFileLines
+from ycmd.buffer_index import BufferIndex
+from ycmd.completers.completer_utils import ( GetBufferIndex,
+                                              GetFileContents )
+from ycmd.request_cancellation import RequestCancelled
 from ycmd.utils import LOGGER
 
 from ycmd.completers.language_server import language_server_protocol as lsp
@@ -156,6 +159,7 @@ class Response( object ):
     self._event = threading.Event()
     self._message = None
     self._response_callback = response_callback
+    self._cancelled = False
 
 
   def ResponseReceived( self, message ):
@@ -173,18 +177,28 @@ class Response( object ):
     self.ResponseReceived( None )
 
 
+  def Cancel( self ):
+    """Called when the request is cancelled."""
+    self._cancelled = True
+    self._event.set()
+
+
   def AwaitResponse( self, timeout ):
     """Called by clients to wait synchronously for either a response to be
     received or for |timeout| seconds to have passed.
     Returns the message, or:
         - throws ResponseFailedException if the request fails
         - throws ResponseTimeoutException in case of timeout
-        - throws ResponseAbortedException in case the server is shut down."""
+        - throws ResponseAbortedException in case the server is shut down
+        - throws RequestCancelled in case the request is cancelled."""
     self._event.wait( timeout )
 
     if not self._event.is_set():
       raise ResponseTimeoutException( 'Response Timeout' )
 
+    if self._cancelled:
+      raise RequestCancelled( 'Request cancelled' )
+
     if self._message is None:
       raise ResponseAbortedException( 'Response Aborted' )
 
@@ -380,11 +394,39 @@ class LanguageServerConnection( threading.Thread ):
     return response
 
 
-  def GetResponse( self, request_id, message, timeout ):
-    """Issue a request to the server and await the response. See
-    Response.AwaitResponse for return values and exceptions."""
-    response = self.GetResponseAsync( request_id, message )
-    return response.AwaitResponse( timeout )
+  def GetResponse( self,
+                   request_id,
+                   message,
+                   timeout,
+                   cancellation_token = None ):
+    """Issue a request to the server and await the response. If the optional
+    |cancellation_token| is cancelled before the response is received, the
+    request is cancelled. See Response.AwaitResponse for return values and
+    exceptions."""
+    with metrics.Span( 'LanguageServerConnection', 'GetResponse' ):
+      response = self.GetResponseAsync( request_id, message )
+      if not cancellation_token:
+        return response.AwaitResponse( timeout )
+
+      def Cancel():
+        self.CancelRequest( request_id )
+
+      cancellation_token.AddCallback( Cancel )
+      try:
+        return response.AwaitResponse( timeout )
+      finally:
+        cancellation_token.RemoveCallback( Cancel )
+
+
+  def CancelRequest( self, request_id ):
+    """Tell the server to cancel the request |request_id| and stop waiting for
+    its response. Does nothing if the response was already received."""
+    with self._response_mutex:
+      response = self._responses.pop( request_id, None )
+
+    if response:
+      self.SendNotification( lsp.CancelRequest( request_id ) )
+      response.Cancel()
 
 
   def SendNotification( self, message ):
@@ -534,9 +576,10 @@ class LanguageServerConnection( threading.Thread ):
         # This is a response to the message with id message[ 'id' ]
         with self._response_mutex:
           message_id = str( message[ 'id' ] )
-          assert message_id in self._responses
-          self._responses[ message_id ].ResponseReceived( message )
-          del self._responses[ message_id ]
+          # The response may be for a request that was cancelled.
+          response = self._responses.pop( message_id, None )
+          if response:
+            response.ResponseReceived( message )
     else:
       # This is a notification
       self._AddNotificationToQueue( message )
@@ -849,9 +892,11 @@ class LanguageServerCompleter( Completer ):
     request_id = self.GetConnection().NextRequestId()
 
     msg = lsp.Completion( request_id, request_data, codepoint )
-    response = self.GetConnection().GetResponse( request_id,
-                                                 msg,
-                                                 REQUEST_TIMEOUT_COMPLETION )
+    response = self.GetConnection().GetResponse(
+      request_id,
+      msg,
+      REQUEST_TIMEOUT_COMPLETION,
+      request_data[ 'cancellation_token' ] )
     result = response[ 'result' ]
 
     if isinstance( result, list ):
@@ -877,15 +922,20 @@ class LanguageServerCompleter( Completer ):
 
 
   def _GetCandidatesFromSubclass( self, request_data ):
+    name = type( self ).__name__
     cache_completions = self._completions_cache.GetCompletionsIfCacheValid(
       request_data )
+    metrics.RecordCacheAccess( bool( cache_completions ),
+                               name,
+                               'completions_cache' )
 
     if cache_completions:
       return cache_completions
 
     codepoint = self.GetCodepointForCompletionRequest( request_data )
-    raw_completions, is_incomplete = self.ComputeCandidatesInner( request_data,
-                                                                  codepoint )
+    with metrics.Span( name, 'ComputeCandidatesInner' ):
+      raw_completions, is_incomplete = self.ComputeCandidatesInner(
+        request_data, codepoint )
     self._completions_cache.Update( request_data,
                                     raw_completions,
                                     is_incomplete )
@@ -1162,10 +1212,10 @@ class LanguageServerCompleter( Completer ):
     # polling mechanism.
     filepath = request_data[ 'filepath' ]
     uri = lsp.FilePathToUri( filepath )
-    contents = GetFileLines( request_data, filepath )
+    buffer_index = GetBufferIndex( request_data, filepath )
     with self._server_info_mutex:
       if uri in self._latest_diagnostics:
-        diagnostics = [ _BuildDiagnostic( contents, uri, diag )
+        diagnostics = [ _BuildDiagnostic( buffer_index, uri, diag )
                         for diag in self._latest_diagnostics[ uri ] ]
         return responses.BuildDiagnosticResponse(
           diagnostics, filepath, self.max_diagnostics_to_display )
@@ -1296,11 +1346,11 @@ class LanguageServerCompleter( Completer ):
 
       with self._server_info_mutex:
         if filepath in self._server_file_state:
-          contents = utils.SplitLines(
+          buffer_index = BufferIndex(
             self._server_file_state[ filepath ].contents )
         else:
-          contents = GetFileLines( request_data, filepath )
-      diagnostics = [ _BuildDiagnostic( contents, uri, x )
+          buffer_index = GetBufferIndex( request_data, filepath )
+      diagnostics = [ _BuildDiagnostic( buffer_index, uri, x )
                       for x in params[ 'diagnostics' ] ]
       return {
         'diagnostics': responses.BuildDiagnosticResponse(
@@ -1775,9 +1825,9 @@ class LanguageServerCompleter( Completer ):
                                                  message,
                                                  REQUEST_TIMEOUT_COMMAND )
     filepath = request_data[ 'filepath' ]
-    contents = GetFileLines( request_data, filepath )
+    buffer_index = GetBufferIndex( request_data, filepath )
     chunks = [ responses.FixItChunk( text_edit[ 'newText' ],
-                                     _BuildRange( contents,
+                                     _BuildRange( buffer_index,
                                                   filepath,
                                                   text_edit[ 'range' ] ) )
                for text_edit in response[ 'result' ] or [] ]
@@ -1940,9 +1990,9 @@ def _InsertionTextForItem( request_data, item ):
 
   if additional_text_edits:
     filepath = request_data[ 'filepath' ]
-    contents = GetFileLines( request_data, filepath )
+    buffer_index = GetBufferIndex( request_data, filepath )
     chunks = [ responses.FixItChunk( e[ 'newText' ],
-                                     _BuildRange( contents,
+                                     _BuildRange( buffer_index,
                                                   filepath,
                                                   e[ 'range' ] ) )
                for e in additional_text_edits ]
@@ -2042,11 +2092,9 @@ def _GetCompletionItemStartCodepointOrReject( text_edit, request_data ):
       "The TextEdit '{0}' spans multiple lines".format(
         text_edit[ 'newText' ] ) )
 
-  file_contents = GetFileLines( request_data, request_data[ 'filepath' ] )
-  line_value = file_contents[ edit_range[ 'start' ][ 'line' ] ]
-
-  start_codepoint = lsp.UTF16CodeUnitsToCodepoints(
-    line_value,
+  buffer_index = GetBufferIndex( request_data, request_data[ 'filepath' ] )
+  start_codepoint = buffer_index.UTF16CodeUnitsToCodepoints(
+    edit_range[ 'start' ][ 'line' ] + 1,
     edit_range[ 'start' ][ 'character' ] + 1 )
 
   if start_codepoint > request_data[ 'start_codepoint' ]:
@@ -2076,25 +2124,25 @@ def _PositionToLocationAndDescription( request_data, position ):
   """Convert a LSP position to a ycmd location."""
   try:
     filename = lsp.UriToFilePath( position[ 'uri' ] )
-    file_contents = GetFileLines( request_data, filename )
+    buffer_index = GetBufferIndex( request_data, filename )
   except lsp.InvalidUriException:
     LOGGER.debug( 'Invalid URI, file contents not available in GoTo' )
     filename = ''
-    file_contents = []
+    buffer_index = BufferIndex( '' )
   except IOError:
     # It's possible to receive positions for files which no longer exist (due to
     # race condition). UriToFilePath doesn't throw IOError, so we can assume
     # that filename is already set.
     LOGGER.exception( 'A file could not be found when determining a '
                       'GoTo location' )
-    file_contents = []
+    buffer_index = BufferIndex( '' )
 
   return _BuildLocationAndDescription( filename,
-                                       file_contents,
+                                       buffer_index,
                                        position[ 'range' ][ 'start' ] )
 
 
-def _LspToYcmdLocation( file_contents, location ):
+def _LspToYcmdLocation( buffer_index, location ):
   """Converts a LSP location to a ycmd one. Returns a tuple of (
      - the contents of the line of |location|
      - the line number of |location|
@@ -2102,11 +2150,13 @@ def _LspToYcmdLocation( file_contents, location ):
   )"""
   line_num = location[ 'line' ] + 1
   try:
-    line_value = file_contents[ location[ 'line' ] ]
-    return line_value, line_num, utils.CodepointOffsetToByteOffset(
-      line_value,
-      lsp.UTF16CodeUnitsToCodepoints( line_value,
-                                      location[ 'character' ] + 1 ) )
+    return ( buffer_index.Line( line_num ),
+             line_num,
+             buffer_index.CodepointOffsetToByteOffset(
+               line_num,
+               buffer_index.UTF16CodeUnitsToCodepoints(
+                 line_num,
+                 location[ 'character' ] + 1 ) ) )
   except IndexError:
     # This can happen when there are stale diagnostics in OnFileReadyToParse,
     # just return the value as-is.
@@ -2125,16 +2175,16 @@ def _CursorInsideLocation( request_data, location ):
 
   line = request_data[ 'line_num' ]
   column = request_data[ 'column_num' ]
-  file_contents = GetFileLines( request_data, filepath )
+  buffer_index = GetBufferIndex( request_data, filepath )
   lsp_range = location[ 'range' ]
 
-  _, start_line, start_column = _LspToYcmdLocation( file_contents,
+  _, start_line, start_column = _LspToYcmdLocation( buffer_index,
                                                     lsp_range[ 'start' ] )
   if ( line < start_line or
        ( line == start_line and column < start_column ) ):
     return False
 
-  _, end_line, end_column = _LspToYcmdLocation( file_contents,
+  _, end_line, end_column = _LspToYcmdLocation( buffer_index,
                                                 lsp_range[ 'end' ] )
   if ( line > end_line or
        ( line == end_line and column > end_column ) ):
@@ -2143,27 +2193,27 @@ def _CursorInsideLocation( request_data, location ):
   return True
 
 
-def _BuildLocationAndDescription( filename, file_contents, location ):
+def _BuildLocationAndDescription( filename, buffer_index, location ):
   """Returns a tuple of (
     - ycmd Location for the supplied filename and LSP location
     - contents of the line at that location
   )
   Importantly, converts from LSP Unicode offset to ycmd byte offset."""
-  line_value, line, column = _LspToYcmdLocation( file_contents, location )
+  line_value, line, column = _LspToYcmdLocation( buffer_index, location )
   return responses.Location( line, column, filename = filename ), line_value
 
 
-def _BuildRange( contents, filename, r ):
+def _BuildRange( buffer_index, filename, r ):
   """Returns a ycmd range from a LSP range |r|."""
   return responses.Range( _BuildLocationAndDescription( filename,
-                                                        contents,
+                                                        buffer_index,
                                                         r[ 'start' ] )[ 0 ],
                           _BuildLocationAndDescription( filename,
-                                                        contents,
+                                                        buffer_index,
                                                         r[ 'end' ] )[ 0 ] )
 
 
-def _BuildDiagnostic( contents, uri, diag ):
+def _BuildDiagnostic( buffer_index, uri, diag ):
   """Return a ycmd diagnostic from a LSP diagnostic."""
   try:
     filename = lsp.UriToFilePath( uri )
@@ -2171,7 +2221,7 @@ def _BuildDiagnostic( contents, uri, diag ):
     LOGGER.debug( 'Invalid URI received for diagnostic' )
     filename = ''
 
-  r = _BuildRange( contents, filename, diag[ 'range' ] )
+  r = _BuildRange( buffer_index, filename, diag[ 'range' ] )
 
   return responses.Diagnostic(
     ranges = [ r ],
@@ -2189,10 +2239,10 @@ def TextEditToChunks( request_data, uri, text_edit ):
     LOGGER.debug( 'Invalid filepath received in TextEdit' )
     filepath = ''
 
-  contents = GetFileLines( request_data, filepath )
+  buffer_index = GetBufferIndex( request_data, filepath )
   return [
     responses.FixItChunk( change[ 'newText' ],
-                          _BuildRange( contents,
+                          _BuildRange( buffer_index,
                                        filepath,
                                        change[ 'range' ] ) )
     for change in text_edit
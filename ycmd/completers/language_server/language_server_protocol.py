@@ -269,6 +269,10 @@ def Exit():
   return BuildNotification( 'exit', None )
 
 
+def CancelRequest( request_id ):
+  return BuildNotification( '$/cancelRequest', { 'id': request_id } )
+
+
 def Reject( request, request_error, data = None ):
   msg = {
     'error': {
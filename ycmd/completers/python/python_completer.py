@@ -27,8 +27,6 @@ from ycmd.completers.completer import Completer
 from ycmd.utils import ExpandVariablesInPath, FindExecutable, LOGGER
 
 import os
-import jedi
-import parso
 from threading import Lock
 
 
@@ -102,6 +100,9 @@ class PythonCompleter( Completer ):
     except KeyError:
       pass
 
+    # Jedi and Parso take a significant time to import so they are only imported
+    # when needed.
+    import jedi
     # Assume paths specified by the user are safe.
     environment = ( jedi.get_default_environment() if not interpreter_path else
                     jedi.create_environment( interpreter_path, safe = False ) )
@@ -164,6 +165,7 @@ class PythonCompleter( Completer ):
     col = request_data[ 'start_codepoint' ] - 1
     environment = self._EnvironmentForRequest( request_data )
     sys_path = self._SysPathForFile( request_data, environment )
+    import jedi
     return jedi.Script( source,
                         line,
                         col,
@@ -335,6 +337,8 @@ class PythonCompleter( Completer ):
       key = 'Python version',
       value = '.'.join( str( item ) for item in environment.version_info ) )
 
+    import jedi
+    import parso
     jedi_version = responses.DebugInfoItem(
       key = 'Jedi version',
       value = jedi.__version__ )
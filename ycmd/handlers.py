@@ -31,9 +31,12 @@ import traceback
 from bottle import request
 
 import ycm_core
-from ycmd import extra_conf_store, hmac_plugin, server_state, user_options_store
+from ycmd import ( extra_conf_store, hmac_plugin, import_profiler, metrics,
+                   server_state, user_options_store )
+from ycmd.metrics_plugin import MetricsPlugin
 from ycmd.responses import ( BuildExceptionResponse, BuildCompletionResponse,
                              UnknownExtraConf )
+from ycmd.request_cancellation import RequestCancelled
 from ycmd.request_wrap import RequestWrap
 from ycmd.bottle_utils import SetResponseHeader
 from ycmd.completers.completer_utils import FilterAndSortCandidatesWrap
@@ -47,19 +50,24 @@ bottle.Request.MEMFILE_MAX = 10 * 1024 * 1024
 _server_state = None
 _hmac_secret = bytes()
 app = bottle.Bottle()
+# Installed first so that endpoint latencies include the other plugins.
+app.install( MetricsPlugin() )
 wsgi_server = None
 
 
 @app.post( '/event_notification' )
 def EventNotification():
   LOGGER.info( 'Received event notification' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   event_name = request_data[ 'event_name' ]
   LOGGER.debug( 'Event name: %s', event_name )
 
   event_handler = 'On' + event_name
   getattr( _server_state.GetGeneralCompleter(), event_handler )( request_data )
 
+  if event_name == 'BufferUnload':
+    _server_state.GetBufferStore().Remove( request_data[ 'filepath' ] )
+
   filetypes = request_data[ 'filetypes' ]
   response_data = None
   if _server_state.FiletypeCompletionUsable( filetypes ):
@@ -74,7 +82,7 @@ def EventNotification():
 @app.post( '/run_completer_command' )
 def RunCompleterCommand():
   LOGGER.info( 'Received command request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.OnUserCommand(
@@ -85,7 +93,25 @@ def RunCompleterCommand():
 @app.post( '/completions' )
 def GetCompletions():
   LOGGER.info( 'Received completion request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
+
+  # A completion request supersedes the one in flight for the same buffer.
+  filepath = request_data[ 'filepath' ]
+  completion_requests = _server_state.GetCompletionRequests()
+  cancellation_token = completion_requests.StartRequest( filepath )
+  request_data[ 'cancellation_token' ] = cancellation_token
+  try:
+    return _GetCompletions( request_data )
+  except RequestCancelled:
+    LOGGER.info( 'Completion request superseded' )
+    response = BuildCompletionResponse( [], request_data[ 'start_column' ] )
+    response[ 'superseded' ] = True
+    return _JsonResponse( response )
+  finally:
+    completion_requests.FinishRequest( filepath, cancellation_token )
+
+
+def _GetCompletions( request_data ):
   do_filetype_completion = _server_state.ShouldUseFiletypeCompleter(
     request_data )
   LOGGER.debug( 'Using filetype completion: %s', do_filetype_completion )
@@ -99,6 +125,8 @@ def GetCompletions():
                                   request_data[ 'filetypes' ] )
                                  .ComputeCandidates( request_data ) )
 
+    except RequestCancelled:
+      raise
     except Exception as exception:
       if request_data[ 'force_semantic' ]:
         # user explicitly asked for semantic completion, so just pass the error
@@ -112,6 +140,7 @@ def GetCompletions():
       errors = [ BuildExceptionResponse( exception, stack ) ]
 
   if not completions and not request_data[ 'force_semantic' ]:
+    request_data[ 'cancellation_token' ].RaiseIfCancelled()
     completions = _server_state.GetGeneralCompleter().ComputeCandidates(
       request_data )
 
@@ -159,13 +188,13 @@ def GetReady():
 def FiletypeCompletionAvailable():
   LOGGER.info( 'Received filetype completion available request' )
   return _JsonResponse( _server_state.FiletypeCompletionAvailable(
-      RequestWrap( request.json )[ 'filetypes' ] ) )
+      _RequestWrap()[ 'filetypes' ] ) )
 
 
 @app.post( '/defined_subcommands' )
 def DefinedSubcommands():
   LOGGER.info( 'Received defined subcommands request' )
-  completer = _GetCompleterForRequestData( RequestWrap( request.json ) )
+  completer = _GetCompleterForRequestData( _RequestWrap() )
 
   return _JsonResponse( completer.DefinedSubcommands() )
 
@@ -173,7 +202,7 @@ def DefinedSubcommands():
 @app.post( '/detailed_diagnostic' )
 def GetDetailedDiagnostic():
   LOGGER.info( 'Received detailed diagnostic request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.GetDetailedDiagnostic( request_data ) )
@@ -182,7 +211,7 @@ def GetDetailedDiagnostic():
 @app.post( '/load_extra_conf_file' )
 def LoadExtraConfFile():
   LOGGER.info( 'Received extra conf load request' )
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = _RequestWrap( validate = False )
   extra_conf_store.Load( request_data[ 'filepath' ], force = True )
 
   return _JsonResponse( True )
@@ -191,7 +220,7 @@ def LoadExtraConfFile():
 @app.post( '/ignore_extra_conf_file' )
 def IgnoreExtraConfFile():
   LOGGER.info( 'Received extra conf ignore request' )
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = _RequestWrap( validate = False )
   extra_conf_store.Disable( request_data[ 'filepath' ] )
 
   return _JsonResponse( True )
@@ -200,7 +229,7 @@ def IgnoreExtraConfFile():
 @app.post( '/debug_info' )
 def DebugInfo():
   LOGGER.info( 'Received debug info request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
 
   has_clang_support = ycm_core.HasClangSupport()
   clang_version = ycm_core.ClangVersion() if has_clang_support else None
@@ -226,6 +255,11 @@ def DebugInfo():
       'path': extra_conf_path,
       'is_loaded': is_loaded
     },
+    'memory': {
+      'num_stored_candidates': ycm_core.NumStoredCandidates(),
+      'num_unused_candidates': ycm_core.NumUnusedCandidates(),
+      'num_stored_characters': ycm_core.NumStoredCharacters()
+    },
     'completer': None
   }
 
@@ -235,9 +269,18 @@ def DebugInfo():
   except Exception:
     LOGGER.exception( 'Error retrieving completer debug info' )
 
+  response[ 'metrics' ] = metrics.GetMetrics()
+  response[ 'import_profile' ] = import_profiler.GetImportProfile()
+
   return _JsonResponse( response )
 
 
+@app.get( '/metrics' )
+def GetMetrics():
+  LOGGER.info( 'Received metrics request' )
+  return _JsonResponse( metrics.GetMetrics() )
+
+
 @app.post( '/shutdown' )
 def Shutdown():
   LOGGER.info( 'Received shutdown request' )
@@ -252,7 +295,7 @@ def ReceiveMessages():
   # The client makes the request with a long timeout (1 hour).
   # When we have data to send, we send it and close the socket.
   # The client then sends a new request.
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap()
   try:
     completer = _GetCompleterForRequestData( request_data )
   except Exception:
@@ -277,7 +320,8 @@ app.default_error_handler = ErrorHandler
 
 def _JsonResponse( data ):
   SetResponseHeader( 'Content-Type', 'application/json' )
-  return json.dumps( data, default = _UniversalSerialize )
+  with metrics.Span( 'json_encode' ):
+    return json.dumps( data, default = _UniversalSerialize )
 
 
 def _UniversalSerialize( obj ):
@@ -289,6 +333,13 @@ def _UniversalSerialize( obj ):
     return str( obj )
 
 
+def _RequestWrap( validate = True ):
+  with metrics.Span( 'request_decode' ):
+    return RequestWrap( request.json,
+                        validate = validate,
+                        buffer_store = _server_state.GetBufferStore() )
+
+
 def _GetCompleterForRequestData( request_data ):
   completer_target = request_data.get( 'completer_target', None )
 
@@ -344,3 +395,9 @@ def KeepSubserversAlive( check_interval_seconds ):
         completer.ServerIsHealthy()
 
   StartThread( Keepalive, check_interval_seconds )
+
+
+def PrewarmFiletypeCompleters():
+  filetypes = _server_state.user_options[ 'prewarm_filetypes' ]
+  if filetypes:
+    StartThread( _server_state.PrewarmFiletypeCompleters, filetypes )
@@ -22,13 +22,20 @@ from __future__ import absolute_import
 # Not installing aliases from python-future; it's unreliable and slow.
 from builtins import *  # noqa
 
-import requests
 from base64 import b64decode, b64encode
 from bottle import request, abort
-from ycmd import hmac_utils
+from future.utils import PY2
+from ycmd import hmac_utils, metrics
 from ycmd.utils import LOGGER, ToBytes, urlparse
 from ycmd.bottle_utils import SetResponseHeader
 
+# Not importing the requests module for its status codes since it takes a
+# significant time to import.
+if PY2:
+  import httplib as http_client
+else:
+  import http.client as http_client
+
 _HMAC_HEADER = 'x-ycm-hmac'
 _HOST_HEADER = 'host'
 
@@ -55,15 +62,17 @@ class HmacPlugin( object ):
     def wrapper( *args, **kwargs ):
       if not HostHeaderCorrect( request ):
         LOGGER.info( 'Dropping request with bad Host header' )
-        abort( requests.codes.unauthorized,
+        abort( http_client.UNAUTHORIZED,
                'Unauthorized, received bad Host header.' )
         return
 
-      body = ToBytes( request.body.read() )
-      if not RequestAuthenticated( request.method, request.path, body,
-                                   self._hmac_secret ):
+      with metrics.Span( 'hmac' ):
+        body = ToBytes( request.body.read() )
+        authenticated = RequestAuthenticated( request.method, request.path,
+                                              body, self._hmac_secret )
+      if not authenticated:
         LOGGER.info( 'Dropping request with bad HMAC' )
-        abort( requests.codes.unauthorized, 'Unauthorized, received bad HMAC.' )
+        abort( http_client.UNAUTHORIZED, 'Unauthorized, received bad HMAC.' )
         return
       body = callback( *args, **kwargs )
       SetHmacHeader( body, self._hmac_secret )
@@ -51,9 +51,26 @@ def CreateRequestHmac( method, path, body, hmac_secret ):
   if not isinstance( path, bytes ):
     raise TypeError( 'path was not of bytes type; you have a bug!' )
 
+  return CreateRequestHmacFromBodyHmac( method,
+                                        path,
+                                        CreateHmac( body, hmac_secret ),
+                                        hmac_secret )
+
+
+def CreateStreamingHmac( hmac_secret ):
+  """Returns an object computing the same HMAC as CreateHmac on the content
+  passed to its update method. Its digest method returns the HMAC."""
+  if not isinstance( hmac_secret, bytes ):
+    raise TypeError( 'hmac_secret was not of bytes type; you have a bug!' )
+
+  return hmac.new( hmac_secret, digestmod = hashlib.sha256 )
+
+
+def CreateRequestHmacFromBodyHmac( method, path, body_hmac, hmac_secret ):
+  """Like CreateRequestHmac when the HMAC of the body was already computed,
+  e.g. with CreateStreamingHmac while the body was read."""
   method_hmac = CreateHmac( method, hmac_secret )
   path_hmac = CreateHmac( path, hmac_secret )
-  body_hmac = CreateHmac( body, hmac_secret )
 
   joined_hmac_input = bytes().join( ( method_hmac, path_hmac, body_hmac ) )
   return CreateHmac( joined_hmac_input, hmac_secret )
@@ -0,0 +1,388 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from base64 import b64decode, b64encode
+from future.utils import PY2, native
+from io import BytesIO
+import bottle
+import json
+import os
+import socket
+import struct
+import threading
+import traceback
+
+from ycmd import hmac_utils, metrics
+from ycmd.hmac_plugin import HostHeaderCorrect
+from ycmd.utils import ( LOGGER, RemoveIfExists, StartThread, ToBytes,
+                         ToUnicode )
+
+if PY2:
+  import httplib as http_client
+  from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+  from Queue import Queue
+  from SocketServer import TCPServer, ThreadingMixIn
+else:
+  import http.client as http_client
+  from http.server import BaseHTTPRequestHandler, HTTPServer
+  from queue import Queue
+  from socketserver import TCPServer, ThreadingMixIn
+
+# Use a faster JSON decoder if one is installed.
+try:
+  import orjson as fast_json
+except ImportError:
+  try:
+    import ujson as fast_json
+  except ImportError:
+    fast_json = None
+
+_HMAC_HEADER = 'x-ycm-hmac'
+# Set by StdioServer clients on requests and copied to their responses so that
+# responses sent out of order can be matched with their requests.
+_REQUEST_ID_HEADER = 'x-ycm-request-id'
+_BODY_CHUNK_SIZE = 64 * 1024
+# Messages exchanged by StdioServer are prefixed by their length as a 32-bit
+# unsigned big-endian integer.
+_FRAME_HEADER = struct.Struct( native( '>I' ) )
+
+UNIX_SOCKETS_SUPPORTED = hasattr( socket, 'AF_UNIX' )
+
+
+def JsonLoads( data ):
+  if fast_json:
+    return fast_json.loads( data )
+  return json.loads( ToUnicode( data ) )
+
+
+class ThreadedHTTPServer( ThreadingMixIn, HTTPServer ):
+  """Alternative to StoppableWSGIServer serving the routes of a Bottle
+  application on a thread per connection. Connections are kept alive between
+  requests. Requests are authenticated while their body is read and their JSON
+  body is decoded before the route is called so that the HmacPlugin must not be
+  installed on the application. Other plugins (e.g. WatchdogPlugin) are still
+  applied."""
+
+  daemon_threads = True
+  allow_reuse_address = True
+  check_host_header = True
+
+  def __init__( self, app, hmac_secret, host, port ):
+    HTTPServer.__init__( self, ( host, port ), _RequestHandler )
+    self.app = app
+    self.hmac_secret = hmac_secret
+
+
+  def Run( self ):
+    # Same message as StoppableWSGIServer for clients parsing it.
+    host, port = self.server_address[ : 2 ]
+    print( 'serving on http://{0}:{1}'.format( host, port ) )
+    self.serve_forever()
+
+
+  def Shutdown( self ):
+    """Stop serving. Must not be called from the thread running Run."""
+    self.shutdown()
+    self.server_close()
+
+
+class ThreadedUnixHTTPServer( ThreadingMixIn, TCPServer ):
+  """Same as ThreadedHTTPServer but listening on a Unix domain socket. The
+  socket file is only accessible to the current user and the Host header of
+  requests is not checked since browsers cannot connect to it."""
+
+  address_family = getattr( socket, 'AF_UNIX', None )
+  daemon_threads = True
+  check_host_header = False
+
+  def __init__( self, app, hmac_secret, socket_path ):
+    # A socket file left by a server that was not properly shut down prevents
+    # binding the socket.
+    RemoveIfExists( socket_path )
+    TCPServer.__init__( self, native( socket_path ), _UnixRequestHandler,
+                        bind_and_activate = False )
+    self.app = app
+    self.hmac_secret = hmac_secret
+    try:
+      old_umask = os.umask( 0o177 )
+      try:
+        self.server_bind()
+      finally:
+        os.umask( old_umask )
+      self.server_activate()
+    except Exception:
+      self.server_close()
+      raise
+
+
+  def Run( self ):
+    print( 'serving on {0}'.format( self.server_address ) )
+    self.serve_forever()
+
+
+  def Shutdown( self ):
+    """Stop serving. Must not be called from the thread running Run."""
+    self.shutdown()
+    self.server_close()
+
+
+  def server_close( self ):
+    TCPServer.server_close( self )
+    RemoveIfExists( self.server_address )
+
+
+class StdioServer( object ):
+  """Serves the routes of a Bottle application over a pair of binary streams,
+  typically the standard input and output of the server. Each request is an
+  HTTP/1.1 request message prefixed by its length as a 32-bit unsigned
+  big-endian integer. Requests are handled on a thread each and responses are
+  framed the same way and sent as soon as they are ready, so possibly not in
+  the order of the requests; the X-Ycm-Request-Id header of a request is copied
+  to its response. Requests and responses are authenticated like with
+  ThreadedHTTPServer except that the Host header is not checked."""
+
+  check_host_header = False
+
+  def __init__( self, app, hmac_secret, input_stream, output_stream ):
+    self.app = app
+    self.hmac_secret = hmac_secret
+    self._input_stream = input_stream
+    self._output_stream = output_stream
+    self._output_lock = threading.Lock()
+    # Requests read from the input stream. None means that no more requests
+    # must be handled.
+    self._requests = Queue()
+
+
+  def Run( self ):
+    StartThread( self._ReadRequests )
+
+    workers = []
+    while True:
+      request = self._requests.get()
+      if request is None:
+        break
+      workers = [ worker for worker in workers if worker.is_alive() ]
+      workers.append( StartThread( self._HandleRequest, request ) )
+
+    for worker in workers:
+      worker.join()
+
+
+  def Shutdown( self ):
+    """Stop serving once the requests being handled are answered."""
+    self._requests.put( None )
+
+
+  def _HandleRequest( self, request ):
+    handler = _FrameRequestHandler( request, None, self )
+    self._WriteFrame( handler.wfile.getvalue() )
+
+
+  def _ReadRequests( self ):
+    try:
+      while True:
+        header = self._ReadExactly( _FRAME_HEADER.size )
+        if header is None:
+          break
+        request = self._ReadExactly( _FRAME_HEADER.unpack( header )[ 0 ] )
+        if request is None:
+          break
+        self._requests.put( request )
+    finally:
+      self._requests.put( None )
+
+
+  def _ReadExactly( self, size ):
+    """Returns |size| bytes from the input stream or None if the stream ends
+    before."""
+    data = bytes()
+    while len( data ) < size:
+      chunk = self._input_stream.read( size - len( data ) )
+      if not chunk:
+        return None
+      data += chunk
+    return data
+
+
+  def _WriteFrame( self, data ):
+    with self._output_lock:
+      self._output_stream.write( _FRAME_HEADER.pack( len( data ) ) )
+      self._output_stream.write( data )
+      self._output_stream.flush()
+
+
+class _RequestHandler( BaseHTTPRequestHandler ):
+  protocol_version = native( 'HTTP/1.1' )
+  disable_nagle_algorithm = True
+
+
+  def do_GET( self ):
+    self._HandleRequest()
+
+
+  def do_POST( self ):
+    self._HandleRequest()
+
+
+  def log_message( self, format, *args ):
+    LOGGER.debug( format, *args )
+
+
+  def _HandleRequest( self ):
+    path, _, query_string = ToUnicode( self.path ).partition( '?' )
+    environ = {
+      'REQUEST_METHOD': ToUnicode( self.command ),
+      'PATH_INFO': path,
+      'QUERY_STRING': query_string,
+      'CONTENT_TYPE': self.headers.get( 'content-type', '' ),
+      'SERVER_PROTOCOL': ToUnicode( self.request_version ),
+      'bottle.app': self.server.app,
+    }
+
+    bottle.request.bind( environ )
+    bottle.response.bind()
+    try:
+      if self.server.check_host_header and not HostHeaderCorrect( self ):
+        LOGGER.info( 'Dropping request with bad Host header' )
+        # The body must be read so that the connection can be reused.
+        self._DiscardBody( int( self.headers.get( 'content-length', 0 ) ) )
+        raise bottle.HTTPError( http_client.UNAUTHORIZED,
+                                'Unauthorized, received bad Host header.' )
+
+      with metrics.Span( 'hmac' ):
+        body = self._ReadAuthenticatedBody( environ )
+      environ[ 'CONTENT_LENGTH' ] = str( len( body ) )
+      environ[ 'wsgi.input' ] = BytesIO( body )
+      if body and environ[ 'CONTENT_TYPE' ].startswith( 'application/json' ):
+        try:
+          with metrics.Span( 'json_decode' ):
+            environ[ 'bottle.request.json' ] = JsonLoads( body )
+        except ValueError:
+          raise bottle.HTTPError( http_client.BAD_REQUEST, 'Invalid JSON' )
+
+      route, args = self.server.app.router.match( environ )
+      body = route.call( **args )
+    except bottle.HTTPError as error:
+      body = self._HandleError( error )
+    except bottle.HTTPResponse as response:
+      response.apply( bottle.response )
+      body = response.body
+    except Exception as exception:
+      body = self._HandleError( bottle.HTTPError( 500,
+                                                  'Internal Server Error',
+                                                  exception,
+                                                  traceback.format_exc() ) )
+
+    self._SendResponse( ToBytes( body or '' ) )
+
+
+  def _ReadAuthenticatedBody( self, environ ):
+    """Reads the body of the request while computing its HMAC. Raises a 413
+    error if the body is larger than what Bottle accepts and a 401 error if the
+    HMAC of the request is not valid."""
+    remaining = int( self.headers.get( 'content-length', 0 ) )
+    if remaining > bottle.Request.MEMFILE_MAX:
+      # The body is discarded without being stored so that the connection can
+      # be reused.
+      self._DiscardBody( remaining )
+      raise bottle.HTTPError( http_client.REQUEST_ENTITY_TOO_LARGE,
+                              'Request entity too large' )
+
+    hmac_secret = self.server.hmac_secret
+    body_hmac = hmac_utils.CreateStreamingHmac( hmac_secret )
+    chunks = []
+    while remaining > 0:
+      chunk = self.rfile.read( min( remaining, _BODY_CHUNK_SIZE ) )
+      if not chunk:
+        break
+      body_hmac.update( chunk )
+      chunks.append( chunk )
+      remaining -= len( chunk )
+
+    request_hmac = self.headers.get( _HMAC_HEADER )
+    if not request_hmac or not hmac_utils.SecureBytesEqual(
+        hmac_utils.CreateRequestHmacFromBodyHmac(
+          ToBytes( environ[ 'REQUEST_METHOD' ] ),
+          ToBytes( environ[ 'PATH_INFO' ] ),
+          ToBytes( body_hmac.digest() ),
+          hmac_secret ),
+        ToBytes( b64decode( request_hmac ) ) ):
+      LOGGER.info( 'Dropping request with bad HMAC' )
+      raise bottle.HTTPError( http_client.UNAUTHORIZED,
+                              'Unauthorized, received bad HMAC.' )
+    return bytes().join( chunks )
+
+
+  def _DiscardBody( self, remaining ):
+    while remaining > 0:
+      chunk = self.rfile.read( min( remaining, _BODY_CHUNK_SIZE ) )
+      if not chunk:
+        break
+      remaining -= len( chunk )
+
+
+  def _HandleError( self, error ):
+    error.apply( bottle.response )
+    return self.server.app.default_error_handler( error )
+
+
+  def _SendResponse( self, body ):
+    response = bottle.response
+    self.send_response( response.status_code )
+    for name, value in response.headerlist:
+      if name.lower() not in ( _HMAC_HEADER, 'content-length' ):
+        self.send_header( name, value )
+    self.send_header( 'Content-Length', str( len( body ) ) )
+    self.send_header( _HMAC_HEADER, ToUnicode( b64encode(
+      hmac_utils.CreateHmac( body, self.server.hmac_secret ) ) ) )
+    self.end_headers()
+    self.wfile.write( body )
+
+
+class _UnixRequestHandler( _RequestHandler ):
+  # TCP_NODELAY cannot be set on Unix domain sockets.
+  disable_nagle_algorithm = False
+
+
+class _FrameRequestHandler( _RequestHandler ):
+  """Handles the HTTP request message |request| given as bytes. The response
+  message is written in a BytesIO object."""
+
+  def setup( self ):
+    self.rfile = BytesIO( self.request )
+    self.wfile = BytesIO()
+
+
+  def finish( self ):
+    pass
+
+
+  def end_headers( self ):
+    # The headers are not set if the request message could not be parsed.
+    headers = getattr( self, 'headers', None )
+    request_id = headers.get( _REQUEST_ID_HEADER ) if headers else None
+    if request_id is not None:
+      self.send_header( _REQUEST_ID_HEADER, request_id )
+    _RequestHandler.end_headers( self )
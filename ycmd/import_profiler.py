@@ -0,0 +1,124 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures the time spent importing modules, similarly to the -X importtime
+option of Python 3.7. Once Enable is called, the built-in __import__ function
+is replaced by a function recording the self and cumulative import times of
+each module imported for the first time. Modules imported with
+importlib.import_module are only measured if imported through ImportModule."""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from future.utils import PY2
+from importlib import import_module
+import sys
+import threading
+import time
+
+if PY2:
+  import __builtin__ as builtins_module
+else:
+  import builtins as builtins_module
+
+# time.perf_counter is not available on Python 2.
+_Clock = getattr( time, 'perf_counter', time.time )
+
+_original_import = None
+_imports = []
+_lock = threading.Lock()
+_thread_data = threading.local()
+
+
+def Enable():
+  global _original_import
+  if _original_import is None:
+    _original_import = builtins_module.__import__
+    builtins_module.__import__ = _ProfilingImport
+
+
+def Disable():
+  global _original_import
+  if _original_import is not None:
+    builtins_module.__import__ = _original_import
+    _original_import = None
+
+
+def IsEnabled():
+  return _original_import is not None
+
+
+def Reset():
+  with _lock:
+    del _imports[ : ]
+
+
+def ImportModule( name ):
+  """Same as importlib.import_module but measured when profiling is
+  enabled."""
+  if _original_import is None or name in sys.modules:
+    return import_module( name )
+  return _Measure( name, import_module, name )
+
+
+def _ProfilingImport( name, *args, **kwargs ):
+  if name in sys.modules:
+    return _original_import( name, *args, **kwargs )
+  return _Measure( name, _original_import, name, *args, **kwargs )
+
+
+def _Measure( name, import_function, *args, **kwargs ):
+  # Stack of the time spent importing the children of the modules being
+  # imported by this thread.
+  stack = _thread_data.__dict__.setdefault( 'stack', [] )
+  stack.append( 0 )
+  start_time = _Clock()
+  try:
+    return import_function( *args, **kwargs )
+  finally:
+    cumulative_time = _Clock() - start_time
+    children_time = stack.pop()
+    if stack:
+      stack[ -1 ] += cumulative_time
+    # Failed imports, e.g. of optional modules, are not recorded.
+    if name in sys.modules:
+      with _lock:
+        _imports.append( ( name,
+                           cumulative_time - children_time,
+                           cumulative_time,
+                           len( stack ) ) )
+
+
+def GetImportProfile():
+  """Returns the recorded imports sorted by decreasing cumulative time and the
+  total time spent in imports."""
+  with _lock:
+    imports = list( _imports )
+  imports.sort( key = lambda entry: entry[ 2 ], reverse = True )
+  return {
+    'enabled': IsEnabled(),
+    'total_ms': sum( cumulative_time for _, _, cumulative_time, depth in imports
+                     if depth == 0 ) * 1000,
+    'imports': [ { 'module': name,
+                   'self_ms': self_time * 1000,
+                   'cumulative_ms': cumulative_time * 1000 }
+                 for name, self_time, cumulative_time, _ in imports ]
+  }
@@ -0,0 +1,190 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Lightweight timing and cache instrumentation. Metrics are only collected
+once Enable is called; until then, Span returns a shared no-op object and
+RecordCacheAccess returns immediately so that instrumented code pays a single
+function call."""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from future.utils import iteritems
+from bisect import bisect_left
+import threading
+import time
+
+# time.perf_counter is not available on Python 2.
+_Clock = getattr( time, 'perf_counter', time.time )
+
+# Upper bounds in milliseconds of the histogram buckets: from 0.1ms to about
+# 105s, doubling each time. Latencies above the last bound are counted in an
+# additional bucket.
+BUCKET_BOUNDS_MS = [ 0.1 * 2 ** i for i in range( 21 ) ]
+
+_enabled = False
+_histograms = {}
+_caches = {}
+_lock = threading.Lock()
+
+
+def Enable():
+  global _enabled
+  _enabled = True
+
+
+def Disable():
+  global _enabled
+  _enabled = False
+
+
+def IsEnabled():
+  return _enabled
+
+
+def Reset():
+  with _lock:
+    _histograms.clear()
+    _caches.clear()
+
+
+def Span( *name_parts ):
+  """Returns a context manager recording the time spent in its block in the
+  latency histogram named after |name_parts| joined by dots. The name is only
+  built when metrics are enabled."""
+  if not _enabled:
+    return _NULL_SPAN
+  return _Span( '.'.join( name_parts ) )
+
+
+def RecordLatency( name, seconds ):
+  with _lock:
+    histogram = _histograms.get( name )
+    if histogram is None:
+      histogram = _histograms[ name ] = Histogram()
+    histogram.Record( seconds * 1000 )
+
+
+def RecordCacheAccess( hit, *name_parts ):
+  """Counts a hit if |hit| is true, a miss otherwise, for the cache named after
+  |name_parts| joined by dots."""
+  if not _enabled:
+    return
+  name = '.'.join( name_parts )
+  with _lock:
+    counts = _caches.get( name )
+    if counts is None:
+      counts = _caches[ name ] = [ 0, 0 ]
+    counts[ 0 if hit else 1 ] += 1
+
+
+def GetMetrics():
+  with _lock:
+    return {
+      'enabled': _enabled,
+      'latencies': { name: histogram.Summary()
+                     for name, histogram in iteritems( _histograms ) },
+      'caches': { name: _CacheSummary( hits, misses )
+                  for name, ( hits, misses ) in iteritems( _caches ) }
+    }
+
+
+class Histogram( object ):
+  """Latency histogram with fixed buckets. Not thread-safe."""
+
+  def __init__( self ):
+    self._counts = [ 0 ] * ( len( BUCKET_BOUNDS_MS ) + 1 )
+    self._count = 0
+    self._sum_ms = 0.0
+    self._max_ms = 0.0
+
+
+  def Record( self, value_ms ):
+    self._counts[ bisect_left( BUCKET_BOUNDS_MS, value_ms ) ] += 1
+    self._count += 1
+    self._sum_ms += value_ms
+    self._max_ms = max( self._max_ms, value_ms )
+
+
+  def Percentile( self, percentile ):
+    """Returns the upper bound of the bucket containing the |percentile|th
+    percentile, or the maximum recorded value if it is smaller."""
+    if not self._count:
+      return 0.0
+    rank = percentile / 100 * self._count
+    cumulative_count = 0
+    for index, count in enumerate( self._counts[ : -1 ] ):
+      cumulative_count += count
+      if cumulative_count >= rank:
+        return min( BUCKET_BOUNDS_MS[ index ], self._max_ms )
+    return self._max_ms
+
+
+  def Summary( self ):
+    return {
+      'count': self._count,
+      'mean_ms': self._sum_ms / self._count if self._count else 0.0,
+      'p50_ms': self.Percentile( 50 ),
+      'p90_ms': self.Percentile( 90 ),
+      'p99_ms': self.Percentile( 99 ),
+      'max_ms': self._max_ms,
+      # Counts of the non-empty buckets as [ upper bound, count ] pairs. The
+      # upper bound of the last bucket is null.
+      'buckets': [ [ BUCKET_BOUNDS_MS[ index ]
+                     if index < len( BUCKET_BOUNDS_MS ) else None, count ]
+                   for index, count in enumerate( self._counts ) if count ]
+    }
+
+
+def _CacheSummary( hits, misses ):
+  return {
+    'hits': hits,
+    'misses': misses,
+    'hit_ratio': hits / ( hits + misses )
+  }
+
+
+class _Span( object ):
+
+  def __init__( self, name ):
+    self._name = name
+
+
+  def __enter__( self ):
+    self._start_time = _Clock()
+    return self
+
+
+  def __exit__( self, *args ):
+    RecordLatency( self._name, _Clock() - self._start_time )
+
+
+class _NullSpan( object ):
+
+  def __enter__( self ):
+    return self
+
+
+  def __exit__( self, *args ):
+    pass
+
+
+_NULL_SPAN = _NullSpan()
@@ -0,0 +1,46 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from ycmd import metrics
+
+
+# This class implements the Bottle plugin API:
+# http://bottlepy.org/docs/dev/plugindev.html
+#
+# Every route handler is decorated so that the time spent handling a request is
+# recorded in a latency histogram per endpoint when metrics are enabled. The
+# plugin should be installed first so that the time spent in the other plugins
+# (e.g. checking the HMAC) is included.
+class MetricsPlugin( object ):
+  name = 'metrics'
+  api = 2
+
+
+  def apply( self, callback, route ):
+    span_name = 'endpoint' + route.rule
+
+    def wrapper( *args, **kwargs ):
+      with metrics.Span( span_name ):
+        return callback( *args, **kwargs )
+    return wrapper
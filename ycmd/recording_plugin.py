@@ -0,0 +1,174 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+import gzip
+import hashlib
+import json
+import re
+import sys
+import time
+from bottle import request
+from ycmd.utils import LOGGER, StartThread, ToBytes, ToUnicode
+
+if sys.version_info[ 0 ] == 2:
+  from Queue import Queue, Full
+else:
+  from queue import Queue, Full
+
+CONTENTS_MODES = [ 'keep', 'hash', 'redact' ]
+# Requests received while this many records are waiting to be written are not
+# recorded.
+MAX_PENDING_RECORDS = 10000
+WRITER_TIMEOUT_SECONDS = 5
+REDACTED_CHARACTERS_REGEX = re.compile( r'\w', re.UNICODE )
+
+
+# This class implements the Bottle plugin API:
+# http://bottlepy.org/docs/dev/plugindev.html
+#
+# Every request is appended to a gzip-compressed JSON Lines file with the time
+# it was received, its path, its query parameters, its body, and the time spent
+# in the handler. This is the trace format read by the replay benchmark (see
+# ycmd/benchmarks/replay.py). The handler thread only puts the raw request in a
+# queue; a background thread decodes and writes the records so that recording
+# does not add latency to the requests.
+#
+# Since buffer contents may be sensitive, they can be replaced by their SHA-256
+# hash ('hash' mode) or have their word characters replaced by 'x' ('redact'
+# mode), including the contents of buffer edits. Redacted buffers keep their
+# size and layout, so a trace with redacted contents is still representative of
+# the server load.
+class RecordingPlugin( object ):
+  name = 'recording'
+  api = 2
+
+
+  def __init__( self, path, contents_mode = 'keep' ):
+    if contents_mode not in CONTENTS_MODES:
+      raise ValueError( 'Invalid contents mode: {0}'.format( contents_mode ) )
+    self._contents_mode = contents_mode
+    self._file = gzip.open( path, 'ab' )
+    self._pending_records = Queue( MAX_PENDING_RECORDS )
+    self._dropped_records = 0
+    self._writer_thread = StartThread( self._WriterMain )
+
+
+  def apply( self, callback, route ):
+    def wrapper( *args, **kwargs ):
+      timestamp = time.time()
+      method = request.method
+      path = request.path
+      params = dict( request.query )
+      body = request.body.read()
+      try:
+        return callback( *args, **kwargs )
+      finally:
+        self._Enqueue( ( timestamp,
+                         method,
+                         path,
+                         params,
+                         body,
+                         time.time() - timestamp ) )
+    return wrapper
+
+
+  def close( self ):
+    """Writes the pending records and closes the file."""
+    if self._writer_thread is None:
+      return
+    self._pending_records.put( None )
+    self._writer_thread.join( WRITER_TIMEOUT_SECONDS )
+    self._writer_thread = None
+    if self._dropped_records:
+      LOGGER.warning( 'Dropped %d requests from the recording',
+                      self._dropped_records )
+
+
+  def _Enqueue( self, record ):
+    try:
+      self._pending_records.put_nowait( record )
+    except Full:
+      self._dropped_records += 1
+
+
+  def _WriterMain( self ):
+    try:
+      while True:
+        record = self._pending_records.get()
+        if record is None:
+          return
+        try:
+          self._file.write( ToBytes( json.dumps( self._Record( *record ) ) ) +
+                            b'\n' )
+          # Make the recording readable while the server is running.
+          if self._pending_records.empty():
+            self._file.flush()
+        except Exception:
+          LOGGER.exception( 'Error while recording request' )
+    finally:
+      self._file.close()
+
+
+  def _Record( self, timestamp, method, path, params, body, latency ):
+    record = {
+      'timestamp': timestamp,
+      'method': method,
+      'path': path,
+      'body': self._DecodeBody( body ),
+      'latency_ms': latency * 1000
+    }
+    if params:
+      record[ 'params' ] = params
+    return record
+
+
+  def _DecodeBody( self, body ):
+    if not body:
+      return None
+    try:
+      body = json.loads( ToUnicode( body ) )
+    except ValueError:
+      return ToUnicode( body )
+    file_data = body.get( 'file_data' ) if isinstance( body, dict ) else None
+    if self._contents_mode != 'keep' and isinstance( file_data, dict ):
+      for data in file_data.values():
+        self._ProcessFileData( data )
+    return body
+
+
+  def _ProcessFileData( self, data ):
+    # Buffers are sent either with their entire contents or as edits of a
+    # previous version (see BufferStore). Only the existing keys are rewritten
+    # so that replaying the request updates the buffer the same way.
+    if 'contents' in data:
+      data[ 'contents' ] = self._ProcessContents( data[ 'contents' ] )
+    for edit in data.get( 'edits', [] ):
+      if 'contents' in edit:
+        edit[ 'contents' ] = self._ProcessContents( edit[ 'contents' ] )
+
+
+  def _ProcessContents( self, contents ):
+    if self._contents_mode == 'hash':
+      return 'sha256:' + hashlib.sha256( ToBytes( contents ) ).hexdigest()
+    return REDACTED_CHARACTERS_REGEX.sub( 'x', contents )
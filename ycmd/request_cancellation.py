@@ -0,0 +1,103 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+import threading
+
+
+class RequestCancelled( Exception ):
+  """Raised while handling a request that was superseded by a newer one."""
+  pass # pragma: no cover
+
+
+class CancellationToken( object ):
+  """Tells completers that the request they are handling was superseded. Long
+  operations should either check the token regularly through RaiseIfCancelled
+  or register a callback to abort them when the token is cancelled."""
+
+  def __init__( self ):
+    self._cancelled = False
+    self._callbacks = []
+    self._lock = threading.Lock()
+
+
+  def Cancel( self ):
+    with self._lock:
+      if self._cancelled:
+        return
+      self._cancelled = True
+      callbacks = self._callbacks
+      self._callbacks = []
+
+    for callback in callbacks:
+      callback()
+
+
+  def IsCancelled( self ):
+    return self._cancelled
+
+
+  def RaiseIfCancelled( self ):
+    if self._cancelled:
+      raise RequestCancelled( 'Request superseded by a newer one' )
+
+
+  def AddCallback( self, callback ):
+    """Calls |callback| when the token is cancelled, or immediately if it is
+    already cancelled."""
+    with self._lock:
+      if not self._cancelled:
+        self._callbacks.append( callback )
+        return
+    callback()
+
+
+  def RemoveCallback( self, callback ):
+    with self._lock:
+      if callback in self._callbacks:
+        self._callbacks.remove( callback )
+
+
+class RequestGenerations( object ):
+  """Keeps the cancellation token of the latest request for each key. Starting
+  a request for a key cancels the request in flight for the same key."""
+
+  def __init__( self ):
+    self._tokens = {}
+    self._tokens_lock = threading.Lock()
+
+
+  def StartRequest( self, key ):
+    token = CancellationToken()
+    with self._tokens_lock:
+      previous_token = self._tokens.get( key )
+      self._tokens[ key ] = token
+    if previous_token:
+      previous_token.Cancel()
+    return token
+
+
+  def FinishRequest( self, key, token ):
+    with self._tokens_lock:
+      if self._tokens.get( key ) is token:
+        del self._tokens[ key ]
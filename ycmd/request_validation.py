@@ -40,12 +40,35 @@ def EnsureRequestValid( request_json ):
   raise ServerError( message )
 
 
+# Throws an exception if the versioned buffer |file_data| of |filepath| lacks
+# the fields needed to store it.
+def EnsureBufferDataValid( filepath, file_data ):
+  missing = []
+  if 'contents' not in file_data and 'edits' in file_data:
+    spec = _FileDataSpec( filepath )
+    if 'base_version' not in file_data:
+      missing.append( '{0}["base_version"]'.format( spec ) )
+    for index, edit in enumerate( file_data[ 'edits' ] ):
+      missing.extend(
+        '{0}["edits"][{1}]["{2}"]'.format( spec, index, field )
+        for field in [ 'start_line_num', 'end_line_num', 'contents' ]
+        if field not in edit )
+  if not missing:
+    return True
+  message = '\n'.join( _FieldMissingMessage( field ) for field in missing )
+  raise ServerError( message )
+
+
 def _FieldMissingMessage( field ):
   return 'Request missing required field: {0}'.format( field )
 
 
+def _FileDataSpec( filepath ):
+  return 'file_data["{0}"]'.format( filepath )
+
+
 def _FilepathInFileDataSpec( request_json ):
-  return 'file_data["{0}"]'.format( request_json[ 'filepath' ] )
+  return _FileDataSpec( request_json[ 'filepath' ] )
 
 
 def _SingleFileDataFieldSpec( request_json, field ):
@@ -56,10 +79,11 @@ def _MissingFieldsForFileData( request_json ):
   missing = set()
   data_for_file = request_json[ 'file_data' ].get( request_json[ 'filepath' ] )
   if data_for_file:
-    required_data = [ 'filetypes', 'contents' ]
-    for required in required_data:
-      if required not in data_for_file:
-        missing.add( _SingleFileDataFieldSpec( request_json, required ) )
+    if 'filetypes' not in data_for_file:
+      missing.add( _SingleFileDataFieldSpec( request_json, 'filetypes' ) )
+    # The contents may be omitted if they are stored as a buffer version.
+    if 'contents' not in data_for_file and 'version' not in data_for_file:
+      missing.add( _SingleFileDataFieldSpec( request_json, 'contents' ) )
     filetypes = data_for_file.get( 'filetypes', [] )
     if not filetypes:
       missing.add( '{0}[0]'.format(
@@ -25,26 +25,38 @@ from __future__ import absolute_import
 from builtins import *  # noqa
 
 from future.utils import iteritems
+import hashlib
 
+from ycmd.buffer_index import BufferIndex
 from ycmd.utils import ( ByteOffsetToCodepointOffset,
                          CodepointOffsetToByteOffset,
                          HashableDict,
                          LOGGER,
                          ToUnicode,
-                         ToBytes,
-                         SplitLines )
+                         ToBytes )
 from ycmd.identifier_utils import StartOfLongestIdentifierEndingAtIndex
-from ycmd.request_validation import EnsureRequestValid
+from ycmd.request_cancellation import CancellationToken
+from ycmd.request_validation import EnsureBufferDataValid, EnsureRequestValid
 
 
 # TODO: Change the custom computed (and other) keys to be actual properties on
 # the object.
 class RequestWrap( object ):
-  def __init__( self, request, validate = True ):
+  def __init__( self, request, validate = True, buffer_store = None ):
     if validate:
       EnsureRequestValid( request )
     self._request = request
 
+    # Buffers sent with a version are stored right away so that later requests
+    # can refer to them but their contents are only built when accessed.
+    self._buffers = {}
+    if buffer_store:
+      for filepath, file_data in iteritems( request.get( 'file_data', {} ) ):
+        if 'version' in file_data:
+          EnsureBufferDataValid( filepath, file_data )
+          self._buffers[ filepath ] = buffer_store.Update( filepath,
+                                                           file_data )
+
     # Maps the keys returned by this objects __getitem__ to a # tuple of
     # ( getter_method, setter_method ). Values computed by getter_method (or set
     # by setter_method) are cached in _cached_computed.  setter_method may be
@@ -60,10 +72,7 @@ class RequestWrap( object ):
                            self._SetCompletionStartCodepoint ),
 
       # The 'column_num' as a unicode codepoint offset
-      'column_codepoint': ( lambda: ByteOffsetToCodepointOffset(
-                              self[ 'line_bytes' ],
-                              self[ 'column_num' ] ),
-                            None ),
+      'column_codepoint': ( self._GetColumnCodepoint, None ),
 
       # Bytes string representation of the current line
       'line_bytes': ( lambda: ToBytes( self[ 'line_value' ] ),
@@ -93,7 +102,27 @@ class RequestWrap( object ):
 
       'lines': ( self._CurrentLines, None ),
 
-      'extra_conf_data': ( self._GetExtraConfData, None )
+      # Maps the absolute paths of files to their BufferIndex. Filled by
+      # completer_utils.GetBufferIndex so that the contents of a file are only
+      # split and converted once per request.
+      'buffer_indexes': ( dict, None ),
+
+      # The CancellationToken of the request. Set by the server for requests
+      # that can be superseded by a newer one; never cancelled otherwise.
+      'cancellation_token': ( CancellationToken,
+                              self._SetCancellationToken ),
+
+      'extra_conf_data': ( self._GetExtraConfData, None ),
+
+      # SHA-1 digest of the paths, filetypes, and contents of the files in
+      # 'file_data', excluding the current line of the current file. Two
+      # requests are only compared through their digests so that the contents
+      # are read once per request.
+      'file_digest': ( self._FileDigest, None ),
+
+      # The 'file_data' from the request where the contents of the buffers sent
+      # as versions or edits are resolved from the buffer store.
+      'file_data': ( self._FileData, None )
     }
     self._cached_computed = {}
 
@@ -124,33 +153,14 @@ class RequestWrap( object ):
 
 
   def __eq__( self, other ):
-    if ( self[ 'filepath' ]         != other[ 'filepath' ] or
-         self[ 'filetypes' ]        != other[ 'filetypes' ] or
-         self[ 'line_num' ]         != other[ 'line_num' ] or
-         self[ 'start_column' ]     != other[ 'start_column' ] or
-         self[ 'prefix' ]           != other[ 'prefix' ] or
-         self[ 'force_semantic' ]   != other[ 'force_semantic' ] or
-         self[ 'extra_conf_data' ]  != other[ 'extra_conf_data' ] or
-         len( self[ 'file_data' ] ) != len( other[ 'file_data' ] ) ):
-      return False
-
-    for filename, file_data in iteritems( self[ 'file_data' ] ):
-      if filename == self[ 'filepath' ]:
-        lines = self[ 'lines' ]
-        other_lines = other[ 'lines' ]
-        if len( lines ) != len( other_lines ):
-          return False
-
-        line_num = self[ 'line_num' ]
-        if ( lines[ : line_num - 1 ] != other_lines[ : line_num - 1 ] or
-             lines[ line_num : ] != other_lines[ line_num : ] ):
-          return False
-
-      elif ( filename not in other[ 'file_data' ] or
-             file_data != other[ 'file_data' ][ filename ] ):
-        return False
-
-    return True
+    return ( self[ 'filepath' ]          == other[ 'filepath' ] and
+             self[ 'filetypes' ]         == other[ 'filetypes' ] and
+             self[ 'line_num' ]          == other[ 'line_num' ] and
+             self[ 'start_column' ]      == other[ 'start_column' ] and
+             self[ 'prefix' ]            == other[ 'prefix' ] and
+             self[ 'force_semantic' ]    == other[ 'force_semantic' ] and
+             self[ 'extra_conf_data' ]   == other[ 'extra_conf_data' ] and
+             self[ 'file_digest' ]       == other[ 'file_digest' ] )
 
 
   def get( self, key, default = None ):
@@ -160,10 +170,67 @@ class RequestWrap( object ):
       return default
 
 
-  def _CurrentLines( self ):
+  def _FileData( self ):
+    file_data = self._request[ 'file_data' ]
+    if not self._buffers:
+      return file_data
+
+    file_data = dict( file_data )
+    for filepath, buf in iteritems( self._buffers ):
+      data = dict( file_data[ filepath ] )
+      data.pop( 'base_version', None )
+      data.pop( 'edits', None )
+      data[ 'contents' ] = buf.Contents()
+      file_data[ filepath ] = data
+    return file_data
+
+
+  def _FileDigest( self ):
+    digest = hashlib.sha1()
+    current_file = self[ 'filepath' ]
+    file_data = self[ 'file_data' ]
+    for filepath in sorted( file_data ):
+      _UpdateDigest( digest, filepath )
+      # Only the current file is required to have filetypes and contents.
+      _UpdateDigest( digest,
+                     '\n'.join( file_data[ filepath ].get( 'filetypes', [] ) ) )
+      if filepath == current_file:
+        lines = self[ 'lines' ]
+        line_num = self[ 'line_num' ]
+        # Lines contain no newline characters so joining them is unambiguous.
+        _UpdateDigest( digest, '\n'.join( lines[ : line_num - 1 ] ) )
+        _UpdateDigest( digest, '\n'.join( lines[ line_num : ] ) )
+        _UpdateDigest( digest, str( len( lines ) ) )
+      else:
+        _UpdateDigest( digest, file_data[ filepath ].get( 'contents', '' ) )
+    return digest.digest()
+
+
+  def _CurrentBufferIndex( self ):
     current_file = self[ 'filepath' ]
-    contents = self[ 'file_data' ][ current_file ][ 'contents' ]
-    return SplitLines( contents )
+    buffer_indexes = self[ 'buffer_indexes' ]
+    try:
+      return buffer_indexes[ current_file ]
+    except KeyError:
+      buffer_index = BufferIndex(
+        self[ 'file_data' ][ current_file ][ 'contents' ] )
+      buffer_indexes[ current_file ] = buffer_index
+      return buffer_index
+
+
+  def _CurrentLines( self ):
+    return self._CurrentBufferIndex().Lines()
+
+
+  def _GetColumnCodepoint( self ):
+    try:
+      return self._CurrentBufferIndex().ByteOffsetToCodepointOffset(
+        self[ 'line_num' ],
+        self[ 'column_num' ] )
+    except IndexError:
+      # The line is not in the file; it is assumed empty (see _CurrentLine).
+      return ByteOffsetToCodepointOffset( self[ 'line_bytes' ],
+                                          self[ 'column_num' ] )
 
 
   def _CurrentLine( self ):
@@ -202,6 +269,10 @@ class RequestWrap( object ):
     self._cached_computed.pop( 'query', None )
 
 
+  def _SetCancellationToken( self, cancellation_token ):
+    self._cached_computed[ 'cancellation_token' ] = cancellation_token
+
+
   def _GetCompletionStartCodepoint( self ):
     return CompletionStartCodepoint( self[ 'line_value' ],
                                      self[ 'column_num' ],
@@ -291,3 +362,10 @@ def CompletionStartCodepoint( line_value, column_num, filetype ):
       unicode_line_value, codepoint_column_num - 1, filetype ) + 1
 
   return codepoint_start_column
+
+
+def _UpdateDigest( digest, value ):
+  """Feeds |value| to |digest| prefixed by its length so that consecutive
+  values cannot be confused."""
+  value = ToBytes( value )
+  digest.update( ToBytes( str( len( value ) ) ) + b':' + value )
@@ -38,6 +38,9 @@ NO_EXTRA_CONF_FILENAME_MESSAGE = ( 'No {0} file detected, so no compile flags '
 NO_DIAGNOSTIC_SUPPORT_MESSAGE = ( 'YCM has no diagnostics support for this '
   'filetype; refer to Syntastic docs if using Syntastic.' )
 
+UNKNOWN_BUFFER_VERSION_MESSAGE = ( 'Version {0} of buffer {1} is unknown; '
+  'send its entire contents.' )
+
 
 class ServerError( Exception ):
   def __init__( self, message ):
@@ -62,6 +65,14 @@ class NoDiagnosticSupport( ServerError ):
     super( NoDiagnosticSupport, self ).__init__( NO_DIAGNOSTIC_SUPPORT_MESSAGE )
 
 
+class UnknownBufferVersion( ServerError ):
+  def __init__( self, filepath, version ):
+    super( UnknownBufferVersion, self ).__init__(
+      UNKNOWN_BUFFER_VERSION_MESSAGE.format( version, filepath ) )
+    self.filepath = filepath
+    self.version = version
+
+
 # column_num is a byte offset
 def BuildGoToResponse( filepath, line_num, column_num, description = None ):
   return BuildGoToResponseFromLocation(
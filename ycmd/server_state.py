@@ -24,9 +24,11 @@ from builtins import *  # noqa
 
 import threading
 from future.utils import itervalues
-from importlib import import_module
+from ycmd import import_profiler
+from ycmd.buffer_store import BufferStore
 from ycmd.completers.general.general_completer_store import (
     GeneralCompleterStore )
+from ycmd.request_cancellation import RequestGenerations
 from ycmd.utils import LOGGER
 
 
@@ -36,6 +38,8 @@ class ServerState( object ):
     self._filetype_completers = {}
     self._filetype_completers_lock = threading.Lock()
     self._gencomp = GeneralCompleterStore( self._user_options )
+    self._buffer_store = BufferStore()
+    self._completion_requests = RequestGenerations()
 
 
   @property
@@ -59,11 +63,22 @@ class ServerState( object ):
       except KeyError:
         pass
 
+    # The completer module is imported without holding the lock so that
+    # requests for other filetypes are not blocked by a slow import.
+    try:
+      module = import_profiler.ImportModule(
+        'ycmd.completers.{}.hook'.format( filetype ) )
+    except ImportError:
+      module = None
+
+    with self._filetype_completers_lock:
+      # The completer may have been created by another thread in the meantime.
       try:
-        module = import_module( 'ycmd.completers.{}.hook'.format( filetype ) )
-        completer = module.GetCompleter( self._user_options )
-      except ImportError:
-        completer = None
+        return self._filetype_completers[ filetype ]
+      except KeyError:
+        pass
+
+      completer = module.GetCompleter( self._user_options ) if module else None
 
       supported_filetypes = { filetype }
       if completer:
@@ -75,6 +90,16 @@ class ServerState( object ):
       return completer
 
 
+  def PrewarmFiletypeCompleters( self, filetypes ):
+    """Imports and creates the completers of |filetypes| so that the first
+    request for one of these filetypes does not wait for it."""
+    for filetype in filetypes:
+      try:
+        self._GetFiletypeCompleterForFiletype( filetype )
+      except Exception:
+        LOGGER.exception( 'Error while loading completer for %s', filetype )
+
+
   def GetFiletypeCompleter( self, current_filetypes ):
     completers = [ self._GetFiletypeCompleterForFiletype( filetype )
                    for filetype in current_filetypes ]
@@ -128,6 +153,14 @@ class ServerState( object ):
     return self._gencomp
 
 
+  def GetBufferStore( self ):
+    return self._buffer_store
+
+
+  def GetCompletionRequests( self ):
+    return self._completion_requests
+
+
   def CurrentFiletypeCompletionEnabled( self, current_filetypes ):
     filetype_to_disable = self._user_options[
         'filetype_specific_completion_to_disable' ]
@@ -0,0 +1,112 @@
+# coding: utf-8
+#
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import assert_that, calling, contains, equal_to, raises
+
+from ycmd.buffer_index import BufferIndex
+from ycmd.completers.language_server.language_server_protocol import (
+  CodepointsToUTF16CodeUnits, UTF16CodeUnitsToCodepoints )
+from ycmd.utils import ( ByteOffsetToCodepointOffset,
+                         CodepointOffsetToByteOffset,
+                         ToBytes )
+
+
+CONTENTS = 'ascii\n†eß† ƒøø\n\nfoo 𐐷 bar\r\n'
+
+
+def BufferIndex_Lines_test():
+  buffer_index = BufferIndex( CONTENTS )
+  assert_that( buffer_index.Lines(),
+               contains( 'ascii', '†eß† ƒøø', '', 'foo 𐐷 bar\r', '' ) )
+  assert_that( buffer_index.Line( 2 ), equal_to( '†eß† ƒøø' ) )
+  assert_that( calling( buffer_index.Line ).with_args( 0 ),
+               raises( IndexError ) )
+  assert_that( calling( buffer_index.Line ).with_args( 6 ),
+               raises( IndexError ) )
+  assert_that(
+    calling( buffer_index.ByteOffsetToCodepointOffset ).with_args( 6, 1 ),
+    raises( IndexError ) )
+
+
+def BufferIndex_ByteOffsetToCodepointOffset_test():
+  buffer_index = BufferIndex( CONTENTS )
+  for line_num, line in enumerate( buffer_index.Lines(), 1 ):
+    # Offsets inside a multi-byte character cannot be decoded.
+    num_bytes = len( ToBytes( line ) )
+    byte_offsets = [ len( ToBytes( line[ : i ] ) ) + 1
+                     for i in range( len( line ) ) ]
+    for byte_offset in byte_offsets + [ num_bytes + 1, num_bytes + 2 ]:
+      yield ( _ConversionMatches,
+              buffer_index.ByteOffsetToCodepointOffset,
+              ByteOffsetToCodepointOffset,
+              line_num,
+              line,
+              byte_offset )
+
+
+def BufferIndex_CodepointOffsetToByteOffset_test():
+  buffer_index = BufferIndex( CONTENTS )
+  for line_num, line in enumerate( buffer_index.Lines(), 1 ):
+    for codepoint_offset in range( -1, len( line ) + 3 ):
+      yield ( _ConversionMatches,
+              buffer_index.CodepointOffsetToByteOffset,
+              CodepointOffsetToByteOffset,
+              line_num,
+              line,
+              codepoint_offset )
+
+
+def BufferIndex_CodepointsToUTF16CodeUnits_test():
+  buffer_index = BufferIndex( CONTENTS )
+  for line_num, line in enumerate( buffer_index.Lines(), 1 ):
+    for codepoint_offset in range( 0, len( line ) + 3 ):
+      yield ( _ConversionMatches,
+              buffer_index.CodepointsToUTF16CodeUnits,
+              CodepointsToUTF16CodeUnits,
+              line_num,
+              line,
+              codepoint_offset )
+
+
+def BufferIndex_UTF16CodeUnitsToCodepoints_test():
+  buffer_index = BufferIndex( CONTENTS )
+  for line_num, line in enumerate( buffer_index.Lines(), 1 ):
+    num_code_units = len( line.encode( 'utf-16-le' ) ) // 2
+    for code_unit_offset in range( 0, num_code_units + 3 ):
+      # Offsets inside a surrogate pair cannot be decoded.
+      if line_num == 4 and code_unit_offset == 5:
+        continue
+      yield ( _ConversionMatches,
+              buffer_index.UTF16CodeUnitsToCodepoints,
+              UTF16CodeUnitsToCodepoints,
+              line_num,
+              line,
+              code_unit_offset )
+
+
+def _ConversionMatches( index_conversion, conversion, line_num, line, offset ):
+  assert_that( index_conversion( line_num, offset ),
+               equal_to( conversion( line, offset ) ) )
@@ -0,0 +1,153 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import assert_that, calling, equal_to, raises
+
+from ycmd.buffer_store import BufferStore, MAX_VERSIONS_PER_BUFFER
+from ycmd.responses import ServerError, UnknownBufferVersion
+
+
+def Edit( start_line_num, end_line_num, contents ):
+  return {
+    'start_line_num': start_line_num,
+    'end_line_num': end_line_num,
+    'contents': contents
+  }
+
+
+def BufferStore_Contents_test():
+  store = BufferStore()
+  buf = store.Update( '/foo', { 'version': 1, 'contents': 'foo\nbar' } )
+  assert_that( buf.Contents(), equal_to( 'foo\nbar' ) )
+
+
+def BufferStore_Unchanged_test():
+  store = BufferStore()
+  store.Update( '/foo', { 'version': 1, 'contents': 'foo\nbar' } )
+  buf = store.Update( '/foo', { 'version': 1 } )
+  assert_that( buf.Contents(), equal_to( 'foo\nbar' ) )
+
+
+def BufferStore_Edits_test():
+  for edits, contents in [
+    # Replace a line.
+    ( [ Edit( 2, 3, 'qux\n' ) ], 'foo\nqux\nbaz\n' ),
+    # Insert lines.
+    ( [ Edit( 1, 1, 'qux\nzoo\n' ) ], 'qux\nzoo\nfoo\nbar\nbaz\n' ),
+    # Append a line.
+    ( [ Edit( 4, 4, 'qux\n' ) ], 'foo\nbar\nbaz\nqux\n' ),
+    # Delete lines.
+    ( [ Edit( 1, 3, '' ) ], 'baz\n' ),
+    # Windows line endings.
+    ( [ Edit( 3, 4, 'qux\r\n' ) ], 'foo\nbar\nqux\r\n' ),
+    # Edits are applied in order.
+    ( [ Edit( 1, 2, '' ), Edit( 1, 2, 'qux\n' ) ], 'qux\nbaz\n' )
+  ]:
+    yield _Edits_test, edits, contents
+
+
+def _Edits_test( edits, contents ):
+  store = BufferStore()
+  store.Update( '/foo', { 'version': 1, 'contents': 'foo\nbar\nbaz\n' } )
+  buf = store.Update( '/foo', { 'version': 2,
+                                'base_version': 1,
+                                'edits': edits } )
+  assert_that( buf.Contents(), equal_to( contents ) )
+  assert_that( store.Update( '/foo', { 'version': 2 } ).Contents(),
+               equal_to( contents ) )
+  assert_that( store.Update( '/foo', { 'version': 1 } ).Contents(),
+               equal_to( 'foo\nbar\nbaz\n' ) )
+
+
+def BufferStore_EditsNeverMergeLines_test():
+  for contents, edits, new_contents in [
+    # Replaced lines are followed by other lines.
+    ( 'a\nb\nc\n', [ Edit( 2, 3, 'x' ) ], 'a\nx\nc\n' ),
+    # Inserted lines are followed by other lines.
+    ( 'a\nb\n', [ Edit( 1, 1, 'x' ) ], 'x\na\nb\n' ),
+    # Lines are inserted after an unterminated last line.
+    ( 'a\nb', [ Edit( 3, 3, 'x\n' ) ], 'a\nb\nx\n' ),
+    # The last line of the buffer may stay unterminated.
+    ( 'a\nb\n', [ Edit( 2, 3, 'x' ) ], 'a\nx' ),
+    # An empty edit after an unterminated last line leaves it unchanged.
+    ( 'a\nb', [ Edit( 3, 3, '' ) ], 'a\nb' )
+  ]:
+    yield _EditsNeverMergeLines_test, contents, edits, new_contents
+
+
+def _EditsNeverMergeLines_test( contents, edits, new_contents ):
+  store = BufferStore()
+  store.Update( '/foo', { 'version': 1, 'contents': contents } )
+  buf = store.Update( '/foo', { 'version': 2,
+                                'base_version': 1,
+                                'edits': edits } )
+  assert_that( buf.Contents(), equal_to( new_contents ) )
+
+
+def BufferStore_InvalidEdit_test():
+  store = BufferStore()
+  store.Update( '/foo', { 'version': 1, 'contents': 'foo\n' } )
+  for edit in [ Edit( 0, 1, '' ), Edit( 2, 1, '' ), Edit( 1, 3, '' ) ]:
+    assert_that(
+      calling( store.Update ).with_args( '/foo', { 'version': 2,
+                                                   'base_version': 1,
+                                                   'edits': [ edit ] } ),
+      raises( ServerError, 'Invalid line range' ) )
+
+
+def BufferStore_UnknownVersion_test():
+  store = BufferStore()
+  assert_that(
+    calling( store.Update ).with_args( '/foo', { 'version': 1 } ),
+    raises( UnknownBufferVersion, 'Version 1 of buffer /foo is unknown' ) )
+
+  store.Update( '/foo', { 'version': 1, 'contents': 'foo\n' } )
+  assert_that(
+    calling( store.Update ).with_args( '/foo', { 'version': 3,
+                                                 'base_version': 2,
+                                                 'edits': [] } ),
+    raises( UnknownBufferVersion, 'Version 2 of buffer /foo is unknown' ) )
+  assert_that(
+    calling( store.Update ).with_args( '/bar', { 'version': 1 } ),
+    raises( UnknownBufferVersion, 'Version 1 of buffer /bar is unknown' ) )
+
+
+def BufferStore_OldVersionsDropped_test():
+  store = BufferStore()
+  for version in range( MAX_VERSIONS_PER_BUFFER + 1 ):
+    store.Update( '/foo', { 'version': version, 'contents': 'foo\n' } )
+
+  assert_that(
+    calling( store.Update ).with_args( '/foo', { 'version': 0 } ),
+    raises( UnknownBufferVersion ) )
+  store.Update( '/foo', { 'version': 1 } )
+
+
+def BufferStore_Remove_test():
+  store = BufferStore()
+  store.Update( '/foo', { 'version': 1, 'contents': 'foo\n' } )
+  store.Remove( '/foo' )
+  assert_that(
+    calling( store.Update ).with_args( '/foo', { 'version': 1 } ),
+    raises( UnknownBufferVersion ) )
@@ -0,0 +1,186 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import ( assert_that, contains, contains_inanyorder, empty,
+                       equal_to )
+from mock import ANY, patch
+import os
+import threading
+
+from ycmd import handlers
+from ycmd.completers.cpp.background_parser import BackgroundParser
+from ycmd.completers.cpp.clang_completer import _CounterpartFilepaths
+from ycmd.responses import NoExtraConfDetected
+from ycmd.tests.clang import SharedYcmd
+from ycmd.tests.test_utils import BuildRequest, TemporaryTestDir
+
+TIMEOUT = 10
+
+
+class Recorder( object ):
+  """Parse function recording the parsed files. Parsing the file 'blocking'
+  waits until the |unblock| event is set. The |done| event is set once
+  |num_files| files are parsed."""
+  def __init__( self, num_files = 1 ):
+    self.num_files = num_files
+    self.parsed_files = []
+    self.started = threading.Event()
+    self.unblock = threading.Event()
+    self.done = threading.Event()
+
+
+  def __call__( self, filepath, *args ):
+    if filepath == 'blocking':
+      self.started.set()
+      self.unblock.wait( TIMEOUT )
+    self.parsed_files.append( ( filepath, ) + args )
+    if len( self.parsed_files ) == self.num_files:
+      self.done.set()
+
+
+def BackgroundParser_NoWorkers_test():
+  recorder = Recorder()
+  parser = BackgroundParser( recorder, 0 )
+  parser.Enqueue( 'foo.cpp', 0 )
+  assert_that( parser.PendingJobs(), empty() )
+
+
+def BackgroundParser_NumWorkersCappedToNumCores_test():
+  with patch( 'multiprocessing.cpu_count', return_value = 2 ):
+    assert_that( BackgroundParser( Recorder(), 8 ).NumWorkers(),
+                 equal_to( 2 ) )
+
+
+def BackgroundParser_JobsOrderedByPriority_test():
+  recorder = Recorder( 4 )
+  parser = BackgroundParser( recorder, 1 )
+  parser.Enqueue( 'blocking', 0 )
+  assert recorder.started.wait( TIMEOUT )
+
+  parser.Enqueue( 'low.h', 1, 'low' )
+  parser.Enqueue( 'first.cpp', 0, 'first' )
+  parser.Enqueue( 'second.cpp', 0, 'second' )
+  # Enqueuing a pending file updates its arguments and keeps its priority.
+  parser.Enqueue( 'second.cpp', 1, 'updated' )
+  assert_that( parser.PendingJobs(),
+               contains( 'first.cpp', 'second.cpp', 'low.h' ) )
+
+  recorder.unblock.set()
+  assert recorder.done.wait( TIMEOUT )
+  assert_that( recorder.parsed_files,
+               contains( ( 'blocking', ),
+                         ( 'first.cpp', 'first' ),
+                         ( 'second.cpp', 'updated' ),
+                         ( 'low.h', 'low' ) ) )
+
+
+def BackgroundParser_CancelOrWait_PendingJob_test():
+  recorder = Recorder()
+  parser = BackgroundParser( recorder, 1 )
+  parser.Enqueue( 'blocking', 0 )
+  assert recorder.started.wait( TIMEOUT )
+
+  parser.Enqueue( 'foo.cpp', 0 )
+  parser.CancelOrWait( 'foo.cpp' )
+  assert_that( parser.PendingJobs(), empty() )
+
+  recorder.unblock.set()
+  parser.CancelOrWait( 'blocking' )
+  assert_that( recorder.parsed_files, contains( ( 'blocking', ) ) )
+
+
+def BackgroundParser_CancelOrWait_RunningJob_test():
+  recorder = Recorder()
+  parser = BackgroundParser( recorder, 1 )
+  parser.Enqueue( 'blocking', 0 )
+  assert recorder.started.wait( TIMEOUT )
+
+  threading.Timer( 0.1, recorder.unblock.set ).start()
+  parser.CancelOrWait( 'blocking' )
+  assert_that( recorder.parsed_files, contains( ( 'blocking', ) ) )
+
+
+@patch( 'ycmd.completers.cpp.background_parser.LOGGER' )
+def BackgroundParser_ParseError_test( logger ):
+  done = threading.Event()
+
+  def Parse( filepath ):
+    if filepath == 'error.cpp':
+      raise RuntimeError( 'Failed to parse the translation unit.' )
+    done.set()
+
+  parser = BackgroundParser( Parse, 1 )
+  parser.Enqueue( 'error.cpp', 0 )
+  parser.Enqueue( 'foo.cpp', 0 )
+  # The worker keeps parsing files after an error.
+  assert done.wait( TIMEOUT )
+  logger.exception.assert_called_with(
+    'Error while parsing %s in the background', 'error.cpp' )
+
+
+def CounterpartFilepaths_test():
+  with TemporaryTestDir() as tmp_dir:
+    for filename in [ 'foo.cpp', 'foo.h', 'foo.hpp', 'bar.c', 'baz.txt' ]:
+      open( os.path.join( tmp_dir, filename ), 'w' ).close()
+
+    assert_that( _CounterpartFilepaths( os.path.join( tmp_dir, 'foo.cpp' ) ),
+                 contains_inanyorder( os.path.join( tmp_dir, 'foo.h' ),
+                                      os.path.join( tmp_dir, 'foo.hpp' ) ) )
+    assert_that( _CounterpartFilepaths( os.path.join( tmp_dir, 'foo.h' ) ),
+                 contains( os.path.join( tmp_dir, 'foo.cpp' ) ) )
+    assert_that( _CounterpartFilepaths( os.path.join( tmp_dir, 'bar.c' ) ),
+                 empty() )
+    assert_that( _CounterpartFilepaths( os.path.join( tmp_dir, 'baz.txt' ) ),
+                 empty() )
+
+
+@SharedYcmd
+def ClangCompleter_BufferVisit_CompilationFlagsSkipCounterparts_test( app ):
+  completer = handlers._server_state.GetFiletypeCompleter( [ 'cpp' ] )
+  with TemporaryTestDir() as tmp_dir:
+    filepath = os.path.join( tmp_dir, 'foo.cpp' )
+    for filename in [ 'foo.cpp', 'foo.h' ]:
+      open( os.path.join( tmp_dir, filename ), 'w' ).close()
+
+    with patch.object( completer._background_parser, 'Enqueue' ) as enqueue:
+      app.post_json( '/event_notification',
+                     BuildRequest( filepath = filepath,
+                                   filetype = 'cpp',
+                                   compilation_flags = [ '-x', 'c++' ],
+                                   event_name = 'BufferVisit' ) )
+
+    enqueue.assert_called_once_with( filepath, 0, ANY )
+
+
+@SharedYcmd
+@patch( 'ycmd.completers.cpp.clang_completer.LOGGER' )
+def ClangCompleter_ParseInBackground_NoExtraConf_test( app, logger ):
+  completer = handlers._server_state.GetFiletypeCompleter( [ 'cpp' ] )
+  with patch.object( completer,
+                     '_FlagsForRequest',
+                     side_effect = NoExtraConfDetected ):
+    completer._ParseInBackground( 'foo.cpp', {} )
+
+  logger.debug.assert_called_once_with(
+    'Not parsing %s in the background: %s', 'foo.cpp', ANY )
@@ -54,6 +54,11 @@ def DebugInfo_FlagsWhenExtraConfLoadedAndNoCompilationDatabase_test( app ):
         has_entries( {
           'key': 'translation unit',
           'value': PathToTestFile( 'basic.cpp' )
+        } ),
+        has_entries( {
+          'key': 'translation units',
+          'value': matches_regexp(
+            '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
         } )
       )
     } ) )
@@ -81,6 +86,11 @@ def DebugInfo_FlagsWhenNoExtraConfAndNoCompilationDatabase_test( app ):
         has_entries( {
           'key': 'translation unit',
           'value': instance_of( str )
+        } ),
+        has_entries( {
+          'key': 'translation units',
+          'value': matches_regexp(
+            '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
         } )
       )
     } ) )
@@ -103,6 +113,11 @@ def DebugInfo_FlagsWhenNoExtraConfAndNoCompilationDatabase_test( app ):
         has_entries( {
           'key': 'translation unit',
           'value': instance_of( str )
+        } ),
+        has_entries( {
+          'key': 'translation units',
+          'value': matches_regexp(
+            '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
         } )
       )
     } ) )
@@ -132,6 +147,11 @@ def DebugInfo_FlagsWhenExtraConfNotLoadedAndNoCompilationDatabase_test(
         has_entries( {
           'key': 'translation unit',
           'value': PathToTestFile( 'basic.cpp' )
+        } ),
+        has_entries( {
+          'key': 'translation units',
+          'value': matches_regexp(
+            '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
         } )
       )
     } ) )
@@ -172,6 +192,11 @@ def DebugInfo_FlagsWhenNoExtraConfAndCompilationDatabaseLoaded_test( app ):
             has_entries( {
               'key': 'translation unit',
               'value': os.path.join( tmp_dir, 'test.cc' ),
+            } ),
+            has_entries( {
+              'key': 'translation units',
+              'value': matches_regexp(
+                '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
             } )
           )
         } ) )
@@ -204,6 +229,11 @@ def DebugInfo_FlagsWhenNoExtraConfAndInvalidCompilationDatabase_test( app ):
             has_entries( {
               'key': 'translation unit',
               'value': os.path.join( tmp_dir, 'test.cc' )
+            } ),
+            has_entries( {
+              'key': 'translation units',
+              'value': matches_regexp(
+                '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
             } )
           )
         } ) )
@@ -245,6 +275,11 @@ def DebugInfo_FlagsWhenGlobalExtraConfAndCompilationDatabaseLoaded_test( app ):
             has_entries( {
               'key': 'translation unit',
               'value': os.path.join( tmp_dir, 'test.cc' ),
+            } ),
+            has_entries( {
+              'key': 'translation units',
+              'value': matches_regexp(
+                '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
             } )
           )
         } ) )
@@ -273,6 +308,11 @@ def DebugInfo_FlagsWhenGlobalExtraConfAndNoCompilationDatabase_test( app ):
         has_entries( {
           'key': 'translation unit',
           'value': PathToTestFile( 'basic.cpp' )
+        } ),
+        has_entries( {
+          'key': 'translation units',
+          'value': matches_regexp(
+            '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
         } )
       )
     } ) )
@@ -305,6 +345,11 @@ def DebugInfo_Unity_test( app ):
           has_entries( {
             'key': 'translation unit',
             'value': PathToTestFile( 'unity.cc' )
+          } ),
+          has_entries( {
+            'key': 'translation units',
+            'value': matches_regexp(
+              '^\\d+ \\(.* MB\\), \\d+ evicted; maximum: 20 units, 4096 MB$' )
           } )
         )
       } ) )
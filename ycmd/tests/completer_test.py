@@ -78,6 +78,36 @@ def FilterAndSortCandidates_Unicode_test():
                                   [ { 'insertion_text': 'ø' } ] )
 
 
+def FilterAndSortCandidates_CachedCompletions_test():
+  completer = DummyCompleter( DefaultOptions() )
+  completions = [ { 'insertion_text': 'foobar' },
+                  { 'insertion_text': 'fooqux' } ]
+  completer._completions_cache.Update( { 'query': 'f' }, completions )
+
+  candidate_list = completer._completions_cache.GetCandidateList( completions )
+  assert candidate_list is not None
+  eq_( None, completer._completions_cache.GetCandidateList( [] ) )
+
+  eq_( completions, completer.FilterAndSortCandidates( completions, 'fo' ) )
+  eq_( [ { 'insertion_text': 'fooqux' } ],
+       completer.FilterAndSortCandidates( completions, 'foq' ) )
+
+  completer._completions_cache.Invalidate()
+  eq_( None, completer._completions_cache.GetCandidateList( completions ) )
+
+
+@patch( 'ycmd.completers.completer_utils.CandidateListWrap' )
+def CompletionsCache_CandidateListBuiltLazily_test( candidate_list_wrap ):
+  completer = DummyCompleter( DefaultOptions() )
+  completions = [ { 'insertion_text': 'foobar' } ]
+  completer._completions_cache.Update( { 'query': 'f' }, completions )
+  eq_( 0, candidate_list_wrap.call_count )
+
+  completer._completions_cache.GetCandidateList( completions )
+  completer._completions_cache.GetCandidateList( completions )
+  eq_( 1, candidate_list_wrap.call_count )
+
+
 @patch( 'ycmd.tests.test_utils.DummyCompleter.GetSubcommandsMap',
         return_value = { 'Foo': '', 'StopServer': '' } )
 def DefinedSubcommands_RemoveStopServerSubcommand_test( subcommands_map ):
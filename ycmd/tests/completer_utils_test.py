@@ -29,6 +29,8 @@ from future.utils import iteritems
 from nose.tools import eq_, ok_
 
 from ycmd.completers import completer_utils as cu
+from ycmd.request_wrap import RequestWrap
+from ycmd.tests.test_utils import BuildRequest
 from ycmd.utils import re
 
 
@@ -227,3 +229,19 @@ def PreparedTriggers_ObjectiveC_test():
       'objc' ) )
 
   ok_( not triggers.MatchesForFiletype( '// foo ', 8, 8, 'objc' ) )
+
+
+def GetFileLines_SplitOncePerRequest_test():
+  request_data = BuildRequest( contents = 'foo\nbar' )
+  request_data[ 'file_data' ][ '/bar' ] = { 'contents': 'bar\nfoo',
+                                            'filetypes': [ 'foo' ] }
+  request_data = RequestWrap( request_data )
+
+  lines = cu.GetFileLines( request_data, '/foo' )
+  eq_( lines, [ 'foo', 'bar' ] )
+  ok_( lines is request_data[ 'lines' ] )
+  ok_( lines is cu.GetFileLines( request_data, '/foo' ) )
+
+  lines = cu.GetFileLines( request_data, '/bar' )
+  eq_( lines, [ 'bar', 'foo' ] )
+  ok_( lines is cu.GetFileLines( request_data, '/bar' ) )
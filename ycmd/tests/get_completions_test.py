@@ -33,9 +33,13 @@ from hamcrest import ( assert_that,
                        has_items )
 from mock import patch
 from nose.tools import eq_
+import requests
 
+from ycmd import handlers
+from ycmd.responses import ServerError, UnknownBufferVersion
 from ycmd.tests import IsolatedYcmd, SharedYcmd, PathToTestFile
 from ycmd.tests.test_utils import ( BuildRequest, CompletionEntryMatcher,
+                                    ErrorMatcher,
                                     DummyCompleter, PatchCompleter )
 
 
@@ -74,6 +78,80 @@ def GetCompletions_IdentifierCompleter_Works_test( app ):
   )
 
 
+@IsolatedYcmd()
+def GetCompletions_IdentifierCompleter_BufferEdits_test( app ):
+  event_data = BuildRequest( contents = 'foo foogoo ba\n',
+                             event_name = 'FileReadyToParse' )
+  event_data[ 'file_data' ][ '/foo' ][ 'version' ] = 1
+  app.post_json( '/event_notification', event_data )
+
+  # query is 'oo'
+  completion_data = BuildRequest( column_num = 3 )
+  completion_data[ 'file_data' ][ '/foo' ] = {
+    'filetypes': [ 'foo' ],
+    'version': 2,
+    'base_version': 1,
+    'edits': [ { 'start_line_num': 1, 'end_line_num': 1, 'contents': 'oo\n' } ]
+  }
+  response_data = app.post_json( '/completions', completion_data ).json
+
+  eq_( 1, response_data[ 'completion_start_column' ] )
+  assert_that(
+    response_data[ 'completions' ],
+    has_items( CompletionEntryMatcher( 'foo', '[ID]' ),
+               CompletionEntryMatcher( 'foogoo', '[ID]' ) )
+  )
+
+  # The buffer is unchanged since version 2.
+  completion_data[ 'file_data' ][ '/foo' ] = {
+    'filetypes': [ 'foo' ],
+    'version': 2
+  }
+  response_data = app.post_json( '/completions', completion_data ).json
+
+  eq_( 1, response_data[ 'completion_start_column' ] )
+  assert_that(
+    response_data[ 'completions' ],
+    has_items( CompletionEntryMatcher( 'foo', '[ID]' ),
+               CompletionEntryMatcher( 'foogoo', '[ID]' ) )
+  )
+
+
+@IsolatedYcmd()
+def GetCompletions_UnknownBufferVersion_test( app ):
+  completion_data = BuildRequest( column_num = 3 )
+  completion_data[ 'file_data' ][ '/foo' ] = {
+    'filetypes': [ 'foo' ],
+    'version': 2,
+    'base_version': 1,
+    'edits': [ { 'start_line_num': 1, 'end_line_num': 1, 'contents': 'oo\n' } ]
+  }
+  response = app.post_json( '/completions',
+                            completion_data,
+                            expect_errors = True )
+
+  eq_( response.status_code, requests.codes.internal_server_error )
+  assert_that( response.json, ErrorMatcher( UnknownBufferVersion ) )
+
+
+@IsolatedYcmd()
+def GetCompletions_BufferEditsWithoutBaseVersion_test( app ):
+  completion_data = BuildRequest( column_num = 3 )
+  completion_data[ 'file_data' ][ '/foo' ] = {
+    'filetypes': [ 'foo' ],
+    'version': 2,
+    'edits': [ { 'start_line_num': 1, 'end_line_num': 1, 'contents': 'oo\n' } ]
+  }
+  response = app.post_json( '/completions',
+                            completion_data,
+                            expect_errors = True )
+
+  eq_( response.status_code, requests.codes.internal_server_error )
+  assert_that( response.json, ErrorMatcher(
+    ServerError,
+    'Request missing required field: file_data["/foo"]["base_version"]' ) )
+
+
 @IsolatedYcmd( { 'min_num_identifier_candidate_chars': 4 } )
 def GetCompletions_IdentifierCompleter_FilterShortCandidates_test( app ):
   event_data = BuildRequest( contents = 'foo foogoo gooo',
@@ -214,6 +292,27 @@ def GetCompletions_ForceSemantic_Works_test( app, *args ):
                                      CompletionEntryMatcher( 'qux' ) ) )
 
 
+@SharedYcmd
+def GetCompletions_Superseded_test( app ):
+  def CandidatesList():
+    # Simulate a newer completion request for the same buffer.
+    handlers._server_state.GetCompletionRequests().StartRequest( '/foo' )
+    return [ 'foo', 'bar', 'qux' ]
+
+  with PatchCompleter( DummyCompleter, 'dummy_filetype' ):
+    with patch( 'ycmd.tests.test_utils.DummyCompleter.CandidatesList',
+                side_effect = CandidatesList ):
+      completion_data = BuildRequest( filetype = 'dummy_filetype',
+                                      force_semantic = True )
+
+      results = app.post_json( '/completions', completion_data ).json
+      assert_that( results, has_entries( {
+        'completions': empty(),
+        'errors': empty(),
+        'superseded': True
+      } ) )
+
+
 @SharedYcmd
 def GetCompletions_ForceSemantic_NoSemanticCompleter_test( app, *args ):
   event_data = BuildRequest( event_name = 'FileReadyToParse',
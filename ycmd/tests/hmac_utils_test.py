@@ -98,6 +98,24 @@ def CreateRequestHmac_WithPy2Str_test():
     'e58bb8974166eaf20e0224d999894b34' )
 
 
+def CreateStreamingHmac_ArgsNotBytes_test():
+  assert_that( calling( hu.CreateStreamingHmac ).with_args( u'foo' ),
+               raises( TypeError, '.*hmac_secret*' ) )
+
+
+def CreateRequestHmacFromBodyHmac_StreamedBody_test():
+  body_hmac = hu.CreateStreamingHmac( bytes( b'key' ) )
+  body_hmac.update( bytes( b'bo' ) )
+  body_hmac.update( bytes( b'dy' ) )
+  eq_( hexlify( hu.CreateRequestHmacFromBodyHmac(
+    bytes( b'GET' ),
+    bytes( b'/foo' ),
+    bytes( body_hmac.digest() ),
+    bytes( b'key' ) ) ),
+    bytes( b'bfbb6bc7a2b3eca2a78f4e7ec8a7dfa7'
+           b'e58bb8974166eaf20e0224d999894b34' ) )
+
+
 def SecureBytesEqual_Basic_test():
   ok_( hu.SecureBytesEqual( bytes( b'foo' ), bytes( b'foo' ) ) )
   ok_( not hu.SecureBytesEqual( bytes( b'foo' ), bytes( b'fo' ) ) )
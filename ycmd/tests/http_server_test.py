@@ -0,0 +1,406 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from base64 import b64decode, b64encode
+from future.utils import native, PY2
+from hamcrest import ( anything, assert_that, contains, contains_inanyorder,
+                       equal_to, has_entries, has_entry, has_items )
+from io import BytesIO
+from mock import patch
+from tempfile import mkdtemp
+import bottle
+import json
+import os
+import requests
+import shutil
+import socket
+import stat
+import struct
+import threading
+
+from ycmd import handlers
+from ycmd.hmac_utils import CreateHmac, CreateRequestHmac, SecureBytesEqual
+from ycmd.http_server import ( StdioServer,
+                               ThreadedHTTPServer,
+                               ThreadedUnixHTTPServer )
+from ycmd.responses import ServerError
+from ycmd.tests.test_utils import BuildRequest, ErrorMatcher, UnixOnly
+from ycmd.utils import StartThread, ToBytes, ToUnicode
+
+if PY2:
+  from httplib import HTTPConnection, HTTPResponse
+else:
+  from http.client import HTTPConnection, HTTPResponse
+
+HMAC_HEADER = 'x-ycm-hmac'
+HMAC_SECRET_LENGTH = 16
+
+
+def _RequestHeaders( method, path, body, hmac_secret ):
+  return {
+    'content-type': 'application/json',
+    HMAC_HEADER: b64encode( CreateRequestHmac( ToBytes( method ),
+                                               ToBytes( path ),
+                                               body,
+                                               hmac_secret ) )
+  }
+
+
+def _AssertHmacValid( body, hmac, hmac_secret ):
+  assert_that( SecureBytesEqual( CreateHmac( body, hmac_secret ),
+                                 ToBytes( b64decode( hmac ) ) ),
+               equal_to( True ) )
+
+
+class _UnixHTTPConnection( HTTPConnection ):
+
+  def __init__( self, socket_path ):
+    HTTPConnection.__init__( self, native( 'localhost' ) )
+    self._socket_path = socket_path
+
+
+  def connect( self ):
+    self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+    self.sock.connect( native( self._socket_path ) )
+
+
+class _FakeSocket( object ):
+
+  def __init__( self, data ):
+    self._data = data
+
+
+  def makefile( self, *args, **kwargs ):
+    return BytesIO( self._data )
+
+
+class ThreadedHTTPServer_test( object ):
+
+  def setUp( self ):
+    self._hmac_secret = os.urandom( HMAC_SECRET_LENGTH )
+    self._server = ThreadedHTTPServer( handlers.app,
+                                       self._hmac_secret,
+                                       host = '127.0.0.1',
+                                       port = 0 )
+    self._location = 'http://127.0.0.1:{0}'.format(
+      self._server.server_address[ 1 ] )
+    self._session = requests.Session()
+    StartThread( self._server.serve_forever )
+
+
+  def tearDown( self ):
+    self._session.close()
+    self._server.Shutdown()
+
+
+  def _Request( self, method, path, data = None, params = None,
+                headers = None ):
+    body = ToBytes( json.dumps( data ) if data else '' )
+    request_headers = _RequestHeaders( method, path, body, self._hmac_secret )
+    request_headers.update( headers or {} )
+    return self._session.request( method,
+                                  native( ToBytes( self._location + path ) ),
+                                  headers = request_headers,
+                                  data = body,
+                                  params = params )
+
+
+  def _AssertResponseHmacValid( self, response ):
+    _AssertHmacValid( response.content,
+                      response.headers[ HMAC_HEADER ],
+                      self._hmac_secret )
+
+
+  def _CountConnections( self ):
+    """Records the connections accepted by the server."""
+    return patch.object( self._server,
+                         'process_request',
+                         wraps = self._server.process_request )
+
+
+  def Get_test( self ):
+    response = self._Request( 'GET', '/healthy' )
+    assert_that( response.status_code, equal_to( requests.codes.ok ) )
+    assert_that( response.json(), equal_to( True ) )
+    self._AssertResponseHmacValid( response )
+
+
+  def Get_QueryString_test( self ):
+    response = self._Request( 'GET', '/ready', params = { 'subserver': 'foo' } )
+    assert_that( response.status_code,
+                 equal_to( requests.codes.internal_server_error ) )
+    assert_that( response.json(), ErrorMatcher(
+      ValueError, 'No semantic completer exists for filetypes: [\'foo\']' ) )
+    self._AssertResponseHmacValid( response )
+
+
+  def Post_KeepAlive_test( self ):
+    request_data = BuildRequest( contents = 'foo_bar foo_baz\nfoo',
+                                 line_num = 2,
+                                 column_num = 4,
+                                 event_name = 'FileReadyToParse' )
+    with self._CountConnections() as process_request:
+      response = self._Request( 'POST', '/event_notification', request_data )
+      assert_that( response.status_code, equal_to( requests.codes.ok ) )
+      self._AssertResponseHmacValid( response )
+
+      # The second request is sent on the same connection.
+      response = self._Request( 'POST', '/completions', request_data )
+      assert_that( response.status_code, equal_to( requests.codes.ok ) )
+      assert_that( response.json(), has_entries( {
+        'completions': has_items(
+          has_entry( 'insertion_text', 'foo_bar' ),
+          has_entry( 'insertion_text', 'foo_baz' )
+        ),
+        'errors': [],
+      } ) )
+      self._AssertResponseHmacValid( response )
+
+    assert_that( process_request.call_count, equal_to( 1 ) )
+
+
+  @patch.object( bottle.Request, 'MEMFILE_MAX', 10 )
+  def Post_RequestEntityTooLarge_test( self ):
+    request_data = BuildRequest( contents = 'foo_bar foo_baz\nfoo',
+                                 line_num = 2,
+                                 column_num = 4 )
+    with self._CountConnections() as process_request:
+      response = self._Request( 'POST', '/completions', request_data )
+      assert_that( response.status_code,
+                   equal_to( requests.codes.request_entity_too_large ) )
+      self._AssertResponseHmacValid( response )
+
+      # The connection is still usable.
+      response = self._Request( 'GET', '/healthy' )
+      assert_that( response.status_code, equal_to( requests.codes.ok ) )
+
+    assert_that( process_request.call_count, equal_to( 1 ) )
+
+
+  def Post_BadHostHeader_test( self ):
+    request_data = BuildRequest( contents = 'foo_bar foo_baz\nfoo',
+                                 line_num = 2,
+                                 column_num = 4 )
+    with self._CountConnections() as process_request:
+      response = self._Request( 'POST',
+                                '/completions',
+                                request_data,
+                                headers = { 'host': 'example.com' } )
+      assert_that( response.status_code,
+                   equal_to( requests.codes.unauthorized ) )
+      self._AssertResponseHmacValid( response )
+
+      # The connection is still usable.
+      response = self._Request( 'GET', '/healthy' )
+      assert_that( response.status_code, equal_to( requests.codes.ok ) )
+      assert_that( response.json(), equal_to( True ) )
+
+    assert_that( process_request.call_count, equal_to( 1 ) )
+
+
+  def Post_Exception_test( self ):
+    response = self._Request( 'POST', '/completions', { 'foo': 'bar' } )
+    assert_that( response.status_code,
+                 equal_to( requests.codes.internal_server_error ) )
+    assert_that( response.json(), ErrorMatcher( ServerError ) )
+    self._AssertResponseHmacValid( response )
+
+
+  def BadHmac_test( self ):
+    response = self._Request( 'GET',
+                              '/healthy',
+                              headers = { HMAC_HEADER: b64encode( b'foo' ) } )
+    assert_that( response.status_code,
+                 equal_to( requests.codes.unauthorized ) )
+    self._AssertResponseHmacValid( response )
+
+
+  def BadHostHeader_test( self ):
+    response = self._Request( 'GET',
+                              '/healthy',
+                              headers = { 'host': 'example.com' } )
+    assert_that( response.status_code,
+                 equal_to( requests.codes.unauthorized ) )
+    self._AssertResponseHmacValid( response )
+
+
+@UnixOnly
+class ThreadedUnixHTTPServer_test( object ):
+
+  def setUp( self ):
+    self._hmac_secret = os.urandom( HMAC_SECRET_LENGTH )
+    self._socket_dir = mkdtemp()
+    self._socket_path = os.path.join( self._socket_dir, 'ycmd.sock' )
+    self._server = ThreadedUnixHTTPServer( handlers.app,
+                                           self._hmac_secret,
+                                           self._socket_path )
+    StartThread( self._server.serve_forever )
+
+
+  def tearDown( self ):
+    self._server.Shutdown()
+    shutil.rmtree( self._socket_dir )
+
+
+  def _Request( self, connection, method, path, data = None, headers = None ):
+    body = ToBytes( json.dumps( data ) if data else '' )
+    request_headers = _RequestHeaders( method, path, body, self._hmac_secret )
+    request_headers.update( headers or {} )
+    connection.request( native( method ),
+                        native( path ),
+                        body = body,
+                        headers = request_headers )
+    response = connection.getresponse()
+    content = response.read()
+    _AssertHmacValid( content,
+                      response.getheader( HMAC_HEADER ),
+                      self._hmac_secret )
+    return response.status, json.loads( ToUnicode( content ) )
+
+
+  def SocketOnlyAccessibleToUser_test( self ):
+    assert_that( stat.S_IMODE( os.stat( self._socket_path ).st_mode ),
+                 equal_to( stat.S_IRUSR | stat.S_IWUSR ) )
+
+
+  def Requests_test( self ):
+    connection = _UnixHTTPConnection( self._socket_path )
+    try:
+      # The Host header is not checked.
+      assert_that( self._Request( connection, 'GET', '/healthy',
+                                  headers = { 'host': 'example.com' } ),
+                   equal_to( ( requests.codes.ok, True ) ) )
+
+      request_data = BuildRequest( contents = 'foo_bar foo_baz\nfoo',
+                                   line_num = 2,
+                                   column_num = 4 )
+      status, response = self._Request( connection,
+                                        'POST',
+                                        '/completions',
+                                        request_data )
+      assert_that( status, equal_to( requests.codes.ok ) )
+      assert_that( response, has_entry( 'completions', has_items(
+        has_entry( 'insertion_text', 'foo_bar' ),
+        has_entry( 'insertion_text', 'foo_baz' )
+      ) ) )
+
+      status, response = self._Request(
+        connection, 'GET', '/healthy',
+        headers = { HMAC_HEADER: b64encode( b'foo' ) } )
+      assert_that( status, equal_to( requests.codes.unauthorized ) )
+    finally:
+      connection.close()
+
+
+  def SocketRemovedOnShutdown_test( self ):
+    assert_that( os.path.exists( self._socket_path ), equal_to( True ) )
+    self._server.Shutdown()
+    assert_that( os.path.exists( self._socket_path ), equal_to( False ) )
+
+
+def _BuildFrame( method, path, data, hmac_secret, headers = None ):
+  body = ToBytes( json.dumps( data ) if data else '' )
+  request_headers = _RequestHeaders( method, path, body, hmac_secret )
+  request_headers.update( headers or {} )
+  request_headers[ 'content-length' ] = str( len( body ) )
+  message = '{0} {1} HTTP/1.1\r\n'.format( method, path )
+  for name, value in request_headers.items():
+    message += '{0}: {1}\r\n'.format( name, ToUnicode( value ) )
+  message = ToBytes( message + '\r\n' ) + body
+  return ToBytes( struct.pack( native( '>I' ), len( message ) ) ) + message
+
+
+def _ParseFrames( output, hmac_secret ):
+  responses = []
+  output = BytesIO( output )
+  while True:
+    header = output.read( 4 )
+    if not header:
+      return responses
+    message = output.read( struct.unpack( native( '>I' ), header )[ 0 ] )
+    response = HTTPResponse( _FakeSocket( message ) )
+    response.begin()
+    content = response.read()
+    _AssertHmacValid( content, response.getheader( HMAC_HEADER ), hmac_secret )
+    responses.append( ( response.getheader( 'x-ycm-request-id' ),
+                        response.status,
+                        json.loads( ToUnicode( content ) ) ) )
+
+
+def _RequestId( request_id ):
+  return { 'x-ycm-request-id': request_id }
+
+
+def StdioServer_Requests_test():
+  hmac_secret = os.urandom( HMAC_SECRET_LENGTH )
+  request_data = BuildRequest( contents = 'foo_bar foo_baz\nfoo',
+                               line_num = 2,
+                               column_num = 4 )
+  input_stream = BytesIO(
+    _BuildFrame( 'GET', '/healthy', None, hmac_secret, _RequestId( '1' ) ) +
+    _BuildFrame( 'POST', '/completions', request_data, hmac_secret,
+                 _RequestId( '2' ) ) +
+    _BuildFrame( 'GET', '/ready', None, os.urandom( HMAC_SECRET_LENGTH ),
+                 _RequestId( '3' ) ) )
+  output_stream = BytesIO()
+
+  StdioServer( handlers.app,
+               hmac_secret,
+               input_stream,
+               output_stream ).Run()
+
+  assert_that( _ParseFrames( output_stream.getvalue(), hmac_secret ),
+               contains_inanyorder(
+                 contains( '1', requests.codes.ok, True ),
+                 contains( '2', requests.codes.ok, has_entry( 'completions',
+                   has_items( has_entry( 'insertion_text', 'foo_bar' ),
+                              has_entry( 'insertion_text', 'foo_baz' ) ) ) ),
+                 contains( '3', requests.codes.unauthorized, anything() )
+               ) )
+
+
+def StdioServer_SlowRequestDoesNotBlockOthers_test():
+  app = bottle.Bottle()
+  fast_request_handled = threading.Event()
+
+  @app.get( '/slow' )
+  def Slow():
+    return json.dumps( fast_request_handled.wait( 10 ) )
+
+  @app.get( '/fast' )
+  def Fast():
+    fast_request_handled.set()
+    return json.dumps( True )
+
+  hmac_secret = os.urandom( HMAC_SECRET_LENGTH )
+  input_stream = BytesIO(
+    _BuildFrame( 'GET', '/slow', None, hmac_secret, _RequestId( 'slow' ) ) +
+    _BuildFrame( 'GET', '/fast', None, hmac_secret, _RequestId( 'fast' ) ) )
+  output_stream = BytesIO()
+
+  StdioServer( app, hmac_secret, input_stream, output_stream ).Run()
+
+  assert_that( _ParseFrames( output_stream.getvalue(), hmac_secret ),
+               contains( contains( 'fast', requests.codes.ok, True ),
+                         contains( 'slow', requests.codes.ok, True ) ) )
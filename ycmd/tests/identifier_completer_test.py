@@ -29,7 +29,7 @@ from ycmd.completers.all import identifier_completer as ic
 from ycmd.completers.all.identifier_completer import IdentifierCompleter
 from ycmd.request_wrap import RequestWrap
 from ycmd.tests import PathToTestFile
-from ycmd.tests.test_utils import BuildRequest
+from ycmd.tests.test_utils import BuildRequest, TemporaryTestDir
 
 
 def BuildRequestWrap( contents, column_num, line_num = 1 ):
@@ -234,3 +234,149 @@ def FilterUnchangedTagFiles_SkipUnchangesFiles_test():
       tag_file )
 
   eq_( [], list( ident_completer._FilterUnchangedTagFiles( [ tag_file ] ) ) )
+
+
+def BufferIdentifiers_FirstUpdate_test():
+  buffer_identifiers = ic._BufferIdentifiers()
+  added, removed = buffer_identifiers.Update( 'foo bar\n'
+                                              'foo /* baz */',
+                                              'cpp',
+                                              False )
+  eq_( [ 'bar', 'foo' ], sorted( added ) )
+  eq_( [], removed )
+
+
+def BufferIdentifiers_UnchangedBuffer_test():
+  buffer_identifiers = ic._BufferIdentifiers()
+  buffer_identifiers.Update( 'foo bar', 'cpp', False )
+  eq_( ( [], [] ), buffer_identifiers.Update( 'foo bar', 'cpp', False ) )
+
+
+def BufferIdentifiers_LineChanged_test():
+  buffer_identifiers = ic._BufferIdentifiers()
+  buffer_identifiers.Update( 'foo bar\n'
+                             'bar baz\n'
+                             'qux',
+                             'cpp',
+                             False )
+  added, removed = buffer_identifiers.Update( 'foo bar\n'
+                                              'zoo\n'
+                                              'qux',
+                                              'cpp',
+                                              False )
+  # bar is still on the first line.
+  eq_( [ 'zoo' ], added )
+  eq_( [ 'baz' ], removed )
+
+
+def BufferIdentifiers_LinesInsertedAndDeleted_test():
+  buffer_identifiers = ic._BufferIdentifiers()
+  buffer_identifiers.Update( 'foo\n'
+                             'bar\n'
+                             'baz',
+                             'cpp',
+                             False )
+  added, removed = buffer_identifiers.Update( 'new\n'
+                                              'foo\n'
+                                              'baz',
+                                              'cpp',
+                                              False )
+  eq_( [ 'new' ], added )
+  eq_( [ 'bar' ], removed )
+
+
+def BufferIdentifiers_CommentSpanningChangedLines_test():
+  buffer_identifiers = ic._BufferIdentifiers()
+  buffer_identifiers.Update( 'foo\n'
+                             'bar\n'
+                             'baz',
+                             'cpp',
+                             False )
+  added, removed = buffer_identifiers.Update( '/* foo\n'
+                                              'bar\n'
+                                              'baz */ qux',
+                                              'cpp',
+                                              False )
+  eq_( [ 'qux' ], added )
+  eq_( [ 'bar', 'baz', 'foo' ], sorted( removed ) )
+
+
+def BufferIdentifiers_CollectFromCommentsAndStringsChanged_test():
+  buffer_identifiers = ic._BufferIdentifiers()
+  buffer_identifiers.Update( 'foo /* bar */', 'cpp', False )
+  eq_( ( [ 'bar' ], [] ),
+       buffer_identifiers.Update( 'foo /* bar */', 'cpp', True ) )
+  eq_( ( [], [ 'bar' ] ),
+       buffer_identifiers.Update( 'foo /* bar */', 'cpp', False ) )
+
+
+def AddBufferIdentifiers_RemovesDeletedIdentifiers_test():
+  ident_completer = IdentifierCompleter( DefaultOptions() )
+
+  def Completions( contents ):
+    request = RequestWrap( BuildRequest( contents = contents,
+                                         filetype = 'cpp',
+                                         column_num = 1 ) )
+    ident_completer._AddBufferIdentifiers( request )
+    return list( ident_completer._completer.CandidatesForQueryAndType( 'fo',
+                                                                       'cpp' ) )
+
+  eq_( [ 'foobar', 'foozoo' ],
+       sorted( Completions( 'foobar\nfoozoo\nfoobar' ) ) )
+  eq_( [ 'foobar' ], Completions( 'foobar\nbaz\nfoobar' ) )
+  eq_( [ 'foobar' ], Completions( 'foobar\nbaz' ) )
+  eq_( [ 'fooqux' ], Completions( 'fooqux\nbaz' ) )
+
+
+def AddBufferIdentifiers_RemovesTypedIdentifiersNotInBuffer_test():
+  ident_completer = IdentifierCompleter( DefaultOptions() )
+
+  def Request( contents, column_num = 1 ):
+    return RequestWrap( BuildRequest( contents = contents,
+                                      filetype = 'cpp',
+                                      column_num = column_num ) )
+
+  def Completions():
+    return sorted( ident_completer._completer.CandidatesForQueryAndType(
+      'fo', 'cpp' ) )
+
+  ident_completer._AddBufferIdentifiers( Request( 'foobar' ) )
+  # foozoo is typed then deleted before the next parse.
+  ident_completer.OnInsertLeave( Request( 'foobar foozoo', column_num = 8 ) )
+  eq_( [ 'foobar', 'foozoo' ], Completions() )
+  ident_completer._AddBufferIdentifiers( Request( 'foobar' ) )
+  eq_( [ 'foobar' ], Completions() )
+
+  # An identifier typed and kept in the buffer stays.
+  ident_completer.OnInsertLeave( Request( 'foobar fooqux', column_num = 8 ) )
+  ident_completer._AddBufferIdentifiers( Request( 'foobar fooqux' ) )
+  eq_( [ 'foobar', 'fooqux' ], Completions() )
+
+
+def OnBufferUnload_DropsBufferIdentifiers_test():
+  ident_completer = IdentifierCompleter( DefaultOptions() )
+  request = RequestWrap( BuildRequest( contents = 'foobar',
+                                       filetype = 'cpp',
+                                       column_num = 1 ) )
+  ident_completer._AddBufferIdentifiers( request )
+  eq_( 1, len( ident_completer._buffer_identifiers ) )
+
+  ident_completer.OnBufferUnload( request )
+  eq_( 0, len( ident_completer._buffer_identifiers ) )
+  # The identifiers are still available for completion.
+  eq_( [ 'foobar' ], list(
+    ident_completer._completer.CandidatesForQueryAndType( 'fo', 'cpp' ) ) )
+
+
+def AddIdentifiersFromTagFiles_WritesSnapshot_test():
+  with TemporaryTestDir() as snapshot_directory:
+    options = DefaultOptions()
+    options[ 'tag_files_snapshot_directory' ] = snapshot_directory
+    ident_completer = IdentifierCompleter( options )
+    ident_completer._AddIdentifiersFromTagFiles(
+      [ PathToTestFile( 'basic.tags' ) ] )
+
+    eq_( 1, len( os.listdir( snapshot_directory ) ) )
+    eq_( [ 'foosy', 'fooaaa' ],
+         list( ident_completer._completer.CandidatesForQueryAndType( 'fo',
+                                                                     'cpp' ) ) )
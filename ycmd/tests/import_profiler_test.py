@@ -0,0 +1,116 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import ( assert_that, calling, contains, contains_inanyorder,
+                       empty, equal_to, greater_than_or_equal_to, has_entries,
+                       raises )
+import functools
+import os
+import sys
+
+from ycmd import import_profiler
+from ycmd.tests.test_utils import TemporaryTestDir
+
+
+def ProfiledImports( test ):
+  """Decorator enabling the import profiler and adding to the Python path a
+  temporary directory containing the module profiled_outer, importing the
+  module profiled_inner. The directory is passed to the test."""
+  @functools.wraps( test )
+  def Wrapper( *args, **kwargs ):
+    with TemporaryTestDir() as tmp_dir:
+      with open( os.path.join( tmp_dir, 'profiled_outer.py' ), 'w' ) as f:
+        f.write( 'import profiled_inner\n' )
+      with open( os.path.join( tmp_dir, 'profiled_inner.py' ), 'w' ) as f:
+        f.write( 'VALUE = 42\n' )
+      sys.path.insert( 0, tmp_dir )
+      import_profiler.Reset()
+      import_profiler.Enable()
+      try:
+        return test( tmp_dir, *args, **kwargs )
+      finally:
+        import_profiler.Disable()
+        import_profiler.Reset()
+        sys.path.remove( tmp_dir )
+        sys.modules.pop( 'profiled_outer', None )
+        sys.modules.pop( 'profiled_inner', None )
+  return Wrapper
+
+
+def ImportProfiler_Disabled_test():
+  import_profiler.Reset()
+  assert_that( import_profiler.GetImportProfile(), equal_to( {
+    'enabled': False,
+    'total_ms': 0,
+    'imports': []
+  } ) )
+
+
+@ProfiledImports
+def ImportProfiler_ImportStatement_test( tmp_dir ):
+  import profiled_outer  # noqa
+  profile = import_profiler.GetImportProfile()
+  assert_that( profile, has_entries( {
+    'enabled': True,
+    'imports': contains(
+      has_entries( { 'module': 'profiled_outer' } ),
+      has_entries( { 'module': 'profiled_inner' } )
+    )
+  } ) )
+  outer, inner = profile[ 'imports' ]
+  assert_that( outer[ 'cumulative_ms' ],
+               greater_than_or_equal_to( outer[ 'self_ms' ] ) )
+  assert_that( outer[ 'cumulative_ms' ],
+               greater_than_or_equal_to( inner[ 'cumulative_ms' ] ) )
+  assert_that( inner[ 'cumulative_ms' ], equal_to( inner[ 'self_ms' ] ) )
+  # Only the outer import is counted in the total.
+  assert_that( profile[ 'total_ms' ], equal_to( outer[ 'cumulative_ms' ] ) )
+
+
+@ProfiledImports
+def ImportProfiler_ImportModule_test( tmp_dir ):
+  module = import_profiler.ImportModule( 'profiled_outer' )
+  assert_that( module.profiled_inner.VALUE, equal_to( 42 ) )
+  assert_that( import_profiler.GetImportProfile()[ 'imports' ],
+               contains_inanyorder(
+                 has_entries( { 'module': 'profiled_outer' } ),
+                 has_entries( { 'module': 'profiled_inner' } )
+               ) )
+
+
+@ProfiledImports
+def ImportProfiler_AlreadyImportedModule_test( tmp_dir ):
+  import profiled_inner  # noqa
+  import_profiler.Reset()
+  import profiled_inner  # noqa
+  import_profiler.ImportModule( 'profiled_inner' )
+  assert_that( import_profiler.GetImportProfile()[ 'imports' ], empty() )
+
+
+@ProfiledImports
+def ImportProfiler_FailedImport_test( tmp_dir ):
+  assert_that( calling( import_profiler.ImportModule ).with_args(
+                 'profiled_missing' ),
+               raises( ImportError ) )
+  assert_that( import_profiler.GetImportProfile()[ 'imports' ], empty() )
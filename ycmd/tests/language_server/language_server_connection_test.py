@@ -25,6 +25,7 @@ from builtins import *  # noqa
 from mock import patch, MagicMock
 from ycmd.completers.language_server import language_server_completer as lsc
 from hamcrest import assert_that, calling, equal_to, raises
+from ycmd.request_cancellation import CancellationToken, RequestCancelled
 from ycmd.tests.language_server import MockConnection
 
 import queue
@@ -89,6 +90,27 @@ def LanguageServerConnection_RequestAbortAwait_test():
                  raises( lsc.ResponseAbortedException ) )
 
 
+def LanguageServerConnection_RequestCancelled_test():
+  connection = MockConnection()
+  cancellation_token = CancellationToken()
+  cancellation_token.Cancel()
+
+  with patch.object( connection, 'WriteData' ) as write_data:
+    assert_that(
+      calling( connection.GetResponse ).with_args( '1',
+                                                   bytes( b'{"test":"test"}' ),
+                                                   10,
+                                                   cancellation_token ),
+      raises( RequestCancelled ) )
+    write_data.assert_called_with( bytes(
+      b'Content-Length: 70\r\n\r\n'
+      b'{"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": "1"}}'
+    ) )
+
+  # The response to the cancelled request is ignored.
+  connection._DispatchMessage( { 'id': '1', 'result': None } )
+
+
 def LanguageServerConnection_ServerConnectionDies_test():
   connection = MockConnection()
 
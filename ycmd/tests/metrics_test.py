@@ -0,0 +1,139 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import assert_that, contains, equal_to, has_entries
+import functools
+
+from ycmd import metrics
+
+
+def EnabledMetrics( test ):
+  @functools.wraps( test )
+  def Wrapper( *args, **kwargs ):
+    metrics.Reset()
+    metrics.Enable()
+    try:
+      return test( *args, **kwargs )
+    finally:
+      metrics.Disable()
+      metrics.Reset()
+  return Wrapper
+
+
+def Metrics_Disabled_test():
+  metrics.Reset()
+  with metrics.Span( 'foo' ):
+    pass
+  metrics.RecordCacheAccess( True, 'bar' )
+  assert_that( metrics.GetMetrics(), equal_to( {
+    'enabled': False,
+    'latencies': {},
+    'caches': {}
+  } ) )
+
+
+@EnabledMetrics
+def Metrics_Span_test():
+  with metrics.Span( 'Foo', 'Bar' ):
+    pass
+  with metrics.Span( 'Foo', 'Bar' ):
+    pass
+  assert_that( metrics.GetMetrics(), has_entries( {
+    'enabled': True,
+    'latencies': has_entries( {
+      'Foo.Bar': has_entries( { 'count': 2 } )
+    } )
+  } ) )
+
+
+@EnabledMetrics
+def Metrics_SpanRecordsOnException_test():
+  try:
+    with metrics.Span( 'foo' ):
+      raise RuntimeError
+  except RuntimeError:
+    pass
+  assert_that( metrics.GetMetrics()[ 'latencies' ],
+               has_entries( { 'foo': has_entries( { 'count': 1 } ) } ) )
+
+
+@EnabledMetrics
+def Metrics_RecordCacheAccess_test():
+  metrics.RecordCacheAccess( True, 'foo', 'cache' )
+  metrics.RecordCacheAccess( False, 'foo', 'cache' )
+  metrics.RecordCacheAccess( True, 'foo', 'cache' )
+  metrics.RecordCacheAccess( True, 'foo', 'cache' )
+  assert_that( metrics.GetMetrics()[ 'caches' ], equal_to( {
+    'foo.cache': {
+      'hits': 3,
+      'misses': 1,
+      'hit_ratio': 0.75
+    }
+  } ) )
+
+
+def Histogram_Empty_test():
+  assert_that( metrics.Histogram().Summary(), equal_to( {
+    'count': 0,
+    'mean_ms': 0.0,
+    'p50_ms': 0.0,
+    'p90_ms': 0.0,
+    'p99_ms': 0.0,
+    'max_ms': 0.0,
+    'buckets': []
+  } ) )
+
+
+def Histogram_Summary_test():
+  histogram = metrics.Histogram()
+  # 0.1ms bucket.
+  for _ in range( 50 ):
+    histogram.Record( 0.05 )
+  # 1.6ms bucket.
+  for _ in range( 40 ):
+    histogram.Record( 1.5 )
+  # 12.8ms bucket.
+  for _ in range( 9 ):
+    histogram.Record( 10 )
+  # Last bucket.
+  histogram.Record( 1000000 )
+
+  assert_that( histogram.Summary(), has_entries( {
+    'count': 100,
+    'p50_ms': 0.1,
+    'p90_ms': equal_to( 0.1 * 2 ** 4 ),
+    'p99_ms': equal_to( 0.1 * 2 ** 7 ),
+    'max_ms': 1000000,
+    'buckets': contains( [ 0.1, 50 ],
+                         [ 0.1 * 2 ** 4, 40 ],
+                         [ 0.1 * 2 ** 7, 9 ],
+                         [ None, 1 ] )
+  } ) )
+  assert_that( histogram.Percentile( 100 ), equal_to( 1000000 ) )
+
+
+def Histogram_PercentileBelowBucketBound_test():
+  histogram = metrics.Histogram()
+  histogram.Record( 5 )
+  assert_that( histogram.Percentile( 50 ), equal_to( 5 ) )
@@ -25,8 +25,10 @@ from builtins import *  # noqa
 
 from hamcrest import ( any_of, assert_that, contains, empty, equal_to,
                        has_entries, instance_of )
+from mock import patch
 import requests
 
+from ycmd import metrics
 from ycmd.tests import IsolatedYcmd, PathToTestFile, SharedYcmd
 from ycmd.tests.test_utils import BuildRequest, DummyCompleter, PatchCompleter
 
@@ -147,6 +149,11 @@ def MiscHandlers_DebugInfo_ExtraConfLoaded_test( app ):
         'path': instance_of( str ),
         'is_loaded': True
       } ),
+      'memory': has_entries( {
+        'num_stored_candidates': instance_of( int ),
+        'num_unused_candidates': instance_of( int ),
+        'num_stored_characters': instance_of( int )
+      } ),
       'completer': None
     } )
   )
@@ -170,7 +177,22 @@ def MiscHandlers_DebugInfo_NoExtraConfFound_test( app ):
         'path': None,
         'is_loaded': False
       } ),
-      'completer': None
+      'memory': has_entries( {
+        'num_stored_candidates': instance_of( int ),
+        'num_unused_candidates': instance_of( int ),
+        'num_stored_characters': instance_of( int )
+      } ),
+      'completer': None,
+      'metrics': has_entries( {
+        'enabled': False,
+        'latencies': instance_of( dict ),
+        'caches': instance_of( dict )
+      } ),
+      'import_profile': has_entries( {
+        'enabled': False,
+        'total_ms': 0,
+        'imports': empty()
+      } )
     } )
   )
 
@@ -194,11 +216,67 @@ def MiscHandlers_DebugInfo_ExtraConfFoundButNotLoaded_test( app ):
         'path': instance_of( str ),
         'is_loaded': False
       } ),
+      'memory': has_entries( {
+        'num_stored_candidates': instance_of( int ),
+        'num_unused_candidates': instance_of( int ),
+        'num_stored_characters': instance_of( int )
+      } ),
       'completer': None
     } )
   )
 
 
+@SharedYcmd
+def MiscHandlers_Metrics_Disabled_test( app ):
+  metrics.Reset()
+  app.post_json( '/completions', BuildRequest( contents = 'foo fo',
+                                               column_num = 7 ) )
+  assert_that( app.get( '/metrics' ).json, equal_to( {
+    'enabled': False,
+    'latencies': {},
+    'caches': {}
+  } ) )
+
+
+@SharedYcmd
+@patch( 'ycmd.tests.test_utils.DummyCompleter.CandidatesList',
+        return_value = [ 'foo', 'bar', 'qux' ] )
+def MiscHandlers_Metrics_Enabled_test( app, *args ):
+  metrics.Reset()
+  metrics.Enable()
+  try:
+    with PatchCompleter( DummyCompleter, 'dummy_filetype' ):
+      request_data = BuildRequest( filetype = 'dummy_filetype',
+                                   force_semantic = True )
+      app.post_json( '/completions', request_data )
+      app.post_json( '/completions', request_data )
+    assert_that( app.get( '/metrics' ).json, has_entries( {
+      'enabled': True,
+      'latencies': has_entries( {
+        'endpoint/completions': has_entries( { 'count': 2 } ),
+        'request_decode': has_entries( { 'count': 2 } ),
+        'json_encode': has_entries( { 'count': 2 } ),
+        'DummyCompleter.ComputeCandidatesInner': has_entries( {
+          'count': 1
+        } ),
+        'DummyCompleter.FilterAndSortCandidates': has_entries( {
+          'count': 2
+        } ),
+        'DummyCompleter.DetailCandidates': has_entries( { 'count': 2 } )
+      } ),
+      'caches': has_entries( {
+        'DummyCompleter.completions_cache': {
+          'hits': 1,
+          'misses': 1,
+          'hit_ratio': 0.5
+        }
+      } )
+    } ) )
+  finally:
+    metrics.Disable()
+    metrics.Reset()
+
+
 @SharedYcmd
 def MiscHandlers_ReceiveMessages_NoCompleter_test( app ):
   request_data = BuildRequest()
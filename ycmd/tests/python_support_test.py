@@ -78,6 +78,65 @@ def GetUtf8String_Int_test():
   eq_( b'123', ycm_core.GetUtf8String( 123 ) )
 
 
+def FilterAndSortCandidates_LargeList_test():
+  # Enough candidates for the work to be split across several threads. Only
+  # one in a thousand matches the query so that the matching candidates can be
+  # filtered and sorted on a single thread to get the expected result.
+  candidates = [ 'c{0}d'.format( i ) if i % 1000 else 'aBc{0}'.format( i )
+                 for i in range( 100000 ) ]
+  matches = [ candidate for candidate in candidates
+              if candidate.startswith( 'a' ) ]
+  expected = ycm_core.FilterAndSortCandidates( matches, '', 'abc', 0 )
+
+  eq_( 100, len( expected ) )
+  eq_( expected,
+       ycm_core.FilterAndSortCandidates( candidates, '', 'abc', 0 ) )
+  eq_( expected[ : 10 ],
+       ycm_core.FilterAndSortCandidates( candidates, '', 'abc', 10 ) )
+
+
+def FilterAndSortCandidates_RefinedQuery_test():
+  candidates = [ 'foobar', 'foobaz', 'fooqux', 'qux' ]
+
+  eq_( [ 'foobar' ],
+       ycm_core.FilterAndSortCandidates( candidates, '', 'fo', 1 ) )
+  eq_( [ 'foobar', 'foobaz' ],
+       ycm_core.FilterAndSortCandidates( candidates, '', 'foob', 0 ) )
+  eq_( [ 'foobaz' ],
+       ycm_core.FilterAndSortCandidates( candidates, '', 'foobz', 0 ) )
+  eq_( [ 'qux', 'fooqux' ],
+       ycm_core.FilterAndSortCandidates( candidates, '', 'q', 0 ) )
+
+  # The matches for the previous query only apply to the same candidates.
+  eq_( [ 'quux' ],
+       ycm_core.FilterAndSortCandidates( [ 'foo', 'quux' ], '', 'qu', 0 ) )
+
+
+def FilterAndSortCandidates_RefinedQueryReturnsNewObjects_test():
+  previous = [ { 'insertion_text': 'foobar', 'extra_menu_info': 'old' } ]
+  ycm_core.FilterAndSortCandidates( previous, 'insertion_text', 'fo', 0 )
+
+  candidates = [ { 'insertion_text': 'foobar', 'extra_menu_info': 'new' } ]
+  results = ycm_core.FilterAndSortCandidates( candidates,
+                                              'insertion_text',
+                                              'foo',
+                                              0 )
+  eq_( 1, len( results ) )
+  assert results[ 0 ] is candidates[ 0 ]
+
+
+def CandidateList_FilterAndSort_test():
+  candidates = [ { 'insertion_text': 'foobar' },
+                 { 'insertion_text': 'foobaz' },
+                 { 'insertion_text': 'fooqux' } ]
+  candidate_list = ycm_core.CandidateList( candidates, 'insertion_text' )
+
+  eq_( candidates[ : 2 ], candidate_list.FilterAndSort( 'fo', 2 ) )
+  eq_( [ candidates[ 2 ] ], candidate_list.FilterAndSort( 'foq' ) )
+  eq_( candidates[ : 2 ], candidate_list.FilterAndSort( 'ba' ) )
+  eq_( [], candidate_list.FilterAndSort( 'y' ) )
+
+
 @ClangOnly
 @Py2Only
 def CompilationDatabase_Py2Str_test():
@@ -0,0 +1,197 @@
+# coding: utf-8
+#
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import ( assert_that, calling, contains, greater_than_or_equal_to,
+                       has_entries, has_key, is_not, raises )
+from webtest import TestApp
+import bottle
+import gzip
+import json
+import os
+
+from ycmd.recording_plugin import RecordingPlugin
+from ycmd.tests.test_utils import TemporaryTestDir
+from ycmd.utils import ToUnicode
+
+
+def RequestData( contents ):
+  return {
+    'filepath': '/foo',
+    'line_num': 1,
+    'column_num': 1,
+    'file_data': {
+      '/foo': {
+        'contents': contents,
+        'filetypes': [ 'foo' ]
+      }
+    }
+  }
+
+
+def RecordRequests( trace_path, contents_mode, send_requests ):
+  plugin = RecordingPlugin( trace_path, contents_mode )
+  app = bottle.Bottle()
+  app.install( plugin )
+
+  @app.post( '/completions' )
+  def Completions():
+    return { 'completions': [] }
+
+  @app.get( '/ready' )
+  def Ready():
+    return json.dumps( True )
+
+  try:
+    send_requests( TestApp( app ) )
+  finally:
+    plugin.close()
+
+
+def ReadRecords( trace_path ):
+  with gzip.open( trace_path, 'rb' ) as trace_file:
+    return [ json.loads( ToUnicode( line ) ) for line in trace_file ]
+
+
+def RecordingPlugin_InvalidContentsMode_test():
+  with TemporaryTestDir() as tmp_dir:
+    assert_that(
+      calling( RecordingPlugin ).with_args( os.path.join( tmp_dir, 'trace' ),
+                                            'encrypt' ),
+      raises( ValueError, 'Invalid contents mode: encrypt' ) )
+
+
+def RecordingPlugin_KeepContents_test():
+  with TemporaryTestDir() as tmp_dir:
+    trace_path = os.path.join( tmp_dir, 'trace.jsonl.gz' )
+
+    def SendRequests( app ):
+      app.post_json( '/completions', RequestData( 'foo = bar\n' ) )
+      app.get( '/ready', { 'subserver': 'foo' } )
+
+    RecordRequests( trace_path, 'keep', SendRequests )
+
+    assert_that( ReadRecords( trace_path ), contains(
+      has_entries( {
+        'method': 'POST',
+        'path': '/completions',
+        'body': RequestData( 'foo = bar\n' ),
+        'latency_ms': greater_than_or_equal_to( 0 ),
+        'timestamp': greater_than_or_equal_to( 0 )
+      } ),
+      has_entries( {
+        'method': 'GET',
+        'path': '/ready',
+        'params': { 'subserver': 'foo' },
+        'body': None
+      } )
+    ) )
+
+
+def RecordingPlugin_HashContents_test():
+  with TemporaryTestDir() as tmp_dir:
+    trace_path = os.path.join( tmp_dir, 'trace.jsonl.gz' )
+
+    def SendRequests( app ):
+      app.post_json( '/completions', RequestData( 'foo = bar\n' ) )
+
+    RecordRequests( trace_path, 'hash', SendRequests )
+
+    assert_that( ReadRecords( trace_path ), contains(
+      has_entries( {
+        'body': RequestData(
+          'sha256:'
+          '5c8e01d88cd814814daabcf1906b3d69c08323253e89a5084246497baee82635' ),
+      } )
+    ) )
+
+
+def RecordingPlugin_RedactContents_test():
+  with TemporaryTestDir() as tmp_dir:
+    trace_path = os.path.join( tmp_dir, 'trace.jsonl.gz' )
+
+    def SendRequests( app ):
+      app.post_json( '/completions', RequestData( 'foo( bär, 42 );\n' ) )
+
+    RecordRequests( trace_path, 'redact', SendRequests )
+
+    assert_that( ReadRecords( trace_path ), contains(
+      has_entries( {
+        'body': RequestData( 'xxx( xxx, xx );\n' ),
+      } )
+    ) )
+
+
+def RecordingPlugin_RedactEdits_test():
+  with TemporaryTestDir() as tmp_dir:
+    trace_path = os.path.join( tmp_dir, 'trace.jsonl.gz' )
+
+    def EditsRequestData( contents ):
+      request_data = RequestData( None )
+      request_data[ 'file_data' ][ '/foo' ] = {
+        'version': 2,
+        'base_version': 1,
+        'edits': [ { 'start_line_num': 1,
+                     'end_line_num': 2,
+                     'contents': contents } ],
+        'filetypes': [ 'foo' ]
+      }
+      return request_data
+
+    def UnchangedRequestData():
+      request_data = RequestData( None )
+      request_data[ 'file_data' ][ '/foo' ] = {
+        'version': 2,
+        'filetypes': [ 'foo' ]
+      }
+      return request_data
+
+    def SendRequests( app ):
+      app.post_json( '/completions', EditsRequestData( 'foo( bär );\n' ) )
+      app.post_json( '/completions', UnchangedRequestData() )
+
+    RecordRequests( trace_path, 'redact', SendRequests )
+
+    assert_that( ReadRecords( trace_path ), contains(
+      has_entries( { 'body': EditsRequestData( 'xxx( xxx );\n' ) } ),
+      has_entries( { 'body': UnchangedRequestData() } )
+    ) )
+
+
+def RecordingPlugin_AppendToExistingTrace_test():
+  with TemporaryTestDir() as tmp_dir:
+    trace_path = os.path.join( tmp_dir, 'trace.jsonl.gz' )
+
+    def SendRequests( app ):
+      app.get( '/ready' )
+
+    RecordRequests( trace_path, 'keep', SendRequests )
+    RecordRequests( trace_path, 'keep', SendRequests )
+
+    assert_that( ReadRecords( trace_path ), contains(
+      has_entries( { 'path': '/ready' } ),
+      has_entries( { 'path': '/ready' } )
+    ) )
+    assert_that( ReadRecords( trace_path )[ 0 ], is_not( has_key( 'params' ) ) )
@@ -0,0 +1,72 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import assert_that, calling, equal_to, raises
+from mock import MagicMock
+
+from ycmd.request_cancellation import ( CancellationToken,
+                                        RequestCancelled,
+                                        RequestGenerations )
+
+
+def CancellationToken_Callbacks_test():
+  token = CancellationToken()
+  callback = MagicMock()
+  removed_callback = MagicMock()
+  token.AddCallback( callback )
+  token.AddCallback( removed_callback )
+  token.RemoveCallback( removed_callback )
+  token.RaiseIfCancelled()
+
+  token.Cancel()
+  token.Cancel()
+  assert_that( token.IsCancelled(), equal_to( True ) )
+  assert_that( calling( token.RaiseIfCancelled ), raises( RequestCancelled ) )
+  callback.assert_called_once_with()
+  removed_callback.assert_not_called()
+
+  # Callbacks added after cancellation are called immediately.
+  callback = MagicMock()
+  token.AddCallback( callback )
+  callback.assert_called_once_with()
+
+
+def RequestGenerations_Supersede_test():
+  generations = RequestGenerations()
+  first_token = generations.StartRequest( '/foo' )
+  other_token = generations.StartRequest( '/bar' )
+  second_token = generations.StartRequest( '/foo' )
+  assert_that( first_token.IsCancelled(), equal_to( True ) )
+  assert_that( other_token.IsCancelled(), equal_to( False ) )
+  assert_that( second_token.IsCancelled(), equal_to( False ) )
+
+  # Finishing a superseded request does not forget the newer one.
+  generations.FinishRequest( '/foo', first_token )
+  generations.StartRequest( '/foo' )
+  assert_that( second_token.IsCancelled(), equal_to( True ) )
+
+  # Finished requests are not cancelled.
+  generations.FinishRequest( '/bar', other_token )
+  generations.StartRequest( '/bar' )
+  assert_that( other_token.IsCancelled(), equal_to( False ) )
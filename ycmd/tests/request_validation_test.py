@@ -24,7 +24,7 @@ from builtins import *  # noqa
 
 from hamcrest import raises, assert_that, calling
 from nose.tools import ok_
-from ycmd.request_validation import EnsureRequestValid
+from ycmd.request_validation import EnsureBufferDataValid, EnsureRequestValid
 from ycmd.responses import ServerError
 
 
@@ -81,6 +81,13 @@ def EnsureRequestValid_MissingFileDataContents_test():
                raises( ServerError, ".*contents.*" ) )
 
 
+def EnsureRequestValid_FileDataVersionWithoutContents_test():
+  data = BasicData()
+  del data[ 'file_data' ][ '/foo' ][ 'contents' ]
+  data[ 'file_data' ][ '/foo' ][ 'version' ] = 1
+  ok_( EnsureRequestValid( data ) )
+
+
 def EnsureRequestValid_MissingFileDataFiletypes_test():
   data = BasicData()
   del data[ 'file_data' ][ '/foo' ][ 'filetypes' ]
@@ -100,3 +107,43 @@ def EnsureRequestValid_MissingEntryForFileInFileData_test():
   data[ 'filepath' ] = '/bar'
   assert_that( calling( EnsureRequestValid ).with_args( data ),
                raises( ServerError, ".*/bar.*" ) )
+
+
+def BufferData():
+  return {
+    'filetypes': [ 'foo' ],
+    'version': 2,
+    'base_version': 1,
+    'edits': [ { 'start_line_num': 1, 'end_line_num': 2, 'contents': 'foo' } ]
+  }
+
+
+def EnsureBufferDataValid_AllOk_test():
+  ok_( EnsureBufferDataValid( '/foo', BufferData() ) )
+
+
+def EnsureBufferDataValid_ContentsWithoutBaseVersion_test():
+  data = BufferData()
+  del data[ 'base_version' ]
+  del data[ 'edits' ]
+  data[ 'contents' ] = 'foo'
+  ok_( EnsureBufferDataValid( '/foo', data ) )
+
+
+def EnsureBufferDataValid_EditsWithoutBaseVersion_test():
+  data = BufferData()
+  del data[ 'base_version' ]
+  assert_that( calling( EnsureBufferDataValid ).with_args( '/foo', data ),
+               raises( ServerError, '.*base_version.*' ) )
+
+
+def EnsureBufferDataValid_MissingEditFields_test():
+  for field in [ 'start_line_num', 'end_line_num', 'contents' ]:
+    yield _EnsureBufferDataValid_MissingEditField, field
+
+
+def _EnsureBufferDataValid_MissingEditField( field ):
+  data = BufferData()
+  del data[ 'edits' ][ 0 ][ field ]
+  assert_that( calling( EnsureBufferDataValid ).with_args( '/foo', data ),
+               raises( ServerError, '.*\\[0\\]\\["{0}"\\]'.format( field ) ) )
@@ -24,10 +24,14 @@ from __future__ import absolute_import
 # Not installing aliases from python-future; it's unreliable and slow.
 from builtins import *  # noqa
 
+from copy import deepcopy
 from hamcrest import ( assert_that, calling, contains, empty, equal_to,
-                       has_entry, has_string, matches_regexp, raises )
+                       has_entry, has_string, is_not, matches_regexp,
+                       raises )
+from mock import MagicMock
 from nose.tools import eq_
 
+from ycmd.buffer_store import BufferStore
 from ycmd.utils import ToBytes
 from ycmd.request_wrap import RequestWrap
 
@@ -399,3 +403,110 @@ def ExtraConfData_test():
   # Check that extra_conf_data's values are immutable.
   extra_conf_data[ 'key' ].append( 'another_value' )
   assert_that( extra_conf_data, has_entry( 'key', contains( 'value' ) ) )
+
+
+def FileData_BufferEdits_test():
+  buffer_store = BufferStore()
+  request = PrepareJson( contents = 'foo\nbar\n', line_num = 2 )
+  request[ 'file_data' ][ '/foo' ][ 'version' ] = 1
+  RequestWrap( request, buffer_store = buffer_store )
+
+  request = PrepareJson( line_num = 2 )
+  request[ 'file_data' ][ '/foo' ] = {
+    'filetypes': [ '' ],
+    'version': 2,
+    'base_version': 1,
+    'edits': [ { 'start_line_num': 2, 'end_line_num': 3, 'contents': 'baz\n' } ]
+  }
+  wrap = RequestWrap( request, buffer_store = buffer_store )
+  assert_that( wrap[ 'file_data' ], has_entry( '/foo', {
+    'filetypes': [ '' ],
+    'version': 2,
+    'contents': 'foo\nbaz\n'
+  } ) )
+  eq_( wrap[ 'line_value' ], 'baz' )
+
+
+def Equality_test():
+  wrap = RequestWrap( PrepareJson( contents = 'foo\nbar.ba\nbaz',
+                                   line_num = 2,
+                                   column_num = 7 ) )
+
+  # Only the query on the current line is different.
+  other_wrap = RequestWrap( PrepareJson( contents = 'foo\nbar.qux\nbaz',
+                                         line_num = 2,
+                                         column_num = 8 ) )
+  eq_( wrap, other_wrap )
+
+  for contents in [ 'foo\nbar.ba\nqux', 'qux\nbar.ba\nbaz',
+                    'foo\nbar.ba\nbaz\n', 'foo\nbar.ba' ]:
+    other_wrap = RequestWrap( PrepareJson( contents = contents,
+                                           line_num = 2,
+                                           column_num = 7 ) )
+    assert_that( wrap, is_not( equal_to( other_wrap ) ) )
+
+  # Contents of another file are different.
+  request = PrepareJson( contents = 'foo\nbar.ba\nbaz',
+                         line_num = 2,
+                         column_num = 7 )
+  request[ 'file_data' ][ '/bar' ] = { 'filetypes': [ '' ], 'contents': 'a' }
+  wrap = RequestWrap( request )
+  eq_( wrap, RequestWrap( request ) )
+  request[ 'file_data' ][ '/bar' ] = { 'filetypes': [ '' ], 'contents': 'b' }
+  assert_that( wrap, is_not( equal_to( RequestWrap( request ) ) ) )
+
+
+def Equality_OnlyComparesDigests_test():
+  wrap = RequestWrap( PrepareJson( contents = 'foo\nbar.ba\nbaz',
+                                   line_num = 2,
+                                   column_num = 7 ) )
+  other_wrap = RequestWrap( PrepareJson( contents = 'foo\nbar.ba\nbaz',
+                                         line_num = 2,
+                                         column_num = 7 ) )
+  eq_( wrap, other_wrap )
+
+  # Once the digests are computed, the contents are not read anymore.
+  lines = MagicMock()
+  file_data = MagicMock()
+  for request in [ wrap, other_wrap ]:
+    request._cached_computed[ 'lines' ] = lines
+    request._cached_computed[ 'file_data' ] = file_data
+  eq_( wrap, other_wrap )
+  eq_( lines.mock_calls, [] )
+  eq_( file_data.mock_calls, [] )
+
+
+def Equality_FiletypesOfOtherFile_test():
+  request = PrepareJson( contents = 'foo\nbar.ba\nbaz',
+                         line_num = 2,
+                         column_num = 7 )
+  request[ 'file_data' ][ '/bar' ] = { 'filetypes': [ 'c' ], 'contents': 'a' }
+  wrap = RequestWrap( request )
+  request = deepcopy( request )
+  request[ 'file_data' ][ '/bar' ] = { 'filetypes': [ 'cpp' ], 'contents': 'a' }
+  assert_that( wrap, is_not( equal_to( RequestWrap( request ) ) ) )
+
+
+def Equality_OtherFileWithoutFiletypesAndContents_test():
+  request = PrepareJson( contents = 'foo\nbar.ba\nbaz',
+                         line_num = 2,
+                         column_num = 7 )
+  request[ 'file_data' ][ '/bar' ] = {}
+  wrap = RequestWrap( request )
+  eq_( wrap, RequestWrap( deepcopy( request ) ) )
+  request = deepcopy( request )
+  request[ 'file_data' ][ '/bar' ] = { 'filetypes': [ 'c' ] }
+  assert_that( wrap, is_not( equal_to( RequestWrap( request ) ) ) )
+
+
+def Equality_SameBufferVersion_test():
+  buffer_store = BufferStore()
+  request = PrepareJson( contents = 'foo\nbar.ba\nbaz',
+                         line_num = 2,
+                         column_num = 7 )
+  request[ 'file_data' ][ '/foo' ][ 'version' ] = 1
+  wrap = RequestWrap( request, buffer_store = buffer_store )
+
+  request = PrepareJson( line_num = 2, column_num = 7 )
+  request[ 'file_data' ][ '/foo' ] = { 'filetypes': [ '' ], 'version': 1 }
+  eq_( wrap, RequestWrap( request, buffer_store = buffer_store ) )
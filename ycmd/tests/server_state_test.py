@@ -0,0 +1,60 @@
+# Copyright (C) 2018 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+# Not installing aliases from python-future; it's unreliable and slow.
+from builtins import *  # noqa
+
+from hamcrest import assert_that, contains, instance_of, none, same_instance
+from mock import patch
+
+from ycmd.completers.python.python_completer import PythonCompleter
+from ycmd.server_state import ServerState
+from ycmd.user_options_store import DefaultOptions
+
+
+def ServerState_PrewarmFiletypeCompleters_test():
+  state = ServerState( DefaultOptions() )
+  state.PrewarmFiletypeCompleters( [ 'python', 'ycmd_no_completer' ] )
+
+  assert_that( state.GetLoadedFiletypeCompleters(),
+               contains( instance_of( PythonCompleter ) ) )
+  assert_that( state._filetype_completers[ 'ycmd_no_completer' ], none() )
+
+
+@patch( 'ycmd.server_state.LOGGER' )
+def ServerState_PrewarmFiletypeCompleters_Error_test( logger ):
+  state = ServerState( DefaultOptions() )
+  with patch( 'ycmd.completers.python.hook.GetCompleter',
+              side_effect = RuntimeError ):
+    state.PrewarmFiletypeCompleters( [ 'python' ] )
+  logger.exception.assert_called_with( 'Error while loading completer for %s',
+                                       'python' )
+
+  # The completer is created on the next attempt.
+  assert_that( state.GetFiletypeCompleter( [ 'python' ] ),
+               instance_of( PythonCompleter ) )
+
+
+def ServerState_GetFiletypeCompleter_CreatedOnce_test():
+  state = ServerState( DefaultOptions() )
+  completer = state.GetFiletypeCompleter( [ 'python' ] )
+  assert_that( state.GetFiletypeCompleter( [ 'python' ] ),
+               same_instance( completer ) )